@@ -19,11 +19,119 @@ class Settings:
     
     # Gemini API Configuration
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
+    GEMINI_BACKEND: str = os.getenv("GEMINI_BACKEND", "thread").lower()  # thread or async
+    GEMINI_ASYNC_MAX_CONCURRENCY: int = int(os.getenv("GEMINI_ASYNC_MAX_CONCURRENCY", "256"))
+    GEMINI_MAX_WORKERS: int = int(os.getenv("GEMINI_MAX_WORKERS", "8"))  # concurrent Gemini calls
+    GEMINI_MAX_QUEUE: int = int(os.getenv("GEMINI_MAX_QUEUE", "32"))  # calls allowed to wait for a worker
+    GEMINI_QUEUE_TIMEOUT: float = float(os.getenv("GEMINI_QUEUE_TIMEOUT", "30"))  # max seconds waiting
+    GEMINI_RETRY_AFTER: int = int(os.getenv("GEMINI_RETRY_AFTER", "5"))  # Retry-After sent when overloaded
     
     # File Upload Configuration
     MAX_FILE_SIZE: int = 50 * 1024 * 1024  # 50MB
+    # Whole request body, enforced before routes run (the file plus multipart overhead)
+    MAX_REQUEST_SIZE: int = int(os.getenv("MAX_REQUEST_SIZE", str(51 * 1024 * 1024)))
+    # Uploads up to this size are kept in memory; larger ones spill to a temporary file
+    UPLOAD_SPOOL_MAX_MEMORY: int = int(os.getenv("UPLOAD_SPOOL_MAX_MEMORY", str(8 * 1024 * 1024)))
     ALLOWED_EXTENSIONS: set = {'.pdf', '.docx', '.doc', '.txt', '.jpg', '.jpeg', '.png', '.gif'}
     UPLOAD_FOLDER: str = os.path.join(os.path.dirname(__file__), '..', 'uploads')
+
+    # Cache Configuration
+    CACHE_DB_PATH: str = os.getenv(
+        "CACHE_DB_PATH",
+        os.path.join(os.path.dirname(__file__), '..', 'cache.db')
+    )
+    VERDICT_CACHE_ENABLED: bool = os.getenv("VERDICT_CACHE_ENABLED", "true").lower() == "true"
+    VERDICT_CACHE_PERSIST: bool = os.getenv("VERDICT_CACHE_PERSIST", "true").lower() == "true"
+    VERDICT_CACHE_TTL: int = int(os.getenv("VERDICT_CACHE_TTL", str(6 * 60 * 60)))  # 6 hours
+    VERDICT_CACHE_MAX_ENTRIES: int = int(os.getenv("VERDICT_CACHE_MAX_ENTRIES", "2048"))
+    VERDICT_CACHE_DISK_MAX_ENTRIES: int = int(os.getenv("VERDICT_CACHE_DISK_MAX_ENTRIES", "100000"))
+
+    EXTRACTION_CACHE_ENABLED: bool = os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true"
+    EXTRACTION_CACHE_TTL: int = int(os.getenv("EXTRACTION_CACHE_TTL", str(7 * 24 * 60 * 60)))  # 7 days
+    EXTRACTION_CACHE_MAX_ENTRIES: int = int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "64"))  # in memory
+    EXTRACTION_CACHE_MAX_BYTES: int = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))  # on disk, compressed
+
+    CLAIM_INDEX_ENABLED: bool = os.getenv("CLAIM_INDEX_ENABLED", "false").lower() == "true"
+    CLAIM_INDEX_THRESHOLD: float = float(os.getenv("CLAIM_INDEX_THRESHOLD", "0.8"))  # Jaccard similarity of content words
+    CLAIM_INDEX_MAX_ENTRIES: int = int(os.getenv("CLAIM_INDEX_MAX_ENTRIES", "50000"))
+    CLAIM_INDEX_SEED_LIMIT: int = int(os.getenv("CLAIM_INDEX_SEED_LIMIT", "10000"))  # past conversations loaded at startup
+
+    # Web Search Configuration
+    SERPER_BASE_URL: str = os.getenv("SERPER_BASE_URL", "https://google.serper.dev/search")
+    SEARCH_TIMEOUT: float = float(os.getenv("SEARCH_TIMEOUT", "10"))
+    SEARCH_POOL_LIMIT: int = int(os.getenv("SEARCH_POOL_LIMIT", "100"))
+    SEARCH_POOL_LIMIT_PER_HOST: int = int(os.getenv("SEARCH_POOL_LIMIT_PER_HOST", "20"))
+    SEARCH_KEEPALIVE_TIMEOUT: float = float(os.getenv("SEARCH_KEEPALIVE_TIMEOUT", "60"))
+    SEARCH_DNS_CACHE_TTL: int = int(os.getenv("SEARCH_DNS_CACHE_TTL", "300"))
+    SEARCH_QUERY_COUNT: int = int(os.getenv("SEARCH_QUERY_COUNT", "2"))  # queries per claim (1-3)
+    SEARCH_CLAIM_DEADLINE: float = float(os.getenv("SEARCH_CLAIM_DEADLINE", "6"))  # seconds
+    SEARCH_CACHE_BACKEND: str = os.getenv("SEARCH_CACHE_BACKEND", "memory").lower()  # memory, sqlite or none
+    SEARCH_CACHE_TTL: int = int(os.getenv("SEARCH_CACHE_TTL", "3600"))  # 1 hour
+    SEARCH_CACHE_NEGATIVE_TTL: int = int(os.getenv("SEARCH_CACHE_NEGATIVE_TTL", "60"))
+    SEARCH_CACHE_MAX_ENTRIES: int = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "4096"))
+    SEARCH_CACHE_DISK_MAX_ENTRIES: int = int(os.getenv("SEARCH_CACHE_DISK_MAX_ENTRIES", "100000"))
+
+    # Image Preprocessing Configuration
+    IMAGE_NORMALIZE_ENABLED: bool = os.getenv("IMAGE_NORMALIZE_ENABLED", "true").lower() == "true"
+    IMAGE_MAX_DIMENSION: int = int(os.getenv("IMAGE_MAX_DIMENSION", "1536"))  # longest side sent to Gemini Vision
+    IMAGE_OCR_MAX_DIMENSION: int = int(os.getenv("IMAGE_OCR_MAX_DIMENSION", "2500"))  # OCR needs more detail
+    IMAGE_ENCODING: str = os.getenv("IMAGE_ENCODING", "jpeg").lower()  # jpeg, webp or png
+    IMAGE_QUALITY: int = int(os.getenv("IMAGE_QUALITY", "85"))
+    IMAGE_HASH_ENABLED: bool = os.getenv("IMAGE_HASH_ENABLED", "false").lower() == "true"
+    IMAGE_HASH_THRESHOLD: int = int(os.getenv("IMAGE_HASH_THRESHOLD", "6"))  # max differing dHash bits of 64
+    IMAGE_HASH_DETAIL_THRESHOLD: int = int(os.getenv("IMAGE_HASH_DETAIL_THRESHOLD", "24"))  # max pHash bits of 256
+    
+    # Text Extraction Configuration
+    EXTRACTION_MODE: str = os.getenv("EXTRACTION_MODE", "process").lower()  # process or thread
+    EXTRACTION_WORKERS: int = int(os.getenv("EXTRACTION_WORKERS", "2"))
+    EXTRACTION_MAX_QUEUE: int = int(os.getenv("EXTRACTION_MAX_QUEUE", "16"))  # extractions allowed to wait
+    EXTRACTION_QUEUE_TIMEOUT: float = float(os.getenv("EXTRACTION_QUEUE_TIMEOUT", "30"))  # max seconds waiting
+    EXTRACTION_RETRY_AFTER: int = int(os.getenv("EXTRACTION_RETRY_AFTER", "5"))  # Retry-After sent when overloaded
+    EXTRACTION_TIMEOUT: float = float(os.getenv("EXTRACTION_TIMEOUT", "60"))  # seconds per job, once running (not enforced in thread mode)
+    EXTRACTION_MEMORY_LIMIT_MB: int = int(os.getenv("EXTRACTION_MEMORY_LIMIT_MB", "1024"))  # per worker, 0 = no limit
+    EXTRACTION_MAX_TASKS_PER_CHILD: int = int(os.getenv("EXTRACTION_MAX_TASKS_PER_CHILD", "50"))  # 0 = never replace
+    PDF_EXTRACTION_MODE: str = os.getenv("PDF_EXTRACTION_MODE", "budget").lower()  # budget or full
+    PDF_PAGES_PER_JOB: int = int(os.getenv("PDF_PAGES_PER_JOB", "16"))  # pages per parallel range, 0 = one job
+    
+    # Analysis Pipeline Configuration
+    PROMPT_MAX_TOKENS: int = int(os.getenv("PROMPT_MAX_TOKENS", "8000"))  # content + web sources per prompt
+    PROMPT_SOURCES_SHARE: float = float(os.getenv("PROMPT_SOURCES_SHARE", "0.25"))  # max share for web sources
+    # PDF text read in budget mode: about 4x what a prompt holds (~4 chars per token),
+    # so the prompt budget picks the most salient sentences from it rather than everything fitting
+    MAX_ANALYSIS_CHARS: int = int(os.getenv("MAX_ANALYSIS_CHARS", str(PROMPT_MAX_TOKENS * 4 * 4)))
+    ANALYSIS_PIPELINE_MODE: str = os.getenv("ANALYSIS_PIPELINE_MODE", "sequential").lower()  # sequential or speculative
+    SPECULATIVE_SEARCH_DEADLINE: float = float(os.getenv("SPECULATIVE_SEARCH_DEADLINE", "3"))  # seconds
+    SPECULATIVE_POLICY: str = os.getenv("SPECULATIVE_POLICY", "refine").lower()  # refine or append
+    ANALYSIS_OUTPUT_FORMAT: str = os.getenv("ANALYSIS_OUTPUT_FORMAT", "markdown").lower()  # markdown or json
+    
+    # Document Analysis Configuration
+    DOCUMENT_ANALYSIS_MODE: str = os.getenv("DOCUMENT_ANALYSIS_MODE", "single").lower()  # single, claims or chunked
+    DOCUMENT_MIN_CHARS: int = int(os.getenv("DOCUMENT_MIN_CHARS", "2000"))  # shorter documents use single mode
+    CLAIM_CHECK_MAX_CLAIMS: int = int(os.getenv("CLAIM_CHECK_MAX_CLAIMS", "8"))  # claims verified per document
+    CLAIM_CHECK_SEARCH_CONCURRENCY: int = int(os.getenv("CLAIM_CHECK_SEARCH_CONCURRENCY", "4"))
+    CLAIM_CHECK_SEARCH_BUDGET: float = float(os.getenv("CLAIM_CHECK_SEARCH_BUDGET", "10"))  # seconds for all searches
+    CHUNK_CHARS: int = int(os.getenv("CHUNK_CHARS", "12000"))  # largest chunk, excluding overlap
+    CHUNK_OVERLAP: int = int(os.getenv("CHUNK_OVERLAP", "500"))  # characters repeated from the previous chunk
+    CHUNK_CONCURRENCY: int = int(os.getenv("CHUNK_CONCURRENCY", "3"))  # chunks analyzed at once
+    CHUNK_MAX_CHUNKS: int = int(os.getenv("CHUNK_MAX_CHUNKS", "20"))  # also sets the PDF budget in chunked mode
+    
+    # Batch Analysis Configuration
+    BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+    BATCH_SEARCH_CONCURRENCY: int = int(os.getenv("BATCH_SEARCH_CONCURRENCY", "8"))
+    BATCH_GEMINI_CONCURRENCY: int = int(os.getenv("BATCH_GEMINI_CONCURRENCY", "4"))
+    BATCH_PACK_SIZE: int = int(os.getenv("BATCH_PACK_SIZE", "8"))  # claims per packed prompt
+    BATCH_PACK_MAX_CHARS: int = int(os.getenv("BATCH_PACK_MAX_CHARS", "500"))  # longer claims go alone
+    
+    # Background Job Configuration
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "4"))
+    JOB_MAX_QUEUE: int = int(os.getenv("JOB_MAX_QUEUE", "100"))
+    JOB_RETRY_AFTER: int = int(os.getenv("JOB_RETRY_AFTER", "30"))  # Retry-After sent when the job queue is full
+    JOB_TTL: int = int(os.getenv("JOB_TTL", str(24 * 60 * 60)))  # keep finished jobs for 1 day
+    JOB_TIMEOUT: float = float(os.getenv("JOB_TIMEOUT", "1800"))  # fail jobs running longer than this
+    JOB_HEARTBEAT_INTERVAL: float = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "30"))  # running jobs refresh updated_at
+    JOB_STALE_AFTER: int = int(os.getenv("JOB_STALE_AFTER", "300"))  # fail running jobs with no heartbeat this long
+    JOB_CLEANUP_INTERVAL: int = int(os.getenv("JOB_CLEANUP_INTERVAL", "300"))
+    JOB_MAX_WAIT: float = float(os.getenv("JOB_MAX_WAIT", "30"))  # longest allowed long-poll
     
     # CORS Configuration - Allow all common frontend ports
     ALLOWED_ORIGINS: str = os.getenv(
@@ -1,6 +1,7 @@
 """
 Database module for storing conversation history
 """
+import os
 import sqlite3
 import json
 from datetime import datetime
@@ -8,7 +9,7 @@ from pathlib import Path
 from typing import List, Dict, Optional
 
 # Database file location
-DB_PATH = Path(__file__).parent.parent / "conversations.db"
+DB_PATH = Path(os.getenv("DATABASE_PATH", Path(__file__).parent.parent / "conversations.db"))
 
 
 class Database:
@@ -51,6 +52,33 @@ class Database:
             ON conversations(created_at DESC)
         """)
         
+        # Create analysis jobs table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                filename TEXT,
+                file_path TEXT,
+                file_type TEXT,
+                owner TEXT,
+                result TEXT,
+                error TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                CONSTRAINT valid_status CHECK (status IN ('queued', 'running', 'done', 'failed'))
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_jobs_status_updated
+            ON jobs(status, updated_at)
+        """)
+        
+        # Jobs tables created before the owner column
+        job_columns = {row[1] for row in cursor.execute("PRAGMA table_info(jobs)")}
+        if 'owner' not in job_columns:
+            cursor.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        
         conn.commit()
         conn.close()
     
@@ -239,6 +267,184 @@ class Database:
             'by_label': label_counts
         }
 
+    
+    def create_job(
+        self,
+        job_id: str,
+        filename: str,
+        file_path: str,
+        file_type: str
+    ) -> Dict:
+        """
+        Create a queued analysis job
+        
+        Args:
+            job_id: Job identifier
+            filename: Original filename
+            file_path: Path of the saved upload
+            file_type: File extension
+        
+        Returns:
+            Job dictionary
+        """
+        now = datetime.utcnow().isoformat()
+        conn = self.get_connection()
+        conn.execute("""
+            INSERT INTO jobs (id, status, filename, file_path, file_type, created_at, updated_at)
+            VALUES (?, 'queued', ?, ?, ?, ?, ?)
+        """, (job_id, filename, file_path, file_type, now, now))
+        conn.commit()
+        conn.close()
+        return self.get_job(job_id)
+    
+    def claim_job(self, job_id: str, owner: str) -> bool:
+        """
+        Mark a queued job as running under an owner token
+        
+        Args:
+            job_id: Job identifier
+            owner: Token identifying the worker run
+        
+        Returns:
+            True if claimed, False if the job is not queued (another worker has it)
+        """
+        conn = self.get_connection()
+        cursor = conn.execute("""
+            UPDATE jobs SET status = 'running', owner = ?, updated_at = ?
+            WHERE id = ? AND status = 'queued'
+        """, (owner, datetime.utcnow().isoformat(), job_id))
+        claimed = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return claimed
+    
+    def touch_job(self, job_id: str, owner: str) -> bool:
+        """
+        Record a heartbeat for a running job
+        
+        Args:
+            job_id: Job identifier
+            owner: Token the job was claimed with
+        
+        Returns:
+            True if the job is still running under this owner
+        """
+        conn = self.get_connection()
+        cursor = conn.execute("""
+            UPDATE jobs SET updated_at = ?
+            WHERE id = ? AND status = 'running' AND owner = ?
+        """, (datetime.utcnow().isoformat(), job_id, owner))
+        owned = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return owned
+    
+    def update_job(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[Dict] = None,
+        error: Optional[str] = None,
+        owner: Optional[str] = None
+    ) -> bool:
+        """
+        Update a job's status and outcome, releasing its owner
+        
+        Args:
+            job_id: Job identifier
+            status: New status ('queued', 'done' or 'failed')
+            result: Analysis result dictionary (for done jobs)
+            error: Error message (for failed jobs)
+            owner: Only update if the job is still running under this token
+        
+        Returns:
+            True if updated
+        """
+        query = """
+            UPDATE jobs SET status = ?, owner = NULL, result = ?, error = ?, updated_at = ?
+            WHERE id = ?
+        """
+        params = [
+            status,
+            json.dumps(result) if result is not None else None,
+            error,
+            datetime.utcnow().isoformat(),
+            job_id
+        ]
+        if owner is not None:
+            query += " AND status = 'running' AND owner = ?"
+            params.append(owner)
+        
+        conn = self.get_connection()
+        cursor = conn.execute(query, params)
+        updated = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return updated
+    
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """
+        Get a job by ID
+        
+        Args:
+            job_id: Job identifier
+        
+        Returns:
+            Job dictionary or None if not found
+        """
+        conn = self.get_connection()
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        conn.close()
+        if not row:
+            return None
+        job = dict(row)
+        if job.get('result'):
+            try:
+                job['result'] = json.loads(job['result'])
+            except json.JSONDecodeError:
+                job['result'] = None
+        return job
+    
+    def get_jobs(self, statuses: List[str], updated_before: Optional[str] = None) -> List[Dict]:
+        """
+        Get jobs in the given states
+        
+        Args:
+            statuses: Statuses to include
+            updated_before: Only jobs last updated before this ISO timestamp
+        
+        Returns:
+            List of job dictionaries (without results), oldest first
+        """
+        query = f"SELECT id, status, filename, file_path, file_type, owner, created_at, updated_at FROM jobs WHERE status IN ({','.join('?' * len(statuses))})"
+        params: List = list(statuses)
+        if updated_before:
+            query += " AND updated_at < ?"
+            params.append(updated_before)
+        query += " ORDER BY created_at ASC"
+        
+        conn = self.get_connection()
+        rows = conn.execute(query, params).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+    
+    def delete_job(self, job_id: str) -> bool:
+        """
+        Delete a job
+        
+        Args:
+            job_id: Job identifier
+        
+        Returns:
+            True if deleted, False if not found
+        """
+        conn = self.get_connection()
+        cursor = conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        deleted = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return deleted
+
 
 # Singleton instance
 db = Database()
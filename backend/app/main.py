@@ -1,8 +1,12 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.config import settings
+from app.middleware import BodySizeLimitMiddleware
 from app.routes import analyze
 from app.routes import conversations
+from app.routes.analyze import analyzer_service, job_service
+from app.utils.concurrency import OverloadedError
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -10,6 +14,10 @@ app = FastAPI(
     description="AI-powered misinformation detection system using Gemini"
 )
 
+# Refuse oversized bodies before routes (and Starlette's form parser) read them.
+# Added before CORS so that 413 responses still carry CORS headers.
+app.add_middleware(BodySizeLimitMiddleware, max_body_size=settings.MAX_REQUEST_SIZE)
+
 # Configure CORS - Allow all origins in debug mode
 app.add_middleware(
     CORSMiddleware,
@@ -19,6 +27,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def startup():
+    """Open pooled connections and start background job workers"""
+    await analyzer_service.startup()
+    await job_service.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background job workers and close pooled connections"""
+    await job_service.stop()
+    await analyzer_service.shutdown()
+
+
+@app.exception_handler(OverloadedError)
+async def overloaded_handler(request: Request, exc: OverloadedError):
+    """Tell clients to back off when upstream capacity is exhausted"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
 # Include routers
 app.include_router(analyze.router, prefix="/api", tags=["Analysis"])
 app.include_router(conversations.router, prefix="/api", tags=["Conversations"])
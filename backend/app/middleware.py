@@ -0,0 +1,80 @@
+"""
+ASGI middleware
+"""
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class BodySizeLimitMiddleware:
+    """
+    Reject request bodies larger than ``max_body_size`` with 413
+
+    A Content-Length over the limit is refused before any of the body is
+    read. Chunked or understated bodies are counted as they arrive; once
+    the count crosses the limit the app sees the client disconnect, its
+    response is dropped and 413 is sent instead. This bounds what
+    Starlette's form parser spools to disk for routes taking an
+    UploadFile, which only get the file after the body is fully received.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int):
+        """
+        Initialize middleware
+
+        Args:
+            app: Wrapped ASGI application
+            max_body_size: Largest request body accepted, in bytes
+        """
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length", "")
+        if content_length.isdigit() and int(content_length) > self.max_body_size:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            if exceeded:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    exceeded = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message: Message):
+            nonlocal response_started
+            if exceeded and not response_started:
+                return  # replaced by the 413 below
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            # The app failed on the cut-off body; the 413 below explains it
+            if not exceeded or response_started:
+                raise
+        if exceeded and not response_started:
+            await self._reject(scope, receive, send)
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send):
+        response = JSONResponse(
+            status_code=413,
+            content={"detail": f"Request body exceeds {self.max_body_size} bytes"}
+        )
+        await response(scope, receive, send)
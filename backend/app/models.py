@@ -1,8 +1,8 @@
 """
 Pydantic models for request/response validation
 """
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, List, Dict, Any
 from enum import Enum
 
 
@@ -30,6 +30,65 @@ class AnalysisResult(BaseModel):
     reasons: List[str]
     tips: List[str]
     analysis_details: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None  # pipeline diagnostics (path taken, timings, ...)
+
+
+class StructuredVerdict(BaseModel):
+    """JSON verdict returned by Gemini in json output mode"""
+    assessment: ReliabilityLabel
+    confidence: float = Field(ge=0.0, le=1.0)
+    reasons: List[str] = []
+    tips: List[str] = []
+    claims: List[str] = []  # checkable claims found in the content
+    summary: str = ""
+
+    @field_validator("assessment", mode="before")
+    @classmethod
+    def normalize_assessment(cls, value: Any) -> Any:
+        # "Needs Verification" -> "needs_verification"
+        return value.strip().lower().replace(" ", "_") if isinstance(value, str) else value
+
+    @field_validator("confidence", mode="before")
+    @classmethod
+    def scale_percentage(cls, value: Any) -> Any:
+        # Models sometimes answer 85 for 0.85
+        if isinstance(value, (int, float)) and 1 < value <= 100:
+            return value / 100
+        return value
+
+
+class BatchAnalysisRequest(BaseModel):
+    """Request model for batch text analysis"""
+    items: List[AnalysisRequest]
+    stream: bool = False  # stream NDJSON item events as they finish
+    pack: bool = True  # allow several short claims per Gemini prompt
+
+
+class BatchItemResult(BaseModel):
+    """Result for one item of a batch"""
+    index: int
+    result: Optional[AnalysisResult] = None
+    error: Optional[str] = None
+    latency_ms: float
+    cached: bool = False
+    duplicate_of: Optional[int] = None
+
+
+class BatchAnalysisResponse(BaseModel):
+    """Batch results in request order with batch statistics"""
+    results: List[BatchItemResult]
+    stats: Dict[str, Any]
+
+
+class JobResponse(BaseModel):
+    """Status of a background file analysis job"""
+    job_id: str
+    status: str  # queued, running, done, failed
+    filename: Optional[str] = None
+    created_at: str
+    updated_at: str
+    result: Optional[AnalysisResult] = None
+    error: Optional[str] = None
 
 
 class FileUploadResponse(BaseModel):
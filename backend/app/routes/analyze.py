@@ -2,9 +2,19 @@
 API routes for analysis endpoints
 """
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Request
+from fastapi.responses import StreamingResponse
 from app.services.analyzer_service import AnalyzerService
-from app.models import AnalysisRequest, AnalysisResult, FileUploadResponse
-from app.utils.file_handler import FileHandler
+from app.services.batch_service import BatchService
+from app.services.job_service import JobService
+from app.models import (
+    AnalysisRequest, AnalysisResult, FileUploadResponse,
+    BatchAnalysisRequest, BatchAnalysisResponse, JobResponse
+)
+from app.database import db
+from app.config import settings
+from app.utils.file_handler import FileHandler, FileTooLargeError, UploadFormError
+from app.utils.concurrency import OverloadedError
+import asyncio
 import uuid
 import json
 from pathlib import Path
@@ -17,6 +27,43 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["analysis"])
 analyzer_service = AnalyzerService()
 file_handler = FileHandler()
+batch_service = BatchService(analyzer_service)
+job_service = JobService(analyzer_service, db, file_handler)
+
+
+async def _save_upload(file: UploadFile, file_id: str):
+    """Stream an upload to disk, answering 413 if it is too large"""
+    try:
+        return await file_handler.save_upload(file, file_id)
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+
+async def _receive_upload(request: Request):
+    """Spool a multipart upload without saving it, answering 413 / 400 if it is too large or malformed"""
+    try:
+        return await file_handler.receive_upload(request)
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadFormError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# Request body of the endpoints that read their multipart upload themselves
+UPLOAD_FORM_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
 
 
 @router.post("/analyze")
@@ -47,38 +94,23 @@ async def analyze(request: Request):
         
         elif 'multipart/form-data' in content_type:
             # Handle FormData for image analysis
-            form_data = await request.form()
-            request_type = form_data.get('type')
-            file = form_data.get('file')
-            
-            if request_type == 'image':
-                if not file:
-                    raise HTTPException(status_code=400, detail="File is required for image analysis")
+            upload = await _receive_upload(request)
+            try:
+                if upload.fields.get('type') != 'image':
+                    raise HTTPException(status_code=400, detail="Type must be 'text' or 'image'")
                 
                 # Validate file
-                if not file_handler.is_allowed_file(file.filename):
+                if not file_handler.is_allowed_file(upload.filename):
                     raise HTTPException(status_code=400, detail="File type not allowed")
                 
-                # Save file
-                file_id = str(uuid.uuid4())
-                file_path = file_handler.save_file(file, file_id)
-                
-                # Analyze the image
-                result = await analyzer_service.analyze_image(file_path)
-                
-                # Clean up file after analysis
-                try:
-                    file_handler.delete_file(file_id)
-                except:
-                    pass
-                
-                return result
-            else:
-                raise HTTPException(status_code=400, detail="Type must be 'text' or 'image'")
+                # Analyze the image straight from the upload, without saving it
+                return await analyzer_service.analyze_image(upload.file, content_hash=upload.sha256)
+            finally:
+                upload.file.close()
         else:
             raise HTTPException(status_code=400, detail="Invalid content type")
     
-    except HTTPException:
+    except (HTTPException, OverloadedError):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -98,65 +130,202 @@ async def analyze_text(request: AnalysisRequest):
     try:
         result = await analyzer_service.analyze_text(request.content)
         return result
+    except OverloadedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/analyze/upload", response_model=AnalysisResult)
-async def upload_and_analyze(file: UploadFile = File(...)):
+@router.post("/analyze/text/stream")
+async def analyze_text_stream(request: AnalysisRequest):
     """
-    Upload a file and analyze it directly
+    Analyze text content, streaming progress as newline-delimited JSON
+    
+    Each line is one event: "sources" (web search results), "chunk"
+    (Gemini output text), then a closing "result" with the AnalysisResult,
+    or "error" if the request was rejected or the analysis failed part-way.
     
     Args:
-        file: Uploaded file
+        request: AnalysisRequest with content
         
+    Returns:
+        StreamingResponse of NDJSON events
+    """
+    async def events():
+        async for event in analyzer_service.analyze_text_stream(request.content):
+            yield json.dumps(event) + "\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/analyze/batch", response_model=BatchAnalysisResponse)
+async def analyze_batch(request: BatchAnalysisRequest):
+    """
+    Analyze many texts in one request
+    
+    Identical items are analyzed once, and short claims may share a Gemini
+    prompt. With stream=true, results are sent as NDJSON "item" events as
+    they finish, followed by a "summary" event.
+    
+    Args:
+        request: BatchAnalysisRequest with items
+        
+    Returns:
+        BatchAnalysisResponse in request order, or a StreamingResponse
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="At least one item is required")
+    if len(request.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch exceeds maximum of {settings.BATCH_MAX_ITEMS} items"
+        )
+    
+    contents = [item.content for item in request.items]
+    events = batch_service.analyze_batch(contents, pack=request.pack)
+    
+    if request.stream:
+        async def lines():
+            async for event in events:
+                yield json.dumps(event) + "\n"
+        
+        return StreamingResponse(
+            lines(),
+            media_type="application/x-ndjson",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    results = []
+    stats = {}
+    async for event in events:
+        if event["event"] == "item":
+            results.append(event)
+        else:
+            stats = event["stats"]
+    results.sort(key=lambda item: item["index"])
+    return {"results": results, "stats": stats}
+
+
+@router.post("/analyze/upload", response_model=AnalysisResult, openapi_extra=UPLOAD_FORM_OPENAPI)
+async def upload_and_analyze(request: Request):
+    """
+    Upload a file (multipart field "file") and analyze it directly
+    
+    The upload is spooled in memory (or a temp file when large) and
+    analyzed in place; it is never saved to the upload directory.
+    
     Returns:
         AnalysisResult with analysis
     """
+    # Size-check and hash the upload while it streams in
+    upload = await _receive_upload(request)
     try:
-        logger.info(f"📁 File upload received: {file.filename}")
-        logger.info(f"   Content-Type: {file.content_type}")
+        logger.info(f"📁 File upload received: {upload.filename}")
+        logger.info(f"   ✅ Upload received ({upload.size} bytes, {'in memory' if upload.in_memory else 'spooled'})")
         
         # Validate file
-        if not file_handler.is_allowed_file(file.filename):
-            logger.error(f"   ❌ File type not allowed: {file.filename}")
+        if not file_handler.is_allowed_file(upload.filename):
+            logger.error(f"   ❌ File type not allowed: {upload.filename}")
             raise HTTPException(status_code=400, detail="File type not allowed")
         
-        # Save file
-        file_id = str(uuid.uuid4())
-        logger.info(f"   💾 Saving file with ID: {file_id}")
-        file_path = file_handler.save_file(file, file_id)
-        logger.info(f"   ✅ File saved to: {file_path}")
-        
         # Get file extension
-        file_ext = Path(file.filename).suffix.lower()[1:]
+        file_ext = Path(upload.filename).suffix.lower()[1:]
         logger.info(f"   📄 File extension: {file_ext}")
         
         # Analyze the file directly
         if file_ext in ['jpg', 'jpeg', 'png', 'gif']:
             logger.info(f"   🖼️ Analyzing as image...")
-            result = await analyzer_service.analyze_image(file_path)
+            result = await analyzer_service.analyze_image(upload.file, content_hash=upload.sha256)
         else:
             logger.info(f"   📝 Extracting text and analyzing...")
-            result = await analyzer_service.analyze_file(file_path, file_ext)
+            result = await analyzer_service.analyze_file(upload.file, file_ext, content_hash=upload.sha256)
         
         logger.info(f"   ✅ Analysis complete: {result.label} ({result.confidence})")
         
-        # Clean up file after analysis
-        try:
-            file_handler.delete_file(file_id)
-            logger.info(f"   🗑️ Temporary file cleaned up")
-        except:
-            pass
-        
         return result
-    except HTTPException:
+    except (HTTPException, OverloadedError):
         raise
     except Exception as e:
         logger.error(f"   ❌ Error during file analysis: {str(e)}")
         import traceback
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        upload.file.close()
+
+
+def _job_response(job: dict) -> dict:
+    """Convert a stored job into the API response shape"""
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "filename": job["filename"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+        "result": job.get("result"),
+        "error": job.get("error"),
+    }
+
+
+@router.post("/analyze/jobs", response_model=JobResponse, status_code=202)
+async def create_analysis_job(file: UploadFile = File(...)):
+    """
+    Upload a file for background analysis
+    
+    Returns immediately with a job id; poll GET /analyze/jobs/{job_id}
+    (optionally with ?wait=seconds to long-poll) for the result.
+    
+    Args:
+        file: Uploaded file
+        
+    Returns:
+        JobResponse with the queued job
+    """
+    if not file_handler.is_allowed_file(file.filename):
+        raise HTTPException(status_code=400, detail="File type not allowed")
+    
+    job_id = str(uuid.uuid4())
+    saved = await _save_upload(file, job_id)
+    
+    file_ext = Path(file.filename).suffix.lower()[1:]
+    try:
+        job = await job_service.submit(job_id, file.filename, saved.path, file_ext)
+    except Exception:
+        # Queue full or the job row could not be written: the upload has no job to own it
+        await asyncio.to_thread(file_handler.delete_file, job_id)
+        raise
+    logger.info(f"📥 Queued analysis job {job_id} for {file.filename}")
+    return _job_response(job)
+
+
+@router.get("/analyze/jobs/{job_id}", response_model=JobResponse)
+async def get_analysis_job(job_id: str, wait: float = 0):
+    """
+    Get the status (and, once done, the result) of an analysis job
+    
+    Args:
+        job_id: Job identifier
+        wait: Seconds to wait for the job to finish before answering
+        
+    Returns:
+        JobResponse
+    """
+    job = await job_service.wait(job_id, min(max(wait, 0), settings.JOB_MAX_WAIT))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job)
+
+
+@router.get("/analyze/stats")
+async def analysis_stats():
+    """Runtime statistics for the analysis pipeline (cache hit/miss counters, ...)"""
+    stats = await analyzer_service.get_stats()
+    stats["jobs"] = job_service.get_stats()
+    return stats
 
 
 @router.get("/health")
@@ -2,14 +2,55 @@
 Main analysis orchestrator service
 Coordinates the analysis pipeline
 """
-from app.services.gemini_service import GeminiService
-from app.services.extractor_service import ExtractorService
+from app.services.gemini_service import GeminiService, PROMPT_VERSION, StreamError
+from app.services.extractor_service import EXTRACTOR_VERSION, ExtractedText, ExtractorService
 from app.services.search_service import SearchService
-from app.models import AnalysisResult
+from app.services.extraction_pool import ExtractionPool
+from app.models import AnalysisResult, ReliabilityLabel, StructuredVerdict
+from app.database import db
+from app.utils.cache import TieredCache
+from app.utils.chunking import split_chunks
+from app.utils.claim_extraction import extract_claims
+from app.utils.claim_index import ClaimIndex
+from app.utils.image_hash import ImageHashIndex, ImageMatch, image_hashes
+from app.utils.singleflight import SingleFlight
+from app.utils.analysis_parser import decode_verdict, parse_analysis
+from app.utils.prompt_budget import DEFAULT_CHARS_PER_TOKEN, search_query
+from app.utils.verdict_classifier import SEVERE_LABELS, reduce_verdicts, verdict_classifier
+from app.utils.sources import FileSource, open_source, source_size
+from app.utils.concurrency import OverloadedError
+from app.config import settings
+import asyncio
+import hashlib
 import json
-import re
 import os
-from typing import Dict, Any, List, Tuple
+import re
+import time
+from datetime import datetime, timezone
+from pydantic import ValidationError
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+
+
+def normalize_content(content: str) -> str:
+    """Collapse whitespace and case so trivially different submissions share a key"""
+    return " ".join(content.split()).casefold()
+
+
+def hash_file(file_path: FileSource, chunk_size: int = 1024 * 1024) -> str:
+    """Compute the SHA-256 hex digest of a file (path, bytes or file object)"""
+    if isinstance(file_path, bytes):
+        return hashlib.sha256(file_path).hexdigest()
+    digest = hashlib.sha256()
+    if isinstance(file_path, str):
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+    else:
+        stream = open_source(file_path)
+        for chunk in iter(lambda: stream.read(chunk_size), b""):
+            digest.update(chunk)
+        stream.seek(0)
+    return digest.hexdigest()
 
 
 class AnalyzerService:
@@ -19,72 +60,677 @@ class AnalyzerService:
         """Initialize services"""
         self.gemini_service = GeminiService()
         self.extractor_service = ExtractorService()
+        self.extraction_pool = ExtractionPool()
         self.search_service = SearchService()
         self.use_web_search = bool(os.getenv("SERPER_API_KEY", ""))
+        prompt_chars = int(settings.PROMPT_MAX_TOKENS * DEFAULT_CHARS_PER_TOKEN)
+        if settings.PDF_EXTRACTION_MODE == "budget" and settings.MAX_ANALYSIS_CHARS <= prompt_chars:
+            print(
+                f"[AnalyzerService] MAX_ANALYSIS_CHARS={settings.MAX_ANALYSIS_CHARS} fits a "
+                f"{settings.PROMPT_MAX_TOKENS}-token prompt whole; long PDFs are cut to their "
+                f"opening text instead of their most salient sentences",
+                flush=True
+            )
+        self.verdict_cache = TieredCache(
+            "verdict",
+            max_entries=settings.VERDICT_CACHE_MAX_ENTRIES,
+            ttl=settings.VERDICT_CACHE_TTL,
+            db_path=settings.CACHE_DB_PATH if settings.VERDICT_CACHE_PERSIST else None,
+            disk_max_entries=settings.VERDICT_CACHE_DISK_MAX_ENTRIES,
+            dumps=lambda result: result.model_dump_json().encode("utf-8"),
+            loads=AnalysisResult.model_validate_json,
+            enabled=settings.VERDICT_CACHE_ENABLED
+        )
+        # Extracted text of files already seen, by content hash (compressed on disk)
+        self.extraction_cache = TieredCache(
+            "extraction",
+            max_entries=settings.EXTRACTION_CACHE_MAX_ENTRIES,
+            ttl=settings.EXTRACTION_CACHE_TTL,
+            db_path=settings.CACHE_DB_PATH,
+            disk_max_bytes=settings.EXTRACTION_CACHE_MAX_BYTES,
+            compress=True,
+            dumps=lambda entry: json.dumps(entry).encode("utf-8"),
+            loads=json.loads,
+            enabled=settings.EXTRACTION_CACHE_ENABLED
+        )
+        self.extraction_bytes_saved = 0
+        # Perceptual hashes of analyzed images, so resized/recompressed copies reuse a verdict
+        self.image_index = None
+        if settings.IMAGE_HASH_ENABLED:
+            self.image_index = ImageHashIndex(
+                settings.CACHE_DB_PATH,
+                threshold=settings.IMAGE_HASH_THRESHOLD,
+                detail_threshold=settings.IMAGE_HASH_DETAIL_THRESHOLD,
+                version=self.pipeline_version,
+                ttl=settings.VERDICT_CACHE_TTL,
+                max_entries=settings.VERDICT_CACHE_DISK_MAX_ENTRIES
+            )
+        # Reworded claims (same content words, same roles) reuse earlier verdicts
+        self.claim_index = None
+        if settings.CLAIM_INDEX_ENABLED:
+            self.claim_index = ClaimIndex(
+                threshold=settings.CLAIM_INDEX_THRESHOLD,
+                max_entries=settings.CLAIM_INDEX_MAX_ENTRIES,
+                ttl=settings.VERDICT_CACHE_TTL
+            )
+        # Identical analyses running at the same time share one pipeline execution
+        self._inflight = SingleFlight()
+    
+    @property
+    def pipeline_version(self) -> str:
+        """Prompt version and pipeline settings that change what a verdict says"""
+        return f"{PROMPT_VERSION}|search={int(self.use_web_search)}|format={settings.ANALYSIS_OUTPUT_FORMAT}"
+    
+    def _cache_key(self, kind: str, fingerprint: str) -> str:
+        """Build a verdict cache key from a content fingerprint and the pipeline settings"""
+        raw = f"{kind}|{self.pipeline_version}|{fingerprint}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    def text_cache_key(self, content: str) -> str:
+        """Verdict cache key for raw text"""
+        return self._cache_key("text", normalize_content(content))
+    
+    def batch_cache_key(self, content: str) -> str:
+        """Verdict cache key for a claim assessed in a packed batch prompt (summary-only verdicts)"""
+        return self._cache_key("batch", normalize_content(content))
+    
+    def file_cache_key(self, file_path: FileSource, file_type: str, content_hash: Optional[str] = None) -> str:
+        """Verdict cache key for a file, based on its bytes (hashed here unless already known)"""
+        kind = f"file:{file_type.lower()}"
+        if settings.DOCUMENT_ANALYSIS_MODE != "single":
+            kind += f":{settings.DOCUMENT_ANALYSIS_MODE}"
+        return self._cache_key(kind, content_hash or hash_file(file_path))
     
-    async def analyze_file(self, file_path: str, file_type: str) -> AnalysisResult:
+    def is_fallback(self, result: AnalysisResult) -> bool:
+        """Check whether a result is the fallback built from a failed Gemini call"""
+        return bool(result.analysis_details) and self.gemini_service.is_failure(result.analysis_details)
+    
+    def _store_verdict(self, key: str, result: AnalysisResult):
+        """Cache a verdict unless it is a fallback from a failed Gemini call"""
+        if self.is_fallback(result):
+            return
+        self.verdict_cache.set(key, result)
+    
+    async def _run_once(self, key: str, factory) -> AnalysisResult:
+        """
+        Run an uncached analysis, coalescing identical concurrent requests
+        
+        The leader stores the verdict before its task completes, so requests
+        arriving after the flight ends find it in the cache.
+        """
+        async def run_and_store() -> AnalysisResult:
+            result = await factory()
+            self._store_verdict(key, result)
+            return result
+        
+        return await self._inflight.do(key, run_and_store)
+    
+    async def startup(self):
+        """Acquire long-lived resources (called on application startup)"""
+        await self.search_service.start()
+        if self.claim_index is not None:
+            seeded = await asyncio.to_thread(self._seed_claim_index)
+            print(f"[AnalyzerService] Claim index seeded with {seeded} past analyses", flush=True)
+    
+    def _seed_claim_index(self) -> int:
+        """Index unexpired verdicts of past text conversations (oldest first, so newest are kept)"""
+        seeded = 0
+        conversations = db.get_conversations(limit=settings.CLAIM_INDEX_SEED_LIMIT, conv_type='text')
+        for conv in reversed(conversations):
+            if not conv.get('content') or conv.get('result_label') not in ReliabilityLabel._value2member_map_:
+                continue
+            details = conv.get('result_details')
+            reasons = [str(item) for item in details] if isinstance(details, list) else []
+            if not reasons and conv.get('result_explanation'):
+                reasons = [conv['result_explanation']]
+            result = AnalysisResult(
+                label=conv['result_label'],
+                confidence=conv.get('result_confidence') or 0.5,
+                content_preview=self.preview(conv['content']),
+                reasons=reasons or ["Analysis completed. See details below."],
+                tips=[
+                    "Cross-reference with reputable news sources",
+                    "Check the date and context of the information",
+                    "Look for primary sources and official statements"
+                ],
+                analysis_details=conv.get('result_explanation'),
+                metadata={"pipeline_path": "conversation_history"}
+            )
+            created_at = datetime.fromisoformat(conv['created_at']).replace(tzinfo=timezone.utc).timestamp()
+            if self.claim_index.add(conv['content'], result, created_at=created_at) is not None:
+                seeded += 1
+        return seeded
+    
+    async def shutdown(self):
+        """Release long-lived resources (called on application shutdown)"""
+        await self.search_service.close()
+        # Queued cache writes and access times reach disk before exit
+        await asyncio.to_thread(self.verdict_cache.flush)
+        await asyncio.to_thread(self.extraction_cache.flush)
+        self.gemini_service.shutdown()
+        self.extraction_pool.shutdown()
+        if self.image_index is not None:
+            self.image_index.close()
+    
+    async def get_stats(self) -> Dict[str, Any]:
+        """Get runtime statistics for the analysis pipeline (SQLite-backed sizes are read off the loop)"""
+        return {
+            "verdict_cache": await self.verdict_cache.aget_stats(),
+            "coalescing": self._inflight.get_stats(),
+            "claim_index": self.claim_index.get_stats() if self.claim_index is not None else None,
+            "gemini": self.gemini_service.get_stats(),
+            "extraction": self.extraction_pool.get_stats(),
+            "extraction_cache": {
+                **await self.extraction_cache.aget_stats(),
+                "bytes_saved": self.extraction_bytes_saved
+            },
+            "image_index": (
+                await asyncio.to_thread(self.image_index.get_stats) if self.image_index is not None else None
+            ),
+            "search_pool": self.search_service.get_pool_stats(),
+            "search_cache": await self.search_service.get_cache_stats()
+        }
+    
+    async def analyze_file(
+        self,
+        file_path: FileSource,
+        file_type: str,
+        content_hash: Optional[str] = None
+    ) -> AnalysisResult:
         """
         Analyze a file through the complete pipeline
         
         Args:
-            file_path: Path to the file
+            file_path: Path to the file, or its bytes / open binary file object
             file_type: File extension
+            content_hash: SHA-256 of the file if already computed (e.g. while saving)
             
         Returns:
             AnalysisResult with findings
         """
-        # Step 1: Extract content
-        content = self.extractor_service.extract_text(file_path, file_type)
+        content_hash = content_hash or hash_file(file_path)
+        cache_key = self.file_cache_key(file_path, file_type, content_hash)
+        found, cached = await self.verdict_cache.aget(cache_key)
+        if found:
+            print("[AnalyzerService] Verdict cache hit for file", flush=True)
+            # The cached object is shared; callers get their own copy
+            return cached.model_copy(deep=True)
+        
+        result = await self._run_once(
+            cache_key, lambda: self._analyze_file_uncached(file_path, file_type, content_hash)
+        )
+        return result.model_copy(deep=True)
+    
+    async def _analyze_file_uncached(
+        self,
+        file_path: FileSource,
+        file_type: str,
+        content_hash: str
+    ) -> AnalysisResult:
+        """Run the full file pipeline without consulting the verdict cache"""
+        # Step 1: Extract content (on the extraction pool, off the event loop)
+        # Only as much of a PDF as fits the analysis budget is read; the budget is
+        # several prompts long, so the prompt budget still chooses among its sentences
+        max_content_length = settings.MAX_ANALYSIS_CHARS
+        if settings.DOCUMENT_ANALYSIS_MODE == "chunked":
+            max_content_length = settings.CHUNK_CHARS * settings.CHUNK_MAX_CHUNKS
+        extracted = await self._extract(
+            file_path,
+            file_type,
+            content_hash,
+            max_chars=max_content_length if settings.PDF_EXTRACTION_MODE == "budget" else None
+        )
+        # Long content is cut to the prompt token budget by GeminiService
+        content = extracted.text
+        
+        result = None
+        if settings.DOCUMENT_ANALYSIS_MODE == "claims" and len(content) >= settings.DOCUMENT_MIN_CHARS:
+            print("[AnalyzerService] Step 2+3: Verifying extracted claims", flush=True)
+            result = await self._analyze_claims(content)
+        elif settings.DOCUMENT_ANALYSIS_MODE == "chunked":
+            print("[AnalyzerService] Step 2+3: Analyzing document in chunks", flush=True)
+            result = await self._analyze_chunked(content)
+        
+        if result is None:
+            print(f"[AnalyzerService] Step 2+3: Web search (enabled: {self.use_web_search}) and Gemini", flush=True)
+            
+            # Step 2 + 3: Web search for verification (if enabled) and Gemini analysis
+            analysis, search_context, pipeline_path = await self._search_and_analyze(content)
+            
+            print(f"[AnalyzerService] Step 4: Parsing results (analysis length: {len(analysis)})", flush=True)
+            
+            # Step 4: Parse results
+            result = self._parse_analysis(content, analysis, search_context)
+            result.metadata = {**(result.metadata or {}), "pipeline_path": pipeline_path}
+        
+        pipeline_path = result.metadata["pipeline_path"]
+        if extracted.pages_total is not None:
+            result.metadata["pages_total"] = extracted.pages_total
+            result.metadata["pages_read"] = extracted.pages_read
+            result.metadata["pages_skipped"] = extracted.pages_skipped
+        
+        print(f"[AnalyzerService] Done! Result: {result.label} (path: {pipeline_path})", flush=True)
+        return result
+    
+    async def _analyze_claims(self, content: str) -> Optional[AnalysisResult]:
+        """
+        Verify the main claims of a long document one by one
+        
+        Candidate claims are picked locally, searched concurrently under one
+        shared time budget and assessed in packed Gemini prompts (several
+        claims per call, like batch analysis). Claims with a cached verdict
+        skip both steps. The claim verdicts are reduced to one document
+        verdict with a claim-level breakdown in metadata.claim_checks.
         
-        # Truncate very long content to avoid API limits (max ~15000 chars for analysis)
-        max_content_length = 15000
-        if len(content) > max_content_length:
-            print(f"[AnalyzerService] Content truncated from {len(content)} to {max_content_length} chars")
-            content = content[:max_content_length] + "\n\n[... content truncated for analysis ...]"
+        Args:
+            content: Document text
+            
+        Returns:
+            AnalysisResult, or None if too few claims were found or verified
+            (the caller then analyzes the document as a whole)
+        """
+        started = time.monotonic()
+        claims = extract_claims(content, max_claims=settings.CLAIM_CHECK_MAX_CLAIMS)
+        if len(claims) < 2:
+            print(f"[AnalyzerService] Only {len(claims)} checkable claims found; analyzing as a whole", flush=True)
+            return None
         
-        print(f"[AnalyzerService] Step 2: Web search (enabled: {self.use_web_search})", flush=True)
+        # Packed claim prompts differ from the single-text prompt, so their verdicts get their own keys
+        keys = [self._cache_key("claim", normalize_content(claim)) for claim in claims]
+        results: List[Optional[AnalysisResult]] = [None] * len(claims)
+        cached = [False] * len(claims)
+        pending = []
+        for index, key in enumerate(keys):
+            found, result = await self.verdict_cache.aget(key)
+            if found:
+                results[index] = result
+                cached[index] = True
+            else:
+                pending.append(index)
         
-        # Step 2: Web search for verification (if enabled)
-        search_context = ""
-        if self.use_web_search:
-            print("[AnalyzerService] Searching web for verification...", flush=True)
-            search_results = await self.search_service.verify_claim(content[:200])
-            search_context = self.search_service.format_sources_for_analysis(search_results)
-            print(f"[AnalyzerService] Web search complete, context length: {len(search_context)}", flush=True)
+        contexts = await self._search_claims([claims[index] for index in pending])
+        search_ms = round((time.monotonic() - started) * 1000, 1)
         
-        print("[AnalyzerService] Step 3: Calling Gemini API...", flush=True)
+        semaphore = asyncio.Semaphore(settings.BATCH_GEMINI_CONCURRENCY)
         
-        # Step 3: Analyze with Gemini (include search results)
-        analysis = await self.gemini_service.analyze_text_with_sources(content, search_context)
+        async def verify(group: List[int], group_contexts: List[str]):
+            async with semaphore:
+                group_results = await self.analyze_packed(
+                    [(claims[index], context) for index, context in zip(group, group_contexts)],
+                    [keys[index] for index in group],
+                    "document_claim"
+                )
+            for index, result in zip(group, group_results):
+                results[index] = result
         
-        print(f"[AnalyzerService] Step 4: Parsing results (analysis length: {len(analysis)})", flush=True)
+        size = max(settings.BATCH_PACK_SIZE, 1)
+        await asyncio.gather(*[
+            verify(pending[start:start + size], contexts[start:start + size])
+            for start in range(0, len(pending), size)
+        ])
+        verify_ms = round((time.monotonic() - started) * 1000 - search_ms, 1)
         
-        # Step 4: Parse results
-        result = self._parse_analysis(content, analysis, search_context)
+        checked = [
+            (claim, result, was_cached)
+            for claim, result, was_cached in zip(claims, results, cached)
+            if result is not None
+        ]
+        if len(checked) < 2:
+            print("[AnalyzerService] Claim verification returned too few verdicts; analyzing as a whole", flush=True)
+            return None
+        print(
+            f"[AnalyzerService] Verified {len(checked)}/{len(claims)} claims "
+            f"({len(pending)} uncached; search {search_ms}ms, verify {verify_ms}ms)",
+            flush=True
+        )
         
-        print(f"[AnalyzerService] Done! Result: {result.label}", flush=True)
+        result = self._merge_results(
+            content,
+            [(f"\"{self._preview_claim(claim)}\"", claim_result) for claim, claim_result, _ in checked],
+            "Claim-by-claim verification"
+        )
+        result.metadata = {
+            "pipeline_path": "claims",
+            "claims_found": len(claims),
+            "claims_checked": len(checked),
+            "search_ms": search_ms,
+            "verify_ms": verify_ms,
+            "claim_checks": [
+                {
+                    "claim": claim,
+                    "label": claim_result.label,
+                    "confidence": claim_result.confidence,
+                    "summary": claim_result.analysis_details,
+                    "cached": was_cached,
+                }
+                for claim, claim_result, was_cached in checked
+            ],
+        }
         return result
     
-    async def analyze_image(self, file_path: str) -> AnalysisResult:
+    async def _analyze_chunked(self, content: str) -> Optional[AnalysisResult]:
+        """
+        Analyze a long document in overlapping chunks and combine the verdicts
+        
+        Chunks run through the usual search + Gemini pipeline, at most
+        CHUNK_CONCURRENCY at a time. Each chunk's verdict is cached under the
+        hash of its text; chunk boundaries follow paragraph content, so a
+        re-uploaded edited document only re-analyzes the chunks that changed.
+        
+        Args:
+            content: Document text
+            
+        Returns:
+            AnalysisResult, or None if the document fits in one chunk or no
+            chunk could be analyzed (the caller then analyzes it as a whole)
+        """
+        started = time.monotonic()
+        chunks = split_chunks(content, settings.CHUNK_CHARS, settings.CHUNK_OVERLAP)
+        if len(chunks) < 2:
+            return None
+        if len(chunks) > settings.CHUNK_MAX_CHUNKS:
+            print(f"[AnalyzerService] Analyzing the first {settings.CHUNK_MAX_CHUNKS} of {len(chunks)} chunks", flush=True)
+        chunks_total = len(chunks)
+        chunks = chunks[:settings.CHUNK_MAX_CHUNKS]
+        
+        semaphore = asyncio.Semaphore(settings.CHUNK_CONCURRENCY)
+        
+        async def analyze_chunk(chunk) -> Tuple[AnalysisResult, bool, float]:
+            key = self._cache_key("chunk", hashlib.sha256(chunk.text.encode("utf-8")).hexdigest())
+            found, cached = await self.verdict_cache.aget(key)
+            if found:
+                return cached, True, 0.0
+            
+            async def run() -> AnalysisResult:
+                async with semaphore:
+                    analysis, search_context, _ = await self._search_and_analyze(chunk.text)
+                return self._parse_analysis(chunk.text, analysis, search_context)
+            
+            chunk_started = time.monotonic()
+            result = await self._run_once(key, run)
+            return result, False, round((time.monotonic() - chunk_started) * 1000, 1)
+        
+        outcomes = await asyncio.gather(*[analyze_chunk(chunk) for chunk in chunks], return_exceptions=True)
+        
+        parts = []
+        weights = []
+        timings = []
+        for chunk, outcome in zip(chunks, outcomes):
+            entry = {"index": chunk.index, "start": chunk.start, "end": chunk.end}
+            if isinstance(outcome, BaseException):
+                print(f"[AnalyzerService] Chunk {chunk.index + 1} failed: {outcome}", flush=True)
+                timings.append({**entry, "error": str(outcome)})
+                continue
+            result, was_cached, elapsed_ms = outcome
+            timings.append({
+                **entry,
+                "label": result.label,
+                "confidence": result.confidence,
+                "ms": elapsed_ms,
+                "cached": was_cached,
+            })
+            if result.analysis_details and self.gemini_service.is_failure(result.analysis_details):
+                continue
+            parts.append((f"Part {chunk.index + 1} (characters {chunk.start}-{chunk.end})", result))
+            weights.append(chunk.end - chunk.start)
+        
+        if not parts:
+            if any(isinstance(outcome, OverloadedError) for outcome in outcomes):
+                raise next(outcome for outcome in outcomes if isinstance(outcome, OverloadedError))
+            print("[AnalyzerService] No chunk could be analyzed; analyzing as a whole", flush=True)
+            return None
+        
+        total_ms = round((time.monotonic() - started) * 1000, 1)
+        cached_count = sum(1 for timing in timings if timing.get("cached"))
+        print(
+            f"[AnalyzerService] Analyzed {len(parts)}/{len(chunks)} chunks "
+            f"({cached_count} cached) in {total_ms}ms",
+            flush=True
+        )
+        
+        result = self._merge_results(content, parts, "Section-by-section analysis", weights)
+        result.metadata = {
+            "pipeline_path": "chunked",
+            "chunks_total": chunks_total,
+            "chunks_analyzed": len(parts),
+            "chunks_cached": cached_count,
+            "total_ms": total_ms,
+            "chunks": timings,
+        }
+        return result
+    
+    async def _search_claims(self, claims: List[str]) -> List[str]:
+        """
+        Search the web for several claims concurrently under one shared deadline
+        
+        Returns the formatted sources per claim; claims whose search failed
+        or did not finish within CLAIM_CHECK_SEARCH_BUDGET get none.
+        """
+        if not self.use_web_search or not claims:
+            return [""] * len(claims)
+        
+        semaphore = asyncio.Semaphore(settings.CLAIM_CHECK_SEARCH_CONCURRENCY)
+        
+        async def search(claim: str) -> str:
+            async with semaphore:
+                return await self.search_sources(claim)
+        
+        tasks = [asyncio.create_task(search(claim)) for claim in claims]
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=settings.CLAIM_CHECK_SEARCH_BUDGET)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+        for task in pending:
+            task.cancel()
+        if pending:
+            print(
+                f"[AnalyzerService] {len(pending)}/{len(tasks)} claim searches missed the "
+                f"{settings.CLAIM_CHECK_SEARCH_BUDGET}s budget",
+                flush=True
+            )
+        return [
+            task.result() if task in done and task.exception() is None else ""
+            for task in tasks
+        ]
+    
+    def _merge_results(
+        self,
+        content: str,
+        parts: List[Tuple[str, AnalysisResult]],
+        heading: str,
+        weights: Optional[List[float]] = None
+    ) -> AnalysisResult:
+        """
+        Reduce the verdicts of parts of a document (claims, chunks) to one result
+        
+        Args:
+            content: Document text
+            parts: List of (part title, part result)
+            heading: Heading of the part-by-part breakdown in analysis_details
+            weights: Optional weight of each part's verdict
+            
+        Returns:
+            AnalysisResult whose reasons lead with the most severe parts
+        """
+        label, confidence = reduce_verdicts([(result.label, result.confidence) for _, result in parts], weights)
+        
+        # Most severe, most confident parts first
+        severity = {name: rank for rank, name in enumerate(SEVERE_LABELS)}
+        ranked = sorted(
+            parts,
+            key=lambda item: (severity.get(item[1].label, len(severity)), -item[1].confidence)
+        )
+        reasons = []
+        for title, result in ranked[:5]:
+            reason = result.reasons[0] if result.reasons else ""
+            reasons.append(f"{title} ({result.label.replace('_', ' ')}): {reason}")
+        
+        tips = []
+        for _, result in ranked:
+            for tip in result.tips:
+                if tip not in tips:
+                    tips.append(tip)
+        
+        lines = [f"## {heading}"]
+        for title, result in parts:
+            lines.append(f"\n### {title}")
+            lines.append(f"**{result.label.replace('_', ' ').title()}** (confidence {result.confidence:.0%})")
+            if result.analysis_details:
+                lines.append(result.analysis_details)
+        
+        return AnalysisResult(
+            label=label,
+            confidence=confidence,
+            content_preview=self.preview(content),
+            reasons=reasons,
+            tips=tips[:4] if tips else [
+                "Cross-reference with reputable news sources",
+                "Check the date and context of the information",
+                "Look for primary sources and official statements"
+            ],
+            analysis_details="\n".join(lines)
+        )
+    
+    @staticmethod
+    def _preview_claim(claim: str) -> str:
+        """Shorten a claim for use inside a reason line"""
+        return claim[:120] + "..." if len(claim) > 120 else claim
+    
+    async def _extract(
+        self,
+        file_path: FileSource,
+        file_type: str,
+        content_hash: str,
+        max_chars: Optional[int] = None
+    ) -> ExtractedText:
+        """
+        Extract a file's text, reusing an earlier extraction of the same bytes
+        
+        Args:
+            file_path: Path to file, or its bytes / open binary file object
+            file_type: File extension
+            content_hash: SHA-256 of the file
+            max_chars: PDF extraction budget (part of the cache key)
+            
+        Returns:
+            ExtractedText
+        """
+        raw = f"{EXTRACTOR_VERSION}|{file_type.lower()}|{max_chars}|{content_hash}"
+        key = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+        found, entry = await self.extraction_cache.aget(key)
+        if found:
+            self.extraction_bytes_saved += entry["source_bytes"]
+            print(f"[AnalyzerService] Extraction cache hit ({entry['source_bytes']} bytes not re-extracted)", flush=True)
+            return ExtractedText(entry["text"], entry["pages_total"], entry["pages_read"])
+        
+        size = source_size(file_path)
+        extracted = await self.extraction_pool.extract(file_path, file_type, max_chars=max_chars)
+        self.extraction_cache.set(key, {
+            "text": extracted.text,
+            "pages_total": extracted.pages_total,
+            "pages_read": extracted.pages_read,
+            "source_bytes": size
+        })
+        return extracted
+    
+    async def analyze_image(self, file_path: FileSource, content_hash: Optional[str] = None) -> AnalysisResult:
         """
         Analyze an image through Gemini Vision
         
         Args:
-            file_path: Path to image file
+            file_path: Path to image file, or its bytes / open binary file object
+            content_hash: SHA-256 of the file if already computed (e.g. while saving)
             
         Returns:
             AnalysisResult with findings
         """
-        # Open image
-        with open(file_path, 'rb') as f:
-            image_data = f.read()
+        cache_key = self.file_cache_key(file_path, "image", content_hash)
+        found, cached = await self.verdict_cache.aget(cache_key)
+        if found:
+            print("[AnalyzerService] Verdict cache hit for image", flush=True)
+            return cached.model_copy(deep=True)
+        
+        result = await self._run_once(cache_key, lambda: self._analyze_image_uncached(file_path))
+        return result.model_copy(deep=True)
+    
+    async def _analyze_image_uncached(self, file_path: FileSource) -> AnalysisResult:
+        """Run Gemini Vision without consulting the verdict cache, reusing near-duplicate verdicts"""
+        hashes = None
+        image = None
+        text = None
+        text_task = None
+        if self.image_index is not None:
+            if not isinstance(file_path, (str, bytes)):
+                # OCR and Gemini may read the image concurrently; a shared file object would race
+                file_path = await asyncio.to_thread(lambda: open_source(file_path).read())
+            try:
+                # One decode serves both the hashes and the Gemini request
+                image = await asyncio.to_thread(self.gemini_service.prepare_image, file_path)
+                hashes = await asyncio.to_thread(image_hashes, image.image)
+                matches = await asyncio.to_thread(self.image_index.find, *hashes)
+            except Exception as e:
+                print(f"[AnalyzerService] Perceptual hash lookup failed: {e}", flush=True)
+                hashes = None
+                matches = []
+            if matches:
+                # Similar-looking images (e.g. text screenshots) can say different things
+                text = await self._image_text(file_path)
+                match = next((m for m in matches if text is not None and m.text == text), None)
+                if match is not None:
+                    return self._near_duplicate_result(match)
+                print(f"[AnalyzerService] {len(matches)} similar image(s) rejected: text differs", flush=True)
+            elif hashes is not None:
+                # OCR alongside Gemini, so the index entry can be confirmed by text later
+                text_task = asyncio.create_task(self._image_text(file_path))
         
         # Analyze with Gemini Vision
-        analysis = await self.gemini_service.analyze_image(file_path)
+        try:
+            analysis = await self.gemini_service.analyze_image(image if image is not None else file_path)
+        except BaseException:
+            if text_task is not None:
+                text_task.cancel()
+            raise
         
         # Parse results
         result = self._parse_analysis("Image content analysis", analysis)
-        
+        if hashes is not None:
+            if text_task is not None:
+                text = await text_task
+            if not self.gemini_service.is_failure(analysis):
+                try:
+                    await asyncio.to_thread(self.image_index.add, *hashes, result.model_dump_json(), text)
+                except Exception as e:
+                    print(f"[AnalyzerService] Could not index image hash: {e}", flush=True)
+        return result
+    
+    async def _image_text(self, file_path: FileSource) -> Optional[str]:
+        """Normalized OCR text of an image, or None if OCR failed"""
+        try:
+            extracted = await self.extraction_pool.extract(file_path, "png")
+        except Exception as e:
+            print(f"[AnalyzerService] OCR for image matching failed: {e}", flush=True)
+            return None
+        return " ".join(re.findall(r"\w+", extracted.text.casefold()))
+    
+    def _near_duplicate_result(self, match: ImageMatch) -> AnalysisResult:
+        """Verdict of a stored image confirmed as a near duplicate"""
+        print(
+            f"[AnalyzerService] Near-duplicate image found "
+            f"(distance {match.distance}, detail distance {match.detail_distance})",
+            flush=True
+        )
+        result = AnalysisResult.model_validate_json(match.payload)
+        result.metadata = {
+            **(result.metadata or {}),
+            "near_duplicate": {
+                "match_id": match.row_id,
+                "distance": match.distance,
+                "detail_distance": match.detail_distance,
+                "score": round(1 - match.detail_distance / 256, 4)
+            }
+        }
         return result
     
     async def analyze_text(self, content: str) -> AnalysisResult:
@@ -97,36 +743,270 @@ class AnalyzerService:
         Returns:
             AnalysisResult with findings
         """
-        # Step 1: Web search for verification (if enabled)
-        search_context = ""
-        if self.use_web_search:
-            search_results = await self.search_service.verify_claim(content[:200])
-            search_context = self.search_service.format_sources_for_analysis(search_results)
+        cache_key = self.text_cache_key(content)
+        found, cached = await self.verdict_cache.aget(cache_key)
+        if found:
+            # Same claim modulo whitespace/case: reuse the verdict, keep this submission's preview
+            return cached.model_copy(update={"content_preview": self.preview(content)}, deep=True)
         
-        # Step 2: Analyze with Gemini (include search results)
-        analysis = await self.gemini_service.analyze_text_with_sources(content, search_context)
+        similar = await self._find_similar_claim(content)
+        if similar is not None:
+            return similar
+        
+        result = await self._run_once(cache_key, lambda: self._analyze_text_uncached(content))
+        # Coalesced waiters may have submitted a differently formatted copy of the claim
+        return result.model_copy(update={"content_preview": self.preview(content)}, deep=True)
+    
+    async def analyze_text_stream(self, content: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Analyze raw text content, yielding progress events as they happen
+        
+        Events:
+            sources: web search results, as soon as verification finishes
+            chunk: a piece of Gemini output text
+            result: the final AnalysisResult (also sent alone on a cache hit)
+            error: the request was rejected (Gemini is overloaded; retry_after
+                is set) or the analysis failed, possibly after some chunks
+        
+        Streaming requests are not coalesced, but they read and fill the
+        verdict cache and the claim index like analyze_text(). A failed
+        stream fills neither, since its chunks are an incomplete analysis.
+        
+        Args:
+            content: Text to analyze
+            
+        Yields:
+            Event dictionaries
+        """
+        cache_key = self.text_cache_key(content)
+        found, cached = await self.verdict_cache.aget(cache_key)
+        if found:
+            result = cached.model_copy(update={"content_preview": self.preview(content)})
+            yield {"event": "result", "cached": True, "data": result.model_dump()}
+            return
+        
+        similar = await self._find_similar_claim(content)
+        if similar is not None:
+            yield {"event": "result", "cached": True, "data": similar.model_dump()}
+            return
+        
+        try:
+            search_context = ""
+            if self.use_web_search:
+                search_results = await self._verify(content)
+                search_context = self.search_service.format_sources_for_analysis(search_results)
+                yield {"event": "sources", "data": search_results}
+            
+            chunks = []
+            async for text in self.gemini_service.stream_text_with_sources(content, search_context):
+                chunks.append(text)
+                yield {"event": "chunk", "text": text}
+        except OverloadedError as e:
+            yield {"event": "error", "detail": str(e), "retry_after": e.retry_after}
+            return
+        except StreamError as e:
+            yield {"event": "error", "detail": str(e), "retry_after": None}
+            return
+        
+        analysis = "".join(chunks)
+        result = self._parse_analysis(content, analysis, search_context)
+        result.metadata = {**(result.metadata or {}), "pipeline_path": "streamed"}
+        self._store_verdict(cache_key, result)
+        if not self.gemini_service.is_failure(analysis):
+            await self._index_claim(content, result)
+        yield {"event": "result", "cached": False, "data": result.model_dump()}
+    
+    async def _analyze_text_uncached(self, content: str) -> AnalysisResult:
+        """Run the full text pipeline without consulting the verdict cache"""
+        # Step 1 + 2: Web search for verification (if enabled) and Gemini analysis
+        analysis, search_context, pipeline_path = await self._search_and_analyze(content)
         
         # Step 3: Parse results
         result = self._parse_analysis(content, analysis, search_context)
+        result.metadata = {**(result.metadata or {}), "pipeline_path": pipeline_path}
+        
+        if not self.gemini_service.is_failure(analysis):
+            await self._index_claim(content, result)
+        return result
+    
+    async def _index_claim(self, content: str, result: AnalysisResult):
+        """Add an analyzed claim to the similar-claim index (hashing runs off the event loop)"""
+        if self.claim_index is not None:
+            await asyncio.to_thread(self.claim_index.add, content, result.model_copy(deep=True))
+    
+    async def _find_similar_claim(self, content: str) -> Optional[AnalysisResult]:
+        """Reuse the verdict of a previously analyzed reworded claim, if one is similar enough"""
+        if self.claim_index is None:
+            return None
+        # MinHash and the index lock are blocking work
+        match = await asyncio.to_thread(self.claim_index.find, content)
+        if match is None:
+            return None
+        score, prior = match
+        print(f"[AnalyzerService] Similar claim found (similarity {score})", flush=True)
+        # The indexed result is shared; callers get their own copy
+        result = prior.model_copy(deep=True)
+        result.content_preview = self.preview(content)
+        result.metadata = {
+            **(result.metadata or {}),
+            "similar_claim": {"score": score, "matched_preview": prior.content_preview[:200]}
+        }
+        return result
+    
+    async def _verify(self, content: str) -> Dict[str, Any]:
+        """Run web verification for content"""
+        return await self.search_service.verify_claim(search_query(content))
+    
+    async def search_sources(self, content: str) -> str:
+        """Run web verification for content and format the sources for the prompt"""
+        search_results = await self._verify(content)
+        return self.search_service.format_sources_for_analysis(search_results)
+    
+    async def analyze_with_sources(
+        self,
+        content: str,
+        search_context: str,
+        cache_key: str,
+        pipeline_path: str
+    ) -> AnalysisResult:
+        """
+        Analyze text against sources already gathered, with one Gemini call
+        
+        The verdict is cached under ``cache_key`` unless the call failed.
         
+        Args:
+            content: Text to analyze
+            search_context: Formatted web sources (empty for none)
+            cache_key: Verdict cache key to store the result under
+            pipeline_path: Recorded in metadata.pipeline_path
+            
+        Returns:
+            AnalysisResult (a fallback result if the Gemini call failed; see is_fallback())
+        """
+        analysis = await self.gemini_service.analyze_text_with_sources(content, search_context)
+        result = self._parse_analysis(content, analysis, search_context)
+        result.metadata = {**(result.metadata or {}), "pipeline_path": pipeline_path}
+        self._store_verdict(cache_key, result)
         return result
     
+    async def analyze_packed(
+        self,
+        items: List[Tuple[str, str]],
+        cache_keys: List[str],
+        pipeline_path: str
+    ) -> List[Optional[AnalysisResult]]:
+        """
+        Assess several short claims with one packed Gemini call
+        
+        Each verdict is cached under its key.
+        
+        Args:
+            items: List of (claim text, formatted web sources) pairs
+            cache_keys: Verdict cache key of each claim
+            pipeline_path: Recorded in metadata.pipeline_path
+            
+        Returns:
+            One result per item, or None where the response had nothing
+            usable for it (all None if the call failed)
+        """
+        verdicts = await self.gemini_service.analyze_batch(items)
+        results: List[Optional[AnalysisResult]] = []
+        for (claim, search_context), key, verdict in zip(items, cache_keys, verdicts):
+            if verdict is None:
+                results.append(None)
+                continue
+            result = self._result_from_structured(claim, verdict, search_context)
+            result.metadata = {"pipeline_path": pipeline_path}
+            self._store_verdict(key, result)
+            results.append(result)
+        return results
+    
+    async def _search_and_analyze(self, content: str) -> Tuple[str, str, str]:
+        """
+        Run web search and Gemini analysis according to ANALYSIS_PIPELINE_MODE
+        
+        sequential: search first, then one source-aware Gemini call.
+        speculative: start a no-sources Gemini call at the same time as the
+        search. If the search yields nothing within SPECULATIVE_SEARCH_DEADLINE
+        the speculative analysis is used as is. Otherwise SPECULATIVE_POLICY
+        decides: "refine" runs a second, source-aware call; "append" keeps the
+        speculative analysis and attaches the sources to its details.
+        
+        Args:
+            content: Text to analyze
+            
+        Returns:
+            Tuple of (analysis text, search context, pipeline path taken)
+        """
+        if not self.use_web_search:
+            analysis = await self.gemini_service.analyze_text_with_sources(content, "")
+            return analysis, "", "no_search"
+        
+        if settings.ANALYSIS_PIPELINE_MODE != "speculative":
+            search_context = await self.search_sources(content)
+            analysis = await self.gemini_service.analyze_text_with_sources(content, search_context)
+            return analysis, search_context, "sequential"
+        
+        search_task = asyncio.create_task(self.search_sources(content))
+        speculative_task = asyncio.create_task(
+            self.gemini_service.analyze_text_with_sources(content, "")
+        )
+        try:
+            try:
+                search_context = await asyncio.wait_for(
+                    asyncio.shield(search_task), settings.SPECULATIVE_SEARCH_DEADLINE
+                )
+            except asyncio.TimeoutError:
+                search_task.cancel()
+                search_context = ""
+            
+            if not search_context:
+                return await speculative_task, "", "speculative_no_sources"
+            
+            if settings.SPECULATIVE_POLICY == "append":
+                return await speculative_task, search_context, "speculative_appended"
+            
+            # The speculative call cannot be stopped once in flight; just stop waiting for it
+            speculative_task.cancel()
+            analysis = await self.gemini_service.analyze_text_with_sources(content, search_context)
+            return analysis, search_context, "speculative_refined"
+        finally:
+            for task in (search_task, speculative_task):
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    # Abandoned tasks may have failed (e.g. overloaded); don't leave it unretrieved
+                    task.exception()
+    
     def _parse_analysis(self, content: str, analysis: str, search_context: str = "") -> AnalysisResult:
         """
         Parse Gemini analysis into structured format
         
         Args:
             content: Original content
-            analysis: Gemini analysis text
+            analysis: Gemini analysis text (markdown, or a JSON verdict in json output mode)
             search_context: Web search results context
             
         Returns:
             Structured AnalysisResult
         """
-        # Parse the structured response
-        label, confidence = self._extract_reliability(analysis)
-        reasons = self._extract_reasons(analysis)
-        tips = self._extract_tips(analysis)
+        verdict = decode_verdict(analysis)
+        if verdict is not None:
+            try:
+                structured = StructuredVerdict.model_validate(verdict)
+            except ValidationError as e:
+                print(f"[AnalyzerService] Invalid JSON verdict, parsing as text: {e.error_count()} errors", flush=True)
+            else:
+                result = self._result_from_structured(content, structured.model_dump(mode="json"), search_context)
+                if structured.claims:
+                    result.metadata = {"claims": structured.claims}
+                return result
+        
+        # One pass over the text builds the section tree every field is read from
+        parsed = parse_analysis(analysis)
+        label, confidence = verdict_classifier.classify(analysis, parsed.assessment_span)
+        reasons = parsed.reasons
+        tips = parsed.tips
         
         # Add search context to analysis details if available
         full_analysis = analysis
@@ -136,144 +1016,64 @@ class AnalyzerService:
         return AnalysisResult(
             label=label,
             confidence=confidence,
-            content_preview=content[:300] + "..." if len(content) > 300 else content,
+            content_preview=self.preview(content),
             reasons=reasons if reasons else ["Analysis completed. See details below."],
             tips=tips if tips else [
-                "Cross-reference with reputable news sources",
-                "Check the date and context of the information",
-                "Look for primary sources and official statements"
+                "Verify claims through multiple reputable sources",
+                "Check the original source and publication date",
+                "Look for expert opinions and fact-checker assessments",
+                "Consider the context and potential biases"
             ],
             analysis_details=full_analysis
         )
     
-    def _extract_reliability(self, analysis: str) -> Tuple[str, float]:
-        """Extract reliability label and confidence from analysis"""
-        analysis_lower = analysis.lower()
-        
-        # FIRST: Check for NEGATIVE indicators in the FULL text
-        # These should take priority to avoid false positives
-        
-        # Check for SPECULATIVE / UNVERIFIABLE content
-        if any(phrase in analysis_lower for phrase in [
-            'speculative', 'speculation', 'cannot be verified', 'unverifiable',
-            'no credible evidence', 'lacks any factual basis', 'unfounded',
-            'no evidence', 'lacks evidence', 'not based on facts',
-            'potentially defamatory', 'defamatory', 'rumor', 'rumors',
-            'innuendo', 'malicious', 'cannot be verified because',
-            'dismissing it as', 'unfounded speculation'
-        ]):
-            return "needs_verification", 0.70
-        
-        # Check for POTENTIALLY FALSE indicators
-        if any(phrase in analysis_lower for phrase in [
-            'potentially false', 'is false', 'appears false', 'likely false',
-            'misinformation', 'disinformation', 'fake', 'hoax', 'fabricated',
-            'not true', 'untrue', 'debunked', 'false claim', 'conspiracy'
-        ]):
-            return "potentially_false", 0.85
-        
-        # Check for UNRELIABLE indicators  
-        if any(phrase in analysis_lower for phrase in [
-            'unreliable', 'not reliable', 'cannot be trusted', 'untrustworthy',
-            'no credible sources', 'spread rumors'
-        ]):
-            return "potentially_false", 0.75
-        
-        # Check for DOUBTFUL indicators
-        if any(phrase in analysis_lower for phrase in [
-            'doubtful', 'questionable', 'suspicious', 'misleading',
-            'partially true', 'mixed', 'some truth', 'lacks credibility',
-            'political bias', 'personal animosity', 'damage reputation'
-        ]):
-            return "doubtful", 0.65
-        
-        # NOW check for POSITIVE indicators (only if no negative found)
-        
-        # Check for clearly RELIABLE content
-        if any(phrase in analysis_lower for phrase in [
-            'is reliable', 'appears reliable', 'highly reliable',
-            'is accurate', 'appears accurate', 'is credible',
-            'is true', 'this is true', 'factually correct',
-            'well-established fact', 'universally accepted', 'universally recognized',
-            'definitive answer', 'confirmed fact', 'verified fact',
-            'no factual errors', 'there are no factual errors', 
-            'inherently verifiable', 'established scientific',
-            'fundamental aspect', 'basic fact', 'scientifically accurate',
-            'common knowledge', 'widely accepted'
-        ]):
-            return "reliable", 0.85
-        
-        # Check for NEEDS VERIFICATION 
-        if any(phrase in analysis_lower for phrase in [
-            'needs verification', 'requires verification', 'unverified claim',
-            'insufficient evidence', 'unclear', 'need more context'
-        ]):
-            return "needs_verification", 0.55
-        
-        # Default fallback - if we can't determine, it needs verification
-        return "needs_verification", 0.50
-    
-    def _extract_reasons(self, analysis: str) -> List[str]:
-        """Extract reasons from analysis"""
-        reasons = []
-        lines = analysis.split('\n')
+    def _result_from_structured(
+        self,
+        content: str,
+        verdict: Dict[str, Any],
+        search_context: str = ""
+    ) -> AnalysisResult:
+        """
+        Build an AnalysisResult from a structured (JSON) Gemini verdict
         
-        in_reasons_section = False
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Check for section headers
-            if any(keyword in line.lower() for keyword in ['reason', 'finding', 'issue', 'concern', 'red flag', 'key claim']):
-                in_reasons_section = True
-                continue
-            
-            # Extract bullet points
-            if in_reasons_section and (line.startswith('-') or line.startswith('•') or line.startswith('*') or re.match(r'^\d+\.', line)):
-                reason = re.sub(r'^[-•*\d.]+\s*', '', line).strip()
-                if reason and len(reason) > 10:
-                    reasons.append(reason)
-                    if len(reasons) >= 5:
-                        break
+        Args:
+            content: Original content
+            verdict: Dict with assessment, confidence, reasons, tips, summary
+            search_context: Web search results context
             
-            # Stop if we hit a new section
-            if in_reasons_section and ':' in line and not line.startswith('-'):
-                in_reasons_section = False
+        Returns:
+            Structured AnalysisResult
+        """
+        label = str(verdict.get("assessment", "")).strip().lower().replace(" ", "_")
+        if label not in {item.value for item in ReliabilityLabel}:
+            label = ReliabilityLabel.NEEDS_VERIFICATION.value
         
-        return reasons[:5]
-    
-    def _extract_tips(self, analysis: str) -> List[str]:
-        """Extract verification tips from analysis"""
-        tips = []
-        lines = analysis.split('\n')
+        try:
+            confidence = min(max(float(verdict.get("confidence", 0.5)), 0.0), 1.0)
+        except (TypeError, ValueError):
+            confidence = 0.5
         
-        in_tips_section = False
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Check for section headers
-            if any(keyword in line.lower() for keyword in ['recommendation', 'tip', 'suggestion', 'verification']):
-                in_tips_section = True
-                continue
-            
-            # Extract bullet points
-            if in_tips_section and (line.startswith('-') or line.startswith('•') or line.startswith('*') or re.match(r'^\d+\.', line)):
-                tip = re.sub(r'^[-•*\d.]+\s*', '', line).strip()
-                if tip and len(tip) > 10:
-                    tips.append(tip)
-                    if len(tips) >= 4:
-                        break
+        reasons = [str(reason) for reason in verdict.get("reasons") or [] if reason][:5]
+        tips = [str(tip) for tip in verdict.get("tips") or [] if tip][:4]
         
-        # Default tips if none found
-        if not tips:
-            tips = [
-                "Verify claims through multiple reputable sources",
-                "Check the original source and publication date",
-                "Look for expert opinions and fact-checker assessments",
-                "Consider the context and potential biases"
-            ]
+        full_analysis = str(verdict.get("summary") or "")
+        if search_context:
+            full_analysis += "\n\n---\n📡 WEB VERIFICATION SOURCES:\n" + search_context
         
-        return tips[:4]
+        return AnalysisResult(
+            label=label,
+            confidence=confidence,
+            content_preview=self.preview(content),
+            reasons=reasons if reasons else ["Analysis completed. See details below."],
+            tips=tips if tips else [
+                "Cross-reference with reputable news sources",
+                "Check the date and context of the information",
+                "Look for primary sources and official statements"
+            ],
+            analysis_details=full_analysis
+        )
+    
+    @staticmethod
+    def preview(content: str) -> str:
+        """Build the content preview shown with a result"""
+        return content[:300] + "..." if len(content) > 300 else content
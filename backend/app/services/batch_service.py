@@ -0,0 +1,216 @@
+"""
+Batch analysis service
+Checks many claims at once with deduplication, bounded concurrency
+and packing of short claims into shared Gemini prompts
+"""
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from app.config import settings
+from app.models import AnalysisResult
+
+
+class BatchService:
+    """Service that runs many text analyses as one batch"""
+
+    def __init__(self, analyzer_service):
+        """
+        Initialize batch service
+
+        Args:
+            analyzer_service: AnalyzerService whose cache, search and Gemini services are shared
+        """
+        self.analyzer = analyzer_service
+        self.search_service = analyzer_service.search_service
+
+    async def analyze_batch(self, contents: List[str], pack: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Analyze a list of texts, yielding results as they finish
+
+        Identical items (modulo whitespace/case) are analyzed once. Cached
+        verdicts are returned immediately: full single-prompt verdicts
+        (shared with analyze_text) first, then verdicts from earlier packed
+        prompts, which are cached under their own keys so single-text
+        requests never receive them. Web searches run with bounded
+        concurrency; short claims are packed several to a Gemini prompt
+        with a structured per-claim response, longer ones (and packed
+        claims the model did not answer) are analyzed individually.
+
+        Args:
+            contents: Texts to analyze
+            pack: Allow packing short claims into shared prompts
+
+        Yields:
+            "item" events (one per input, in completion order) followed by
+            one "summary" event with batch statistics
+        """
+        started = time.monotonic()
+        search_requests_before = self.search_service.request_count
+        stats = {
+            "items": len(contents),
+            "unique_items": 0,
+            "duplicates": 0,
+            "cache_hits": 0,
+            "gemini_calls": 0,
+            "gemini_requests": 0,
+            "packed_calls": 0,
+            "packed_items": 0,
+            "errors": 0,
+        }
+
+        # Group identical items under their first occurrence
+        groups: Dict[str, List[int]] = {}
+        for index, content in enumerate(contents):
+            groups.setdefault(self.analyzer.text_cache_key(content), []).append(index)
+        stats["unique_items"] = len(groups)
+        stats["duplicates"] = len(contents) - len(groups)
+
+        pending: List[Tuple[str, List[int]]] = []
+        for key, indices in groups.items():
+            found, cached = await self.analyzer.verdict_cache.aget(key)
+            if not found:
+                found, cached = await self.analyzer.verdict_cache.aget(
+                    self.analyzer.batch_cache_key(contents[indices[0]])
+                )
+            if found:
+                stats["cache_hits"] += 1
+                for event in self._item_events(contents, indices, cached, started, cached=True):
+                    yield event
+            else:
+                pending.append((key, indices))
+
+        search_semaphore = asyncio.Semaphore(settings.BATCH_SEARCH_CONCURRENCY)
+        gemini_semaphore = asyncio.Semaphore(settings.BATCH_GEMINI_CONCURRENCY)
+
+        async def search(content: str) -> str:
+            if not self.analyzer.use_web_search:
+                return ""
+            async with search_semaphore:
+                return await self.analyzer.search_sources(content)
+
+        async def analyze_single(key: str, content: str, search_context: str) -> AnalysisResult:
+            async with gemini_semaphore:
+                result = await self.analyzer.analyze_with_sources(content, search_context, key, "batch_single")
+            stats["gemini_requests"] += 1
+            # Failed calls come back as fallback results; only answered calls are counted
+            if not self.analyzer.is_fallback(result):
+                stats["gemini_calls"] += 1
+            return result
+
+        async def run_single(key: str, indices: List[int]) -> List[Dict[str, Any]]:
+            content = contents[indices[0]]
+            search_context = await search(content)
+            result = await analyze_single(key, content, search_context)
+            return self._item_events(contents, indices, result, started)
+
+        async def run_pack(members: List[Tuple[str, List[int]]]) -> List[Dict[str, Any]]:
+            member_contents = [contents[indices[0]] for _, indices in members]
+            contexts = await asyncio.gather(*[search(content) for content in member_contents])
+            async with gemini_semaphore:
+                # Packed verdicts are summaries, not full analyses: keep them off the text keys
+                results = await self.analyzer.analyze_packed(
+                    list(zip(member_contents, contexts)),
+                    [self.analyzer.batch_cache_key(content) for content in member_contents],
+                    "batch_packed"
+                )
+            stats["gemini_requests"] += 1
+            # A packed call that failed (or answered nothing usable) is not counted as answered
+            if any(result is not None for result in results):
+                stats["gemini_calls"] += 1
+                stats["packed_calls"] += 1
+
+            events = []
+            for (key, indices), content, search_context, result in zip(
+                members, member_contents, contexts, results
+            ):
+                if result is None:
+                    # The packed answer had nothing usable for this claim
+                    result = await analyze_single(key, content, search_context)
+                else:
+                    stats["packed_items"] += 1
+                events.extend(self._item_events(contents, indices, result, started))
+            return events
+
+        async def guarded(work, members: List[Tuple[str, List[int]]]) -> List[Dict[str, Any]]:
+            try:
+                return await work
+            except Exception as e:
+                print(f"[BatchService] Batch task failed: {e}", flush=True)
+                stats["errors"] += sum(len(indices) for _, indices in members)
+                latency_ms = round((time.monotonic() - started) * 1000, 1)
+                return [
+                    self._item_event(index, None, latency_ms, error=str(e), duplicate_of=indices[0])
+                    for _, indices in members
+                    for index in indices
+                ]
+
+        packable = []
+        tasks = []
+        for key, indices in pending:
+            if pack and len(contents[indices[0]]) <= settings.BATCH_PACK_MAX_CHARS:
+                packable.append((key, indices))
+            else:
+                tasks.append(guarded(run_single(key, indices), [(key, indices)]))
+        for start in range(0, len(packable), settings.BATCH_PACK_SIZE):
+            members = packable[start:start + settings.BATCH_PACK_SIZE]
+            if len(members) == 1:
+                tasks.append(guarded(run_single(*members[0]), members))
+            else:
+                tasks.append(guarded(run_pack(members), members))
+
+        for finished in asyncio.as_completed(tasks):
+            for event in await finished:
+                yield event
+
+        search_requests = self.search_service.request_count - search_requests_before
+        queries_per_item = settings.SEARCH_QUERY_COUNT if self.analyzer.use_web_search else 0
+        # One search round and one Gemini call per input is what analyzing them one by one costs
+        naive_calls = len(contents) * (1 + queries_per_item)
+        stats["search_requests"] = search_requests
+        # A packed prompt is one call however many claims it carries; failed calls still cost a call
+        stats["upstream_calls"] = stats["gemini_requests"] + search_requests
+        stats["upstream_calls_saved"] = max(naive_calls - stats["upstream_calls"], 0)
+        stats["total_ms"] = round((time.monotonic() - started) * 1000, 1)
+        yield {"event": "summary", "stats": stats}
+
+    def _item_events(
+        self,
+        contents: List[str],
+        indices: List[int],
+        result: AnalysisResult,
+        started: float,
+        cached: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Build item events for every input that shares one result"""
+        latency_ms = round((time.monotonic() - started) * 1000, 1)
+        return [
+            self._item_event(
+                index,
+                result.model_copy(update={"content_preview": self.analyzer.preview(contents[index])}),
+                latency_ms,
+                cached=cached,
+                duplicate_of=indices[0]
+            )
+            for index in indices
+        ]
+
+    @staticmethod
+    def _item_event(
+        index: int,
+        result,
+        latency_ms: float,
+        cached: bool = False,
+        error: str = None,
+        duplicate_of: int = None
+    ) -> Dict[str, Any]:
+        """Build one item event"""
+        return {
+            "event": "item",
+            "index": index,
+            "result": result.model_dump() if result is not None else None,
+            "error": error,
+            "latency_ms": latency_ms,
+            "cached": cached,
+            "duplicate_of": duplicate_of if duplicate_of != index else None,
+        }
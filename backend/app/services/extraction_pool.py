@@ -0,0 +1,314 @@
+"""
+Extraction pool
+Runs CPU-bound text extraction (PyPDF2, python-docx, OCR) off the event loop
+"""
+import asyncio
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.services.extractor_service import ExtractedText, ExtractorService
+from app.utils.concurrency import ConcurrencyLimiter
+from app.utils.sources import FileSource, open_source
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+class ExtractionTimeoutError(Exception):
+    """Raised when an extraction job runs longer than EXTRACTION_TIMEOUT"""
+
+
+def _limit_worker_memory(limit_mb: int):
+    """Process pool initializer: cap the worker's address space"""
+    if resource is None or limit_mb <= 0:
+        return
+    limit = limit_mb * 1024 * 1024
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ValueError, OSError) as e:
+        print(f"[ExtractionPool] Could not set memory limit: {e}", flush=True)
+
+
+def _extract_in_worker(source: FileSource, file_type: str, max_chars: Optional[int]) -> ExtractedText:
+    """Extract text inside a pool worker"""
+    return ExtractorService().extract_text_with_stats(source, file_type, max_chars=max_chars)
+
+
+def _extract_pdf_range_in_worker(
+    source: FileSource,
+    start: int,
+    stop: int,
+    max_chars: Optional[int]
+) -> Tuple[List[str], int]:
+    """Extract a range of PDF pages inside a pool worker"""
+    return ExtractorService.extract_pdf_pages(source, start, stop, max_chars=max_chars)
+
+
+def _spool_to_file(source: FileSource) -> str:
+    """Write bytes or a file object to a temporary file and return its path"""
+    with tempfile.NamedTemporaryFile(prefix="extract-", suffix=".pdf", delete=False) as spool:
+        if isinstance(source, bytes):
+            spool.write(source)
+        else:
+            shutil.copyfileobj(open_source(source), spool)
+    return spool.name
+
+
+class ExtractionPool:
+    """
+    Pool that extracts document text without blocking the event loop
+
+    In ``process`` mode extraction runs in worker processes with a memory
+    cap each. A job running past the timeout, or a worker that crashes,
+    retires the pool: new jobs go to a fresh pool, and the old one's
+    processes (the hung one included) are killed once the jobs still
+    running on it have finished. ``thread`` mode runs extraction in a
+    thread pool (no isolation, but still off the event loop); it cannot
+    enforce the timeout, since a thread cannot be killed: the caller gets
+    ExtractionTimeoutError but the job runs on, holding its thread (jobs
+    that then queue for that thread count the wait against their timeout).
+
+    Requests wait in the limiter's bounded queue. Jobs are only handed to
+    the executor when a worker is free, so the timeout counts running
+    time, not time spent queued behind other jobs.
+    """
+
+    def __init__(self):
+        """Initialize pool settings (workers start on first use)"""
+        self.mode = settings.EXTRACTION_MODE
+        self.workers = settings.EXTRACTION_WORKERS
+        self.timeout = settings.EXTRACTION_TIMEOUT
+        self.limiter = ConcurrencyLimiter(
+            "Extraction pool",
+            max_concurrency=self.workers,
+            max_queue=settings.EXTRACTION_MAX_QUEUE,
+            queue_timeout=settings.EXTRACTION_QUEUE_TIMEOUT,
+            retry_after=settings.EXTRACTION_RETRY_AFTER
+        )
+        # One per worker: a submitted job starts at once instead of queueing in the executor
+        self._slots = asyncio.Semaphore(self.workers)
+        self._busy = 0
+        self._executor = None
+        # Jobs running on each executor, and pools waiting for theirs to finish
+        self._jobs: Dict[object, int] = {}
+        self._retiring = set()
+        self._lock = threading.Lock()
+
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self.recycles = 0
+        self.pages_read = 0
+        self.pages_skipped = 0
+        self._total_time = 0.0
+
+    def _get_executor(self):
+        """Create the executor on first use"""
+        with self._lock:
+            if self._executor is None:
+                if self.mode == "process":
+                    # spawn: forking a process that runs an event loop and threads is unsafe
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_limit_worker_memory,
+                        initargs=(settings.EXTRACTION_MEMORY_LIMIT_MB,),
+                        max_tasks_per_child=settings.EXTRACTION_MAX_TASKS_PER_CHILD or None
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix="extract"
+                    )
+            return self._executor
+
+    def _retire(self, executor, reason: str):
+        """Replace a broken or hung pool; it is killed once its other jobs finish"""
+        with self._lock:
+            if self._executor is not executor:
+                return  # already replaced by another caller
+            self._executor = None
+            self._retiring.add(executor)
+        self.recycles += 1
+        print(f"[ExtractionPool] Recycling worker pool: {reason}", flush=True)
+
+    def _enter(self, executor):
+        """Count a job submitted to an executor"""
+        with self._lock:
+            self._jobs[executor] = self._jobs.get(executor, 0) + 1
+
+    def _leave(self, executor):
+        """Count a job as done (or given up on), killing a retired pool once it has none left"""
+        with self._lock:
+            self._jobs[executor] -= 1
+            if self._jobs[executor] or executor not in self._retiring:
+                return
+            del self._jobs[executor]
+            self._retiring.discard(executor)
+        self._terminate(executor)
+
+    @staticmethod
+    def _terminate(executor):
+        """Kill an executor's worker processes"""
+        # A hung worker never returns, so shutdown() alone would not free it
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def extract(
+        self,
+        source: FileSource,
+        file_type: str,
+        max_chars: Optional[int] = None
+    ) -> ExtractedText:
+        """
+        Extract text from a file on the pool
+
+        Args:
+            source: Path to file, or its bytes / open binary file object
+            file_type: File extension
+            max_chars: PDFs stop being read once this many characters are extracted
+
+        Returns:
+            ExtractedText with the text and, for PDFs, pages read out of the total
+
+        Raises:
+            ExtractionTimeoutError: If a job exceeded EXTRACTION_TIMEOUT
+            OverloadedError: If too many extractions are already waiting
+        """
+        parallel_pdf = file_type.lower() == 'pdf' and self.mode == "process" and settings.PDF_PAGES_PER_JOB > 0
+
+        async with self.limiter:
+            started = time.monotonic()
+            spooled = None
+            try:
+                if parallel_pdf:
+                    if not isinstance(source, str):
+                        # Range jobs share one file instead of each pickling the whole PDF
+                        source = spooled = await asyncio.to_thread(_spool_to_file, source)
+                    result = await self._extract_pdf_parallel(source, max_chars)
+                else:
+                    if self.mode == "process" and not isinstance(source, (str, bytes)):
+                        # File objects cannot be sent to another process
+                        source = await asyncio.to_thread(lambda: open_source(source).read())
+                    result = await self._run(_extract_in_worker, source, file_type, max_chars)
+            except Exception:
+                self.failed += 1
+                raise
+            finally:
+                if spooled is not None:
+                    os.unlink(spooled)
+            self.completed += 1
+            self._total_time += time.monotonic() - started
+            if result.pages_total is not None:
+                self.pages_read += result.pages_read
+                self.pages_skipped += result.pages_skipped
+            return result
+
+    async def _extract_pdf_parallel(self, source: str, max_chars: Optional[int]) -> ExtractedText:
+        """
+        Extract a PDF in page ranges spread across the workers
+
+        The first range also reports the page count. The rest are run in
+        waves, in page order, of one range per worker that is free at the
+        time (at least one), and no further waves are started once
+        ``max_chars`` characters have been collected.
+
+        Args:
+            source: Path of the PDF (jobs open it themselves)
+            max_chars: Stop once this many characters are extracted
+        """
+        per_job = settings.PDF_PAGES_PER_JOB
+        texts, total = await self._run(_extract_pdf_range_in_worker, source, 0, per_job, max_chars)
+        chars = sum(len(text) for text in texts)
+
+        next_page = per_job
+        while next_page < total and (max_chars is None or chars < max_chars):
+            remaining = None if max_chars is None else max_chars - chars
+            ranges = [
+                (start, min(start + per_job, total))
+                for start in range(next_page, total, per_job)
+            ][:max(1, self.workers - self._busy)]
+            wave = await asyncio.gather(*[
+                self._run(_extract_pdf_range_in_worker, source, start, stop, remaining)
+                for start, stop in ranges
+            ])
+            for (start, stop), (range_texts, _) in zip(ranges, wave):
+                if max_chars is not None and chars >= max_chars:
+                    break
+                texts.extend(range_texts)
+                chars += sum(len(text) for text in range_texts)
+                if len(range_texts) < stop - start:
+                    break  # the range itself stopped early on the budget
+            next_page = ranges[-1][1]
+
+        print(f"[ExtractionPool] PDF: read {len(texts)}/{total} pages ({chars} chars)", flush=True)
+        return ExtractedText("\n".join(texts), pages_total=total, pages_read=len(texts))
+
+    async def _run(self, function, *args, retry: bool = True):
+        """Run one job on a free worker, recycling the pool if it hangs or breaks"""
+        async with self._slots:
+            self._busy += 1
+            executor = self._get_executor()
+            self._enter(executor)
+            try:
+                future = executor.submit(function, *args)
+                return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                # Only a job that is still running holds a worker hostage
+                if self.mode == "process" and future.running():
+                    self._retire(executor, f"extraction job ran longer than {self.timeout}s")
+                raise ExtractionTimeoutError(
+                    f"Text extraction timed out after {self.timeout}s"
+                )
+            except BrokenProcessPool:
+                self.crashes += 1
+                self._retire(executor, "worker process died")
+                if not retry:
+                    raise Exception("Error extracting text: extractor process crashed (out of memory?)")
+            finally:
+                self._leave(executor)
+                self._busy -= 1
+        # The pool may have been broken by another job; try once on a fresh one
+        return await self._run(function, *args, retry=False)
+
+    def shutdown(self):
+        """Stop the workers (called on application shutdown)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            retiring, self._retiring = self._retiring, set()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        for old in retiring:
+            self._terminate(old)
+
+    def get_stats(self) -> Dict:
+        """Get job counters, pool health and queue statistics"""
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "running": self._executor is not None,
+            "busy_workers": self._busy,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "crashes": self.crashes,
+            "recycles": self.recycles,
+            "retiring_pools": len(self._retiring),
+            "pdf_pages_read": self.pages_read,
+            "pdf_pages_skipped": self.pages_skipped,
+            "avg_ms": round(self._total_time / self.completed * 1000, 1) if self.completed else 0.0,
+            "queue": self.limiter.get_stats(),
+        }
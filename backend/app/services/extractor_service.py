@@ -4,113 +4,190 @@ Handles extraction of text from various file types
 """
 import PyPDF2
 from docx import Document
-from PIL import Image
 import pytesseract
-from typing import Optional
+from typing import List, NamedTuple, Optional, Tuple
+from app.config import settings
+from app.utils.sources import FileSource, describe_source, open_source
+from app.utils.image_processing import normalize_image
+
+# Bump whenever extraction output changes so cached extractions are not reused
+EXTRACTOR_VERSION = "1"
+
+class ExtractedText(NamedTuple):
+    """Extracted text plus how much of the document was read (page counts are for PDFs only)"""
+    text: str
+    pages_total: Optional[int] = None
+    pages_read: Optional[int] = None
+    
+    @property
+    def pages_skipped(self) -> Optional[int]:
+        if self.pages_total is None:
+            return None
+        return self.pages_total - self.pages_read
 
 
 class ExtractorService:
     """Service for extracting text from different file types"""
     
     @staticmethod
-    def extract_from_pdf(file_path: str) -> str:
+    def extract_from_pdf(file_path: FileSource, max_chars: Optional[int] = None) -> str:
         """
         Extract text from PDF file
         
         Args:
-            file_path: Path to PDF file
+            file_path: Path to PDF file (or its bytes / file object)
+            max_chars: Stop after the page that brings the text to this length
             
         Returns:
             Extracted text
         """
-        text = ""
+        texts, _ = ExtractorService.extract_pdf_pages(file_path, max_chars=max_chars)
+        return "\n".join(texts)
+    
+    @staticmethod
+    def extract_pdf_pages(
+        file_path: FileSource,
+        start: int = 0,
+        stop: Optional[int] = None,
+        max_chars: Optional[int] = None
+    ) -> Tuple[List[str], int]:
+        """
+        Extract the text of a range of PDF pages
+        
+        Args:
+            file_path: Path to PDF file (or its bytes / file object)
+            start: First page index
+            stop: Page index to stop before (None for the last page)
+            max_chars: Stop after the page that brings the text to this length
+            
+        Returns:
+            Tuple of (one text per page read, total pages in the document)
+        """
+        texts = []
+        chars = 0
         try:
-            with open(file_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                for page in reader.pages:
-                    text += page.extract_text()
+            reader = PyPDF2.PdfReader(open_source(file_path))
+            total = len(reader.pages)
+            stop = total if stop is None else min(stop, total)
+            for number in range(start, stop):
+                page_text = reader.pages[number].extract_text() or ""
+                texts.append(page_text)
+                chars += len(page_text)
+                if max_chars is not None and chars >= max_chars:
+                    break
         except Exception as e:
             raise Exception(f"Error extracting PDF: {str(e)}")
-        return text
+        return texts, total
     
     @staticmethod
-    def extract_from_docx(file_path: str) -> str:
+    def extract_from_docx(file_path: FileSource) -> str:
         """
         Extract text from DOCX file
         
         Args:
-            file_path: Path to DOCX file
+            file_path: Path to DOCX file (or its bytes / file object)
             
         Returns:
             Extracted text
         """
         try:
-            doc = Document(file_path)
+            doc = Document(open_source(file_path))
             text = "\n".join([para.text for para in doc.paragraphs])
             return text
         except Exception as e:
             raise Exception(f"Error extracting DOCX: {str(e)}")
     
     @staticmethod
-    def extract_from_txt(file_path: str) -> str:
+    def extract_from_txt(file_path: FileSource) -> str:
         """
         Extract text from TXT file
         
         Args:
-            file_path: Path to TXT file
+            file_path: Path to TXT file (or its bytes / file object)
             
         Returns:
             Extracted text
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return file.read()
+            if isinstance(file_path, str):
+                with open(file_path, 'r', encoding='utf-8') as file:
+                    return file.read()
+            return open_source(file_path).read().decode('utf-8')
         except Exception as e:
             raise Exception(f"Error reading TXT: {str(e)}")
     
     @staticmethod
-    def extract_from_image(file_path: str) -> str:
+    def extract_from_image(file_path: FileSource) -> str:
         """
         Extract text from image using OCR
         
         Args:
-            file_path: Path to image file
+            file_path: Path to image file (or its bytes / file object)
             
         Returns:
             Extracted text
         """
         try:
-            image = Image.open(file_path)
-            text = pytesseract.image_to_string(image)
+            # Decoded once, oriented and capped in size; no re-encode needed for OCR
+            normalized = normalize_image(
+                file_path,
+                max_dimension=settings.IMAGE_OCR_MAX_DIMENSION if settings.IMAGE_NORMALIZE_ENABLED else 0,
+                encoding=None
+            )
+            text = pytesseract.image_to_string(normalized.image)
             return text
         except Exception as e:
             raise Exception(f"Error extracting from image: {str(e)}")
     
-    def extract_text(self, file_path: str, file_type: str) -> str:
+    def extract_text(self, file_path: FileSource, file_type: str) -> str:
         """
         Extract text based on file type
         
         Args:
-            file_path: Path to file
+            file_path: Path to file, or its bytes / open binary file object
             file_type: File extension (pdf, docx, txt, jpg, png, etc.)
             
         Returns:
             Extracted text
         """
+        return self.extract_text_with_stats(file_path, file_type).text
+    
+    def extract_text_with_stats(
+        self,
+        file_path: FileSource,
+        file_type: str,
+        max_chars: Optional[int] = None
+    ) -> ExtractedText:
+        """
+        Extract text based on file type, reporting how much of the document was read
+        
+        Args:
+            file_path: Path to file, or its bytes / open binary file object
+            file_type: File extension (pdf, docx, txt, jpg, png, etc.)
+            max_chars: PDFs stop being read once this many characters are extracted
+            
+        Returns:
+            ExtractedText with the text and, for PDFs, pages read out of the total
+        """
         file_type = file_type.lower()
         
-        print(f"[ExtractorService] Extracting text from {file_type} file: {file_path}")
+        print(f"[ExtractorService] Extracting text from {file_type} file: {describe_source(file_path)}")
         
         if file_type == 'pdf':
-            text = self.extract_from_pdf(file_path)
+            texts, total = self.extract_pdf_pages(file_path, max_chars=max_chars)
+            result = ExtractedText("\n".join(texts), pages_total=total, pages_read=len(texts))
         elif file_type in ['docx', 'doc']:
-            text = self.extract_from_docx(file_path)
+            result = ExtractedText(self.extract_from_docx(file_path))
         elif file_type == 'txt':
-            text = self.extract_from_txt(file_path)
+            result = ExtractedText(self.extract_from_txt(file_path))
         elif file_type in ['jpg', 'jpeg', 'png', 'gif']:
-            text = self.extract_from_image(file_path)
+            result = ExtractedText(self.extract_from_image(file_path))
         else:
             raise ValueError(f"Unsupported file type: {file_type}")
         
-        print(f"[ExtractorService] Extracted {len(text)} characters")
-        return text
+        if result.pages_total is not None:
+            print(f"[ExtractorService] Extracted {len(result.text)} characters "
+                  f"({result.pages_read}/{result.pages_total} pages)")
+        else:
+            print(f"[ExtractorService] Extracted {len(result.text)} characters")
+        return result
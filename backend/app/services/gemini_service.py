@@ -3,12 +3,68 @@ Gemini AI integration service
 Handles communication with Google Gemini API
 """
 import google.generativeai as genai
-from app.config import GEMINI_API_KEY
+from app.config import GEMINI_API_KEY, settings
+from app.utils.concurrency import ConcurrencyLimiter, OverloadedError
+from app.utils.sources import FileSource, open_source, source_size
+from app.utils.image_processing import NormalizedImage, normalize_image
+from app.utils.prompt_budget import PromptBudget
 from PIL import Image
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 import io
 
+# An image to analyze: a source to decode, or one already decoded by prepare_image()
+ImageInput = Union[FileSource, NormalizedImage]
+
+# Bump whenever a prompt changes so cached verdicts from older prompts are not reused
+PROMPT_VERSION = "2"
+
+# Response schema for json output mode (mirrors app.models.StructuredVerdict)
+VERDICT_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "assessment": {
+            "type": "STRING",
+            "format": "enum",
+            "enum": ["reliable", "doubtful", "needs_verification", "potentially_false"],
+        },
+        "confidence": {"type": "NUMBER"},
+        "reasons": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "tips": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "claims": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "summary": {"type": "STRING"},
+    },
+    "required": ["assessment", "confidence", "reasons", "tips"],
+}
+
+# Prefixes of the fallback messages returned when a Gemini call fails
+FAILURE_PREFIXES = (
+    "Analysis could not be completed",
+    "Image analysis could not be completed",
+)
+
+
+
+class StreamError(Exception):
+    """Raised when a streamed Gemini response fails, possibly after some chunks were yielded"""
+
+
+IMAGE_JSON_PROMPT = """You are an expert at detecting manipulated, misleading, or fake images. Analyze this image thoroughly.
+
+Respond with ONLY a JSON object with exactly these fields:
+{
+  "assessment": "reliable" | "doubtful" | "needs_verification" | "potentially_false",
+  "confidence": <number between 0 and 1>,
+  "reasons": ["<signs of manipulation, editing or AI generation, or context concerns>", ...],
+  "tips": ["<how to verify this image's authenticity, e.g. reverse image search>", ...],
+  "claims": ["<each checkable claim the image or its text makes>", ...],
+  "summary": "<what the image shows and why you rated it this way>"
+}"""
+
 
 class GeminiService:
     """Service for interacting with Gemini API"""
@@ -19,14 +75,250 @@ class GeminiService:
             genai.configure(api_key=GEMINI_API_KEY)
         self.model = genai.GenerativeModel('gemini-2.0-flash')
         self.vision_model = genai.GenerativeModel('gemini-2.0-flash')
-        self._executor = ThreadPoolExecutor(max_workers=2)
+        # Blocking SDK calls run on their own pool so they never starve the
+        # default loop executor; the limiter bounds how many may wait for it
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.GEMINI_MAX_WORKERS,
+            thread_name_prefix="gemini"
+        )
+        # "async" keeps in-flight calls on the event loop instead of one thread each
+        self.backend = "async" if settings.GEMINI_BACKEND == "async" else "thread"
+        self.limiter = ConcurrencyLimiter(
+            "Gemini",
+            max_concurrency=(
+                settings.GEMINI_ASYNC_MAX_CONCURRENCY if self.backend == "async"
+                else settings.GEMINI_MAX_WORKERS
+            ),
+            max_queue=settings.GEMINI_MAX_QUEUE,
+            queue_timeout=settings.GEMINI_QUEUE_TIMEOUT,
+            retry_after=settings.GEMINI_RETRY_AFTER
+        )
+        self.prompt_budget = PromptBudget(
+            max_tokens=settings.PROMPT_MAX_TOKENS,
+            sources_share=settings.PROMPT_SOURCES_SHARE
+        )
+        self.json_output = settings.ANALYSIS_OUTPUT_FORMAT == "json"
+        self.json_config = self._build_json_config() if self.json_output else None
+        # Updated from executor threads and the event loop; guarded by _stats_lock
+        self.image_stats = {
+            "images": 0,
+            "original_bytes": 0,
+            "sent_bytes": 0,
+            "preprocess_ms": 0.0,
+            "vision_ms": 0.0,
+        }
+        self._stats_lock = threading.Lock()
+    
+    @staticmethod
+    def _build_json_config() -> Optional[Dict[str, Any]]:
+        """
+        Generation config constraining responses to VERDICT_SCHEMA
+        
+        Returns None on SDK versions without response schema support; the
+        JSON prompt alone is used then and the analyzer validates the reply.
+        """
+        fields = getattr(genai.types.GenerationConfig, "__dataclass_fields__", {})
+        if "response_schema" not in fields:
+            print("[GeminiService] SDK has no response_schema support; requesting JSON by prompt only", flush=True)
+            return None
+        return {"response_mime_type": "application/json", "response_schema": VERDICT_SCHEMA}
+    
+    @staticmethod
+    def is_failure(analysis: str) -> bool:
+        """Check whether an analysis is a fallback message from a failed call"""
+        return analysis.startswith(FAILURE_PREFIXES)
+    
+    async def _run_blocking(self, func, *args):
+        """
+        Run a blocking Gemini call on the dedicated executor
+        
+        The limiter slot is held until the worker thread actually finishes,
+        even if the awaiting request is cancelled, so the slot count always
+        matches the threads in use.
+        
+        Raises:
+            OverloadedError: If the wait queue is full or the wait timed out
+        """
+        future = await self._submit(func, *args)
+        return await asyncio.wrap_future(future)
+    
+    async def _submit(self, func, *args) -> Future:
+        """Take a limiter slot and submit func to the executor; the slot is freed when it finishes"""
+        await self.limiter.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self.limiter.release()
+            raise
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self.limiter.release))
+        return future
+    
+    async def _generate(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Generate text with the configured backend
+        
+        Raises:
+            OverloadedError: If the wait queue is full or the wait timed out
+        """
+        if self.backend == "thread":
+            return await self._run_blocking(self._generate_sync, prompt, generation_config)
+        
+        async with self.limiter:
+            print("[GeminiService] Sending async request to Gemini API...", flush=True)
+            response = await self.model.generate_content_async(prompt, generation_config=generation_config)
+            print("[GeminiService] Response received from Gemini API", flush=True)
+            self._record_usage(prompt, response)
+            return response.text
+    
+    async def _generate_image(
+        self,
+        prompt: str,
+        image_path: ImageInput,
+        generation_config: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Run a vision request with the configured backend
+        
+        Raises:
+            OverloadedError: If the wait queue is full or the wait timed out
+        """
+        if self.backend == "thread":
+            return await self._run_blocking(self._analyze_image_sync, prompt, image_path, generation_config)
+        
+        async with self.limiter:
+            # Decoding is CPU work; keep it off the event loop
+            loop = asyncio.get_running_loop()
+            img = await loop.run_in_executor(self._executor, self._image_part, image_path)
+            print("[GeminiService] Analyzing image (async)...", flush=True)
+            started = time.monotonic()
+            response = await self.vision_model.generate_content_async(
+                [prompt, img], generation_config=generation_config
+            )
+            self._record_image_stats(vision_ms=(time.monotonic() - started) * 1000)
+            print("[GeminiService] Image analysis complete", flush=True)
+            return response.text
+    
+    def get_stats(self) -> Dict:
+        """Get executor queue depth, wait time and image payload statistics"""
+        stats = self.limiter.get_stats()
+        stats["backend"] = self.backend
+        stats["prompt"] = self.prompt_budget.get_stats()
+        
+        with self._stats_lock:
+            image_stats = dict(self.image_stats)
+        images = image_stats["images"]
+        stats["images"] = {
+            "count": images,
+            "normalized": settings.IMAGE_NORMALIZE_ENABLED,
+            "original_bytes": image_stats["original_bytes"],
+            "sent_bytes": image_stats["sent_bytes"],
+            "bytes_saved": image_stats["original_bytes"] - image_stats["sent_bytes"],
+            "avg_preprocess_ms": round(image_stats["preprocess_ms"] / images, 1) if images else 0.0,
+            "avg_vision_ms": round(image_stats["vision_ms"] / images, 1) if images else 0.0,
+        }
+        return stats
     
-    def _generate_sync(self, prompt: str) -> str:
+    def _record_image_stats(self, **deltas):
+        """Add to the image counters (called from worker threads and the event loop)"""
+        with self._stats_lock:
+            for name, delta in deltas.items():
+                self.image_stats[name] += delta
+    
+    def shutdown(self):
+        """Stop the executor (called on application shutdown)"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _generate_sync(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> str:
         """Synchronous call to Gemini API"""
-        import sys
         print("[GeminiService] Sending request to Gemini API...", flush=True)
-        response = self.model.generate_content(prompt)
+        response = self.model.generate_content(prompt, generation_config=generation_config)
         print("[GeminiService] Response received from Gemini API", flush=True)
+        self._record_usage(prompt, response)
+        return response.text
+    
+    def _record_usage(self, prompt: str, response):
+        """Feed the prompt token count Gemini reports (newer SDKs only) back into the budget estimate"""
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(usage, "prompt_token_count", 0) if usage is not None else 0
+        if prompt_tokens:
+            self.prompt_budget.observe(len(prompt), prompt_tokens)
+    
+    @staticmethod
+    def _load_image(image_path: FileSource) -> Image.Image:
+        """Open and decode an image from a path, bytes or file object"""
+        img = Image.open(open_source(image_path))
+        img.load()
+        return img
+    
+    def prepare_image(self, image_path: FileSource) -> NormalizedImage:
+        """
+        Decode an image once, downscaled and re-encoded when normalization is on
+        
+        The result can be passed to analyze_image() in place of the source,
+        so callers that also need the decoded pixels (e.g. for perceptual
+        hashing) do not decode the image twice. Blocking; run it off the loop.
+        
+        Args:
+            image_path: Path to image file, or its bytes / open binary file object
+            
+        Returns:
+            NormalizedImage (without re-encoded data when normalization is off)
+        """
+        if not settings.IMAGE_NORMALIZE_ENABLED:
+            started = time.monotonic()
+            img = self._load_image(image_path)
+            elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+            return NormalizedImage(img, None, None, source_size(image_path), img.size, elapsed_ms)
+        
+        normalized = normalize_image(
+            image_path,
+            max_dimension=settings.IMAGE_MAX_DIMENSION,
+            encoding=settings.IMAGE_ENCODING,
+            quality=settings.IMAGE_QUALITY
+        )
+        print(
+            f"[GeminiService] Image normalized: {normalized.original_size} -> {normalized.image.size}, "
+            f"{normalized.original_bytes} -> {normalized.encoded_bytes} bytes in {normalized.elapsed_ms}ms",
+            flush=True
+        )
+        return normalized
+    
+    def _image_part(self, image: ImageInput):
+        """
+        Request part for an image, decoding it first unless already prepared
+        
+        Without normalization the decoded image is passed as-is, which the
+        SDK uploads as a full-resolution PNG.
+        """
+        if not isinstance(image, NormalizedImage):
+            image = self.prepare_image(image)
+        if image.data is None:
+            self._record_image_stats(images=1, preprocess_ms=image.elapsed_ms)
+            return image.image
+        # Counted here rather than in prepare_image(), so images answered
+        # from the near-duplicate index do not skew the per-request averages
+        self._record_image_stats(
+            images=1,
+            original_bytes=image.original_bytes,
+            sent_bytes=image.encoded_bytes,
+            preprocess_ms=image.elapsed_ms
+        )
+        return image.as_blob()
+    
+    def _analyze_image_sync(
+        self,
+        prompt: str,
+        image_path: ImageInput,
+        generation_config: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Synchronous call to Gemini Vision"""
+        print("[GeminiService] Analyzing image...", flush=True)
+        img = self._image_part(image_path)
+        started = time.monotonic()
+        response = self.vision_model.generate_content([prompt, img], generation_config=generation_config)
+        self._record_image_stats(vision_ms=(time.monotonic() - started) * 1000)
+        print("[GeminiService] Image analysis complete", flush=True)
         return response.text
     
     async def analyze_text(self, content: str) -> str:
@@ -65,24 +357,34 @@ Please provide a structured analysis with the following sections:
 Be specific and helpful in your analysis."""
         
         try:
-            # Run in thread to avoid blocking
-            result = await asyncio.to_thread(self._generate_sync, prompt)
+            result = await self._generate(prompt)
             return result
+        except OverloadedError:
+            raise
         except Exception as e:
             print(f"[GeminiService] Error: {str(e)}", flush=True)
             return f"Analysis could not be completed: {str(e)}. Please verify the content manually through trusted sources."
     
-    async def analyze_text_with_sources(self, content: str, search_context: str = "") -> str:
+    def build_text_prompt(
+        self,
+        content: str,
+        search_context: str = "",
+        output_format: Optional[str] = None
+    ) -> str:
         """
-        Analyze text content using Gemini with web search context
+        Build the fact-checking prompt for text content
         
         Args:
             content: Text to analyze
             search_context: Web search results for verification
+            output_format: markdown or json (defaults to ANALYSIS_OUTPUT_FORMAT)
             
         Returns:
-            Analysis result from Gemini
+            Prompt text
         """
+        if (output_format or settings.ANALYSIS_OUTPUT_FORMAT) == "json":
+            return self.build_json_prompt(content, search_context)
+        
         # Build prompt with search context if available
         search_section = ""
         if search_context:
@@ -124,21 +426,250 @@ IMPORTANT:
 - Use the web search results to inform your assessment when available.
 
 Be specific and helpful in your analysis."""
+        return prompt
+    
+    def build_json_prompt(self, content: str, search_context: str = "") -> str:
+        """
+        Build the fact-checking prompt asking for a single JSON verdict
+        
+        Args:
+            content: Text to analyze
+            search_context: Web search results for verification
+            
+        Returns:
+            Prompt text
+        """
+        search_section = ""
+        if search_context:
+            search_section = f"""
+WEB SEARCH RESULTS (use these to verify the claim):
+{search_context}
+"""
+        
+        return f"""You are a fact-checking and misinformation detection expert. Analyze the following content for accuracy, misinformation, bias, and reliability.
+
+CONTENT TO ANALYZE:
+{content}
+{search_section}
+Respond with ONLY a JSON object with exactly these fields:
+{{
+  "assessment": "reliable" | "doubtful" | "needs_verification" | "potentially_false",
+  "confidence": <number between 0 and 1>,
+  "reasons": ["<why you rated it this way, citing fact-check sources when available>", ...],
+  "tips": ["<how to verify this information>", ...],
+  "claims": ["<each checkable claim made in the content>", ...],
+  "summary": "<short explanation of the key findings>"
+}}
+
+For simple factual statements that are true, use "reliable". For speculative claims without evidence, use "needs_verification" or "potentially_false"."""
+    
+    def build_budgeted_prompt(
+        self,
+        content: str,
+        search_context: str = "",
+        output_format: Optional[str] = None
+    ) -> str:
+        """
+        Fit content and sources to the prompt budget, then build the prompt
+        
+        Args:
+            content: Text to analyze
+            search_context: Web search results for verification
+            output_format: markdown or json (defaults to ANALYSIS_OUTPUT_FORMAT)
+            
+        Returns:
+            Prompt text
+        """
+        budgeted = self.prompt_budget.fit(content, search_context)
+        print(
+            f"[GeminiService] Prompt budget: ~{budgeted.content_tokens + budgeted.source_tokens} tokens "
+            f"(content {budgeted.content_tokens}, sources {budgeted.source_tokens}"
+            f"{', content reduced to salient sentences' if budgeted.reduced else ''})",
+            flush=True
+        )
+        return self.build_text_prompt(budgeted.content, budgeted.search_context, output_format)
+    
+    async def analyze_text_with_sources(self, content: str, search_context: str = "") -> str:
+        """
+        Analyze text content using Gemini with web search context
+        
+        Args:
+            content: Text to analyze
+            search_context: Web search results for verification
+            
+        Returns:
+            Analysis result from Gemini
+        """
+        prompt = self.build_budgeted_prompt(content, search_context)
         
         try:
-            # Run in thread to avoid blocking
-            result = await asyncio.to_thread(self._generate_sync, prompt)
+            result = await self._generate(prompt, self.json_config)
             return result
+        except OverloadedError:
+            raise
         except Exception as e:
             print(f"[GeminiService] Error: {str(e)}", flush=True)
             return f"Analysis could not be completed: {str(e)}. Please verify the content manually through trusted sources."
     
-    async def analyze_image(self, image_path: str) -> str:
+    def build_batch_prompt(self, items: List[Tuple[str, str]]) -> str:
+        """
+        Build one prompt asking for a verdict on several short claims
+        
+        Args:
+            items: List of (claim text, web search context) pairs
+            
+        Returns:
+            Prompt text
+        """
+        sections = []
+        for number, (content, search_context) in enumerate(items, start=1):
+            section = f"### CLAIM {number}\n{content}\n"
+            if search_context:
+                section += f"\nWeb search results for claim {number}:\n{search_context}\n"
+            sections.append(section)
+        
+        claims = "\n".join(sections)
+        return f"""You are a fact-checking and misinformation detection expert. Assess each of the following {len(items)} claims independently for accuracy, misinformation, bias, and reliability. Use the web search results given for a claim when available.
+
+{claims}
+Respond with ONLY a JSON array containing one object per claim, in claim order, with exactly these fields:
+[
+  {{
+    "id": <claim number>,
+    "assessment": "reliable" | "doubtful" | "needs_verification" | "potentially_false",
+    "confidence": <number between 0 and 1>,
+    "reasons": ["<why you rated it this way>", ...],
+    "tips": ["<how to verify this claim>", ...],
+    "summary": "<two or three sentence explanation>"
+  }}
+]
+
+For simple factual statements that are true, use "reliable". For speculative claims without evidence, use "needs_verification" or "potentially_false"."""
+    
+    async def analyze_batch(self, items: List[Tuple[str, str]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Assess several short claims with a single Gemini call
+        
+        Args:
+            items: List of (claim text, web search context) pairs
+            
+        Returns:
+            One structured verdict dict per item, or None where the response
+            had no usable entry for it (callers should analyze those singly)
+        """
+        prompt = self.build_batch_prompt(items)
+        
+        try:
+            response = await self._generate(prompt)
+        except OverloadedError:
+            raise
+        except Exception as e:
+            print(f"[GeminiService] Batch error: {str(e)}", flush=True)
+            return [None] * len(items)
+        
+        verdicts: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        start, end = response.find("["), response.rfind("]")
+        if start == -1 or end <= start:
+            print("[GeminiService] Batch response contained no JSON array", flush=True)
+            return verdicts
+        try:
+            entries = json.loads(response[start:end + 1])
+        except json.JSONDecodeError as e:
+            print(f"[GeminiService] Batch response is not valid JSON: {e}", flush=True)
+            return verdicts
+        
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            try:
+                index = int(entry.get("id")) - 1
+            except (TypeError, ValueError):
+                continue
+            if 0 <= index < len(items) and entry.get("assessment"):
+                verdicts[index] = entry
+        return verdicts
+    
+    async def stream_text_with_sources(self, content: str, search_context: str = "") -> AsyncIterator[str]:
+        """
+        Analyze text content using Gemini streaming generation
+        
+        Yields text chunks as Gemini produces them. A failure raises
+        StreamError rather than yielding the fallback message, since chunks
+        already yielded would otherwise be joined with it into one text.
+        
+        Args:
+            content: Text to analyze
+            search_context: Web search results for verification
+            
+        Yields:
+            Analysis text chunks
+        
+        Raises:
+            OverloadedError: If the wait queue is full or the wait timed out
+            StreamError: If the call failed; the message is the usual fallback text
+        """
+        # Streamed chunks are shown to the user as they arrive, so always ask for markdown
+        prompt = self.build_budgeted_prompt(content, search_context, output_format="markdown")
+        
+        try:
+            if self.backend == "async":
+                async with self.limiter:
+                    response = await self.model.generate_content_async(prompt, stream=True)
+                    async for chunk in response:
+                        if chunk.text:
+                            yield chunk.text
+                return
+            
+            async for text in self._stream_from_thread(prompt):
+                yield text
+        except OverloadedError:
+            raise
+        except Exception as e:
+            print(f"[GeminiService] Stream error: {str(e)}", flush=True)
+            raise StreamError(
+                f"Analysis could not be completed: {str(e)}. Please verify the content manually through trusted sources."
+            ) from e
+    
+    async def _stream_from_thread(self, prompt: str) -> AsyncIterator[str]:
+        """Iterate a blocking streaming response on the executor and relay its chunks"""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        done = object()
+        
+        def produce():
+            try:
+                response = self.model.generate_content(prompt, stream=True)
+                for chunk in response:
+                    if stop.is_set():
+                        break
+                    if chunk.text:
+                        loop.call_soon_threadsafe(queue.put_nowait, chunk.text)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+        
+        await self._submit(produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Consumer went away (or finished): let the worker stop early
+            stop.set()
+    
+    async def analyze_image(self, image_path: ImageInput) -> str:
         """
         Analyze image using Gemini Vision
         
         Args:
-            image_path: Path to image file
+            image_path: Path to image file, its bytes / open binary file object,
+                or an image already decoded by prepare_image()
             
         Returns:
             Analysis result from Gemini
@@ -166,17 +697,14 @@ Please provide a structured analysis with:
 - [Recommend reverse image search or other tools]
 
 Be thorough and specific in your analysis."""
-        
-        def _analyze_image_sync():
-            print("[GeminiService] Analyzing image...", flush=True)
-            img = Image.open(image_path)
-            response = self.vision_model.generate_content([prompt, img])
-            print("[GeminiService] Image analysis complete", flush=True)
-            return response.text
+        if self.json_output:
+            prompt = IMAGE_JSON_PROMPT
         
         try:
-            result = await asyncio.to_thread(_analyze_image_sync)
+            result = await self._generate_image(prompt, image_path, self.json_config)
             return result
+        except OverloadedError:
+            raise
         except Exception as e:
             print(f"[GeminiService] Image error: {str(e)}", flush=True)
             return f"Image analysis could not be completed: {str(e)}. Please verify the image manually."
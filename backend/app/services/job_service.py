@@ -0,0 +1,306 @@
+"""
+Background job service
+Runs file analyses on a bounded worker pool with state kept in SQLite
+"""
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from app.config import settings
+from app.utils.concurrency import OverloadedError
+
+IMAGE_TYPES = {'jpg', 'jpeg', 'png', 'gif'}
+TERMINAL_STATUSES = ('done', 'failed')
+
+
+class JobService:
+    """
+    Service that queues uploaded files for background analysis
+
+    A worker claims a job with a fresh owner token and refreshes the job's
+    ``updated_at`` every JOB_HEARTBEAT_INTERVAL seconds while it runs. Its
+    outcome is only written if the job is still running under that token,
+    so a job that cleanup or a restart has taken away is never overwritten.
+    An upload is deleted once its job is finished and no worker of this
+    process is still running it. Job-table and upload-folder calls are
+    blocking, so they run on worker threads rather than the event loop.
+    """
+
+    def __init__(self, analyzer_service, database, file_handler):
+        """
+        Initialize job service
+
+        Args:
+            analyzer_service: AnalyzerService used to run the pipeline
+            database: Database storing job state
+            file_handler: FileHandler owning the uploaded files
+        """
+        self.analyzer = analyzer_service
+        self.db = database
+        self.file_handler = file_handler
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._cleanup_task: Optional[asyncio.Task] = None
+        self._finished: Dict[str, asyncio.Event] = {}
+        # Job id -> owner token of the jobs this process's workers are running
+        self._running: Dict[str, str] = {}
+
+        self.completed = 0
+        self.failed = 0
+
+    async def start(self):
+        """
+        Start workers and the cleanup loop (called on application startup)
+
+        Jobs left queued, or running with no recent heartbeat, by a previous
+        process are queued again if their file still exists, otherwise
+        marked failed.
+        """
+        if self._workers:
+            return
+        self._queue = asyncio.Queue()
+
+        for job_id in await asyncio.to_thread(self._requeue_unfinished):
+            self._queue.put_nowait(job_id)
+        if self._queue.qsize():
+            print(f"[JobService] Resumed {self._queue.qsize()} unfinished jobs", flush=True)
+
+        self._workers = [
+            asyncio.create_task(self._worker(number))
+            for number in range(settings.JOB_WORKERS)
+        ]
+        self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+
+    def _requeue_unfinished(self) -> List[str]:
+        """Mark resumable jobs of a previous process queued and fail the rest (blocking)"""
+        orphaned_before = (
+            datetime.utcnow() - timedelta(seconds=2 * settings.JOB_HEARTBEAT_INTERVAL)
+        ).isoformat()
+        unfinished = self.db.get_jobs(['queued']) + self.db.get_jobs(['running'], updated_before=orphaned_before)
+        requeued = []
+        for job in unfinished:
+            if job['file_path'] and os.path.exists(job['file_path']):
+                self.db.update_job(job['id'], 'queued')
+                requeued.append(job['id'])
+            else:
+                self.db.update_job(job['id'], 'failed', error="Upload was lost before analysis")
+        return requeued
+
+    async def stop(self):
+        """Stop workers and the cleanup loop (called on application shutdown)"""
+        tasks = self._workers + ([self._cleanup_task] if self._cleanup_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._cleanup_task = None
+
+    async def submit(self, job_id: str, filename: str, file_path: str, file_type: str) -> Dict:
+        """
+        Queue a saved upload for analysis
+
+        Args:
+            job_id: Job identifier (also the upload's file id)
+            filename: Original filename
+            file_path: Path of the saved upload
+            file_type: File extension
+
+        Returns:
+            Job dictionary
+
+        Raises:
+            OverloadedError: If the job queue is full
+        """
+        if self._queue is None:
+            raise RuntimeError("JobService has not been started")
+        if self._queue.qsize() >= settings.JOB_MAX_QUEUE:
+            raise OverloadedError(
+                f"Job queue is full ({self._queue.qsize()} waiting)",
+                retry_after=settings.JOB_RETRY_AFTER
+            )
+        job = await asyncio.to_thread(self.db.create_job, job_id, filename, file_path, file_type)
+        self._queue.put_nowait(job_id)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        """Get a job by ID"""
+        return await asyncio.to_thread(self.db.get_job, job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict]:
+        """
+        Get a job, waiting up to ``timeout`` seconds for it to finish
+
+        Args:
+            job_id: Job identifier
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Job dictionary or None if not found
+        """
+        job = await self.get(job_id)
+        if job is None or job['status'] in TERMINAL_STATUSES or timeout <= 0:
+            return job
+        event = self._finished.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return await self.get(job_id)
+
+    async def _worker(self, number: int):
+        """Take job ids off the queue and run them until cancelled"""
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[JobService] Worker {number} crashed on job {job_id}: {e}", flush=True)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        """Run one job and record its outcome if this worker still owns it"""
+        job = await self.get(job_id)
+        if job is None:
+            return
+        owner = uuid.uuid4().hex
+        if not await asyncio.to_thread(self.db.claim_job, job_id, owner):
+            return  # finished, or claimed by a worker of another process
+
+        self._running[job_id] = owner
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, owner))
+        print(f"[JobService] Running job {job_id} ({job['filename']})", flush=True)
+        try:
+            try:
+                result = await asyncio.wait_for(self._analyze(job), settings.JOB_TIMEOUT)
+                status, outcome, error = 'done', result.model_dump(), None
+            except asyncio.TimeoutError:
+                status, outcome, error = 'failed', None, "Job timed out"
+            except asyncio.CancelledError:
+                # Shutting down: leave it queued so the next start resumes it
+                await asyncio.shield(asyncio.to_thread(self.db.update_job, job_id, 'queued', owner=owner))
+                raise
+            except Exception as e:
+                print(f"[JobService] Job {job_id} failed: {e}", flush=True)
+                status, outcome, error = 'failed', None, str(e)
+
+            if await asyncio.to_thread(
+                self.db.update_job, job_id, status, result=outcome, error=error, owner=owner
+            ):
+                if status == 'done':
+                    self.completed += 1
+                else:
+                    self.failed += 1
+            else:
+                print(f"[JobService] Job {job_id} was taken over; discarding its outcome", flush=True)
+        finally:
+            heartbeat.cancel()
+            del self._running[job_id]
+
+        await self._release_upload(job_id)
+        self._notify(job_id)
+
+    async def _analyze(self, job: Dict):
+        """Run the analysis pipeline on a job's upload"""
+        if job['file_type'] in IMAGE_TYPES:
+            return await self.analyzer.analyze_image(job['file_path'])
+        return await self.analyzer.analyze_file(job['file_path'], job['file_type'])
+
+    async def _heartbeat(self, job_id: str, owner: str):
+        """Refresh a running job's updated_at until it ends or is taken over"""
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL)
+            if not await asyncio.to_thread(self.db.touch_job, job_id, owner):
+                return
+
+    async def _release_upload(self, job_id: str):
+        """Delete a job's upload unless a worker here is running it or the job will run again"""
+        if job_id in self._running:
+            return  # the worker deletes it when it exits
+        job = await self.get(job_id)
+        if job is None or job['status'] in TERMINAL_STATUSES:
+            await asyncio.to_thread(self.file_handler.delete_file, job_id)
+
+    def _notify(self, job_id: str):
+        """Wake requests long-polling a job"""
+        event = self._finished.pop(job_id, None)
+        if event:
+            event.set()
+
+    async def _cleanup_loop(self):
+        """Periodically remove expired jobs and abandoned uploads"""
+        while True:
+            try:
+                await self.cleanup()
+            except Exception as e:
+                print(f"[JobService] Cleanup error: {e}", flush=True)
+            await asyncio.sleep(settings.JOB_CLEANUP_INTERVAL)
+
+    async def cleanup(self) -> int:
+        """
+        Delete finished jobs older than JOB_TTL, fail running jobs with no heartbeat
+        for JOB_STALE_AFTER, and delete uploads that never got a job row
+
+        Returns:
+            Number of jobs removed or failed, plus orphaned uploads deleted
+        """
+        now = datetime.utcnow()
+        count = 0
+
+        expired_before = (now - timedelta(seconds=settings.JOB_TTL)).isoformat()
+        for job in await asyncio.to_thread(self.db.get_jobs, list(TERMINAL_STATUSES), updated_before=expired_before):
+            await asyncio.to_thread(self.db.delete_job, job['id'])
+            await self._release_upload(job['id'])
+            count += 1
+
+        stale_before = (now - timedelta(seconds=settings.JOB_STALE_AFTER)).isoformat()
+        for job in await asyncio.to_thread(self.db.get_jobs, ['running'], updated_before=stale_before):
+            # Only fail the run that went quiet, not one that claimed the job since
+            if not await asyncio.to_thread(
+                self.db.update_job, job['id'], 'failed', error="Job worker stopped responding", owner=job['owner']
+            ):
+                continue
+            await self._release_upload(job['id'])
+            self._notify(job['id'])
+            count += 1
+
+        orphans = await asyncio.to_thread(self._delete_orphaned_uploads, time.time() - settings.JOB_STALE_AFTER)
+        count += orphans
+
+        if count:
+            print(f"[JobService] Cleaned up {count} jobs ({orphans} orphaned uploads)", flush=True)
+        return count
+
+    def _delete_orphaned_uploads(self, saved_before: float) -> int:
+        """
+        Delete uploads saved before ``saved_before`` (epoch seconds) that have no job row (blocking)
+
+        Such files are left behind when the job insert failed or the process
+        stopped between saving the upload and creating its job. Newer files
+        are skipped so an upload whose job is being created is not removed.
+        """
+        deleted = 0
+        for path in self.file_handler.list_files():
+            try:
+                if path.stat().st_mtime >= saved_before:
+                    continue
+            except FileNotFoundError:
+                continue
+            if self.db.get_job(path.stem) is None and self.file_handler.delete_file(path.stem):
+                deleted += 1
+        return deleted
+
+    def get_stats(self) -> Dict:
+        """Get queue and worker statistics"""
+        return {
+            "workers": len(self._workers),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": len(self._running),
+            "completed": self.completed,
+            "failed": self.failed,
+        }
@@ -4,9 +4,12 @@ Uses Serper.dev API for Google search results
 """
 import aiohttp
 import asyncio
+import hashlib
+import json
 import os
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from app.config import settings
+from app.utils.cache import TieredCache
 
 
 class SearchService:
@@ -15,12 +18,107 @@ class SearchService:
     def __init__(self):
         """Initialize search service"""
         self.api_key = os.getenv("SERPER_API_KEY", "")
-        self.base_url = "https://google.serper.dev/search"
+        self.base_url = settings.SERPER_BASE_URL
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._connector: Optional[aiohttp.TCPConnector] = None
+        self._requests = 0
+        self._in_flight = 0
+        self._sessions_created = 0
+        self._connections_created = 0
+        self._connections_reused = 0
+        
+        # Parsed results per (query, num_results); failures are cached briefly
+        self.search_cache = TieredCache(
+            "search",
+            max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+            ttl=settings.SEARCH_CACHE_TTL,
+            db_path=settings.CACHE_DB_PATH if settings.SEARCH_CACHE_BACKEND == "sqlite" else None,
+            disk_max_entries=settings.SEARCH_CACHE_DISK_MAX_ENTRIES,
+            dumps=lambda results: json.dumps(results).encode("utf-8"),
+            loads=json.loads,
+            enabled=settings.SEARCH_CACHE_BACKEND != "none"
+        )
+        self._negative_cached = 0
+    
+    async def start(self):
+        """
+        Create the pooled HTTP session
+        
+        Called on application startup; the session (and its keep-alive
+        connections to the search API) lives until close() is called.
+        """
+        if self._session is not None and not self._session.closed:
+            return
+        self._connector = aiohttp.TCPConnector(
+            limit=settings.SEARCH_POOL_LIMIT,
+            limit_per_host=settings.SEARCH_POOL_LIMIT_PER_HOST,
+            keepalive_timeout=settings.SEARCH_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=settings.SEARCH_DNS_CACHE_TTL,
+            use_dns_cache=True
+        )
+        # Connection opens and keep-alive reuses are counted through aiohttp's public tracing hooks
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_created)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+        self._session = aiohttp.ClientSession(
+            connector=self._connector,
+            timeout=aiohttp.ClientTimeout(total=settings.SEARCH_TIMEOUT),
+            trace_configs=[trace_config]
+        )
+        self._sessions_created += 1
+    
+    async def close(self):
+        """Close the pooled HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._connector = None
+        await asyncio.to_thread(self.search_cache.flush)
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the pooled session, creating it if startup has not run yet"""
+        if self._session is None or self._session.closed:
+            await self.start()
+        return self._session
+    
+    @property
+    def request_count(self) -> int:
+        """Number of requests sent to the search API so far"""
+        return self._requests
+    
+    def get_pool_stats(self) -> Dict:
+        """Get connection pool utilization"""
+        stats = {
+            "active": self._session is not None and not self._session.closed,
+            "limit": settings.SEARCH_POOL_LIMIT,
+            "limit_per_host": settings.SEARCH_POOL_LIMIT_PER_HOST,
+            "requests": self._requests,
+            "in_flight": self._in_flight,
+            "sessions_created": self._sessions_created,
+            "connections_created": self._connections_created,
+            "connections_reused": self._connections_reused,
+        }
+        reused = self._connections_reused
+        opened = self._connections_created
+        stats["reuse_ratio"] = round(reused / (reused + opened), 4) if reused + opened else 0.0
+        return stats
+    
+    async def _on_connection_created(self, session, context, params):
+        """Trace hook: a new TCP/TLS connection to the search API was opened"""
+        self._connections_created += 1
+    
+    async def _on_connection_reused(self, session, context, params):
+        """Trace hook: a request went out on a pooled keep-alive connection"""
+        self._connections_reused += 1
     
     async def search(self, query: str, num_results: int = 5) -> List[Dict]:
         """
         Search the web for information about a claim
         
+        Results are served from the search cache when available. Timeouts
+        and errors are cached for a short negative TTL so a failing API is
+        not hammered with the same query.
+        
         Args:
             query: Search query
             num_results: Number of results to return
@@ -31,6 +129,30 @@ class SearchService:
         if not self.api_key:
             return []
         
+        cache_key = hashlib.sha256(f"{num_results}|{query}".encode("utf-8")).hexdigest()
+        found, cached = await self.search_cache.aget(cache_key)
+        if found:
+            return cached
+        
+        results, ok = await self._fetch(query, num_results)
+        if ok:
+            self.search_cache.set(cache_key, results)
+        else:
+            self.search_cache.set(cache_key, results, ttl=settings.SEARCH_CACHE_NEGATIVE_TTL)
+            self._negative_cached += 1
+        return results
+    
+    async def _fetch(self, query: str, num_results: int) -> Tuple[List[Dict], bool]:
+        """
+        Query the search API
+        
+        Args:
+            query: Search query
+            num_results: Number of results to return
+            
+        Returns:
+            Tuple of (parsed results, whether the request succeeded)
+        """
         headers = {
             "X-API-KEY": self.api_key,
             "Content-Type": "application/json"
@@ -41,29 +163,39 @@ class SearchService:
             "num": num_results
         }
         
+        self._requests += 1
+        self._in_flight += 1
         try:
-            timeout = aiohttp.ClientTimeout(total=10)  # 10 second timeout
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(
-                    self.base_url,
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_results(data)
-                    else:
-                        print(f"Search API error: {response.status}")
-                        return []
+            session = await self._get_session()
+            async with session.post(
+                self.base_url,
+                headers=headers,
+                json=payload
+            ) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return self._parse_results(data), True
+                else:
+                    print(f"Search API error: {response.status}")
+                    return [], False
         except aiohttp.ClientError as e:
             print(f"Search connection error: {e}")
-            return []
+            return [], False
         except asyncio.TimeoutError:
             print("Search timeout - continuing without web search")
-            return []
+            return [], False
         except Exception as e:
             print(f"Search error: {e}")
-            return []
+            return [], False
+        finally:
+            self._in_flight -= 1
+    
+    async def get_cache_stats(self) -> Dict:
+        """Get search cache statistics"""
+        stats = await self.search_cache.aget_stats()
+        stats["backend"] = settings.SEARCH_CACHE_BACKEND
+        stats["negative_entries_stored"] = self._negative_cached
+        return stats
     
     def _parse_results(self, data: Dict) -> List[Dict]:
         """Parse search results from Serper API response"""
@@ -116,12 +248,22 @@ class SearchService:
         except:
             return url
     
-    async def verify_claim(self, claim: str) -> Dict:
+    async def verify_claim(
+        self,
+        claim: str,
+        query_count: Optional[int] = None,
+        deadline: Optional[float] = None
+    ) -> Dict:
         """
         Verify a claim by searching for it
         
+        All queries run concurrently; whatever has finished when the deadline
+        passes is used and the rest are cancelled.
+        
         Args:
             claim: The claim to verify
+            query_count: Number of queries to run (1-3, defaults to SEARCH_QUERY_COUNT)
+            deadline: Seconds to wait for the queries (defaults to SEARCH_CLAIM_DEADLINE)
             
         Returns:
             Dict with search results and verification context
@@ -132,13 +274,30 @@ class SearchService:
             f'{claim} true or false',
             claim
         ]
+        query_count = settings.SEARCH_QUERY_COUNT if query_count is None else query_count
+        queries = queries[:max(1, query_count)]  # Limit API calls
+        deadline = settings.SEARCH_CLAIM_DEADLINE if deadline is None else deadline
+        
+        tasks = [asyncio.create_task(self.search(query, num_results=3)) for query in queries]
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=deadline)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+        for task in pending:
+            task.cancel()
+        if pending:
+            print(f"[SearchService] {len(pending)}/{len(tasks)} queries missed the {deadline}s deadline", flush=True)
         
         all_results = []
         fact_check_results = []
         
-        for query in queries[:2]:  # Limit API calls
-            results = await self.search(query, num_results=3)
-            for result in results:
+        # Walk tasks in query order so the fact-check query's results come first
+        for task in tasks:
+            if task not in done or task.exception() is not None:
+                continue
+            for result in task.result():
                 # Check if it's from a fact-checking source
                 source = result.get("source", "").lower()
                 if any(fc in source for fc in [
@@ -152,7 +311,9 @@ class SearchService:
         return {
             "fact_check_sources": fact_check_results[:3],
             "other_sources": all_results[:5],
-            "total_results": len(fact_check_results) + len(all_results)
+            "total_results": len(fact_check_results) + len(all_results),
+            "queries_completed": len(done),
+            "queries_timed_out": len(pending)
         }
     
     def format_sources_for_analysis(self, search_results: Dict) -> str:
@@ -0,0 +1,144 @@
+"""
+Analysis parser
+Splits Gemini markdown analyses into sections and bullets in one pass
+"""
+import json
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# Section titles whose bullets are reported as reasons / verification tips
+REASON_KEYWORDS = ('reason', 'finding', 'issue', 'concern', 'red flag', 'key claim')
+TIP_KEYWORDS = ('recommendation', 'tip', 'suggestion', 'verification')
+ASSESSMENT_KEYWORD = 'reliability assessment'
+
+MAX_REASONS = 5
+MAX_TIPS = 4
+# Shorter bullets are usually fragments ("- None") rather than findings
+MIN_ITEM_LENGTH = 11
+# A plain "Key Findings:" line is only taken as a header when it is this short
+MAX_LABEL_LENGTH = 60
+
+# One alternative per line kind; every line of the text matches exactly one.
+# Groups are greedy to the end of the line (trailing whitespace is stripped
+# afterwards), which avoids backtracking on long lines.
+_LINE_RE = re.compile(r"""
+    ^[ \t]*(?:
+        \#{1,6}[ \t]+(?P<heading>[^\n]*)
+      | \*\*(?P<bold>[^*\n]+)\*\*:?[ \t]*$
+      | (?:[-•*+]|\d+[.)])[ \t]+(?P<bullet>[^\n]*)
+      | (?P<text>[^\n]*)
+    )
+""", re.MULTILINE | re.VERBOSE)
+
+_JSON_FENCE_RE = re.compile(r"^```(?:json)?\s*(.*?)\s*```$", re.DOTALL)
+
+
+class Section(NamedTuple):
+    """A header and the bullets below it, with the character span of its body"""
+    title: str
+    bullets: List[str]
+    start: int
+    end: int
+
+
+class ParsedAnalysis(NamedTuple):
+    """Section tree of a Gemini analysis"""
+    text: str
+    sections: List[Section]
+
+    def _items(self, keywords: Tuple[str, ...], limit: int) -> List[str]:
+        items = []
+        for section in self.sections:
+            title = section.title.lower()
+            if not any(keyword in title for keyword in keywords):
+                continue
+            for bullet in section.bullets:
+                if len(bullet) >= MIN_ITEM_LENGTH:
+                    items.append(bullet)
+                    if len(items) >= limit:
+                        return items
+        return items
+
+    @property
+    def reasons(self) -> List[str]:
+        """Bullets of the findings / reasons sections"""
+        return self._items(REASON_KEYWORDS, MAX_REASONS)
+
+    @property
+    def tips(self) -> List[str]:
+        """Bullets of the recommendation / verification sections"""
+        return self._items(TIP_KEYWORDS, MAX_TIPS)
+
+    @property
+    def assessment_span(self) -> Optional[Tuple[int, int]]:
+        """Character span of the Reliability Assessment section body, if any"""
+        for section in self.sections:
+            if ASSESSMENT_KEYWORD in section.title.lower():
+                return section.start, section.end
+        return None
+
+
+def parse_analysis(analysis: str) -> ParsedAnalysis:
+    """
+    Build the section tree of a Gemini analysis
+
+    Markdown headings, bold-only lines and short "Label:" lines open a
+    section; bullet and numbered lines become its items. Text before the
+    first header lands in an untitled section.
+
+    Args:
+        analysis: Gemini analysis text
+
+    Returns:
+        ParsedAnalysis
+    """
+    sections: List[Section] = []
+    title = ""
+    bullets: List[str] = []
+    start = 0
+
+    for match in _LINE_RE.finditer(analysis):
+        heading = match.group("heading")
+        if heading is None:
+            heading = match.group("bold")
+        if heading is None:
+            bullet = match.group("bullet")
+            if bullet is not None:
+                bullet = bullet.rstrip()
+                if bullet:
+                    bullets.append(bullet)
+                continue
+            text = match.group("text").rstrip()
+            if not (text.endswith(":") and len(text) <= MAX_LABEL_LENGTH):
+                continue
+            heading = text
+        sections.append(Section(title, bullets, start, match.start()))
+        title = heading.rstrip(" \t#:").strip()
+        bullets = []
+        start = match.end()
+
+    sections.append(Section(title, bullets, start, len(analysis)))
+    return ParsedAnalysis(analysis, sections)
+
+
+def decode_verdict(analysis: str) -> Optional[Dict[str, Any]]:
+    """
+    Decode a JSON verdict object, tolerating a surrounding code fence
+
+    Args:
+        analysis: Gemini response text
+
+    Returns:
+        The decoded object, or None if the text is not a JSON object
+    """
+    text = analysis.strip()
+    fence = _JSON_FENCE_RE.match(text)
+    if fence:
+        text = fence.group(1)
+    if not text.startswith("{"):
+        return None
+    try:
+        verdict = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    return verdict if isinstance(verdict, dict) else None
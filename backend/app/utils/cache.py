@@ -0,0 +1,527 @@
+"""
+Caching utilities
+In-memory TTL/LRU cache with an optional SQLite-backed tier
+"""
+import asyncio
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class TTLCache:
+    """Thread-safe in-memory cache with per-entry TTL and LRU eviction"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600):
+        """
+        Initialize cache
+
+        Args:
+            max_entries: Maximum number of entries kept before evicting the least recently used
+            ttl: Default time-to-live in seconds
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a key
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Tuple of (found, value)
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """
+        Store a value
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Optional time-to-live overriding the default
+        """
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        """Remove a key if present"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    Persistent key/value cache stored in SQLite
+
+    Entries are namespaced so several caches can share one database file,
+    and several worker processes can share one cache. One connection is
+    kept open. Reads only record when a key was used; those access times
+    are written in batches, and expired or least recently used entries are
+    evicted every ``evict_every`` writes or ``evict_interval`` seconds
+    rather than on every write.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        namespace: str,
+        max_entries: int = 100_000,
+        max_bytes: Optional[int] = None,
+        compress: bool = False,
+        touch_batch: int = 256,
+        evict_every: int = 100,
+        evict_interval: float = 60
+    ):
+        """
+        Initialize SQLite cache
+
+        Args:
+            db_path: Path to the SQLite database file
+            namespace: Namespace separating this cache from others in the same file
+            max_entries: Maximum number of entries in this namespace
+            max_bytes: Optional maximum total stored size in bytes for this namespace
+            compress: Store values zlib-compressed
+            touch_batch: Pending access times written together
+            evict_every: Writes between eviction passes
+            evict_interval: Longest time in seconds between eviction passes while writing
+        """
+        self.db_path = str(db_path)
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.touch_batch = touch_batch
+        self.evict_every = evict_every
+        self.evict_interval = evict_interval
+        self.evictions = 0
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._touched: Dict[str, float] = {}
+        self._writes_since_evict = 0
+        self._last_evict = time.monotonic()
+        self.init_database()
+
+    def init_database(self):
+        """Initialize cache table"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_cache_accessed
+                ON cache_entries(namespace, accessed_at)
+            """)
+            self._conn.commit()
+
+    def get(self, key: str) -> Tuple[bool, Optional[bytes]]:
+        """
+        Look up a key
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Tuple of (found, raw bytes)
+        """
+        entry = self.get_entry(key)
+        if entry is None:
+            return False, None
+        return True, entry[0]
+
+    def get_entry(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """
+        Look up a key along with its expiry time
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Tuple of (raw bytes, expires_at timestamp) or None if missing/expired
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                return None  # expired rows are removed by the next eviction pass
+            self._touched[key] = now
+            if len(self._touched) >= self.touch_batch:
+                self._write_touches()
+                self._conn.commit()
+
+        value, expires_at = row
+        if self.compress:
+            value = zlib.decompress(value)
+        return value, expires_at
+
+    def _write_touches(self):
+        """Write pending access times (lock held, caller commits)"""
+        if not self._touched:
+            return
+        self._conn.executemany(
+            "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+            [(accessed_at, self.namespace, key) for key, accessed_at in self._touched.items()]
+        )
+        self._touched.clear()
+
+    def set(self, key: str, value: bytes, ttl: float):
+        """
+        Store raw bytes
+
+        Args:
+            key: Cache key
+            value: Bytes to store
+            ttl: Time-to-live in seconds
+        """
+        if self.compress:
+            value = zlib.compress(value, 6)
+        now = time.time()
+        with self._lock:
+            self._touched.pop(key, None)
+            self._conn.execute("""
+                INSERT OR REPLACE INTO cache_entries (
+                    namespace, key, value, size, expires_at, accessed_at
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            """, (self.namespace, key, value, len(value), now + ttl, now))
+            self._writes_since_evict += 1
+            if (self._writes_since_evict >= self.evict_every
+                    or time.monotonic() - self._last_evict >= self.evict_interval):
+                self._write_touches()
+                self._evict(now)
+            self._conn.commit()
+
+    def flush(self):
+        """Write pending access times and run an eviction pass"""
+        with self._lock:
+            self._write_touches()
+            self._evict(time.time())
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        """Drop expired entries, then least recently used ones over the limits (lock held)"""
+        self._writes_since_evict = 0
+        self._last_evict = time.monotonic()
+        cursor = self._conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?",
+            (self.namespace, now)
+        )
+        self.evictions += cursor.rowcount
+
+        count, total_size = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?",
+            (self.namespace,)
+        ).fetchone()
+
+        over_count = count - self.max_entries
+        over_bytes = total_size - self.max_bytes if self.max_bytes else 0
+        if over_count <= 0 and over_bytes <= 0:
+            return
+
+        doomed = []
+        # Walk the access-time index lazily; only the oldest few rows are read
+        rows = self._conn.execute(
+            "SELECT key, size FROM cache_entries WHERE namespace = ? ORDER BY accessed_at ASC",
+            (self.namespace,)
+        )
+        for key, size in rows:
+            if over_count <= 0 and over_bytes <= 0:
+                break
+            doomed.append((self.namespace, key))
+            over_count -= 1
+            over_bytes -= size
+        rows.close()
+        self._conn.executemany(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+            doomed
+        )
+        self.evictions += len(doomed)
+
+    def delete(self, key: str):
+        """Remove a key if present"""
+        with self._lock:
+            self._touched.pop(key, None)
+            self._conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Remove all entries in this namespace"""
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+            self._conn.commit()
+
+    def close(self):
+        """Write pending access times and close the connection"""
+        with self._lock:
+            self._write_touches()
+            self._conn.commit()
+            self._conn.close()
+
+    def get_stats(self) -> Dict:
+        """Get entry count and stored size for this namespace"""
+        with self._lock:
+            count, total_size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?",
+                (self.namespace,)
+            ).fetchone()
+        return {"entries": count, "bytes": total_size}
+
+
+class TieredCache:
+    """
+    Two-level cache: in-memory LRU in front of an optional SQLite tier
+
+    Values are kept as Python objects in memory and serialized with
+    ``dumps``/``loads`` when written to or read from SQLite. Coroutines
+    look keys up with aget(), which reads the SQLite tier on a worker
+    thread. set() stores in memory at once and hands the SQLite write to
+    a single background writer thread, so neither blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 1024,
+        ttl: float = 3600,
+        db_path: Optional[str] = None,
+        disk_max_entries: int = 100_000,
+        disk_max_bytes: Optional[int] = None,
+        compress: bool = False,
+        dumps: Optional[Callable[[Any], bytes]] = None,
+        loads: Optional[Callable[[bytes], Any]] = None,
+        enabled: bool = True
+    ):
+        """
+        Initialize tiered cache
+
+        Args:
+            name: Cache name, also used as the SQLite namespace
+            max_entries: Maximum in-memory entries
+            ttl: Default time-to-live in seconds
+            db_path: SQLite file for the persistent tier (None for memory only)
+            disk_max_entries: Maximum entries in the persistent tier
+            disk_max_bytes: Optional maximum stored bytes in the persistent tier
+            compress: Compress values in the persistent tier
+            dumps: Serializer used for the persistent tier
+            loads: Deserializer used for the persistent tier
+            enabled: When False every lookup misses and nothing is stored
+        """
+        self.name = name
+        self.enabled = enabled
+        self.ttl = ttl
+        self.memory = TTLCache(max_entries=max_entries, ttl=ttl)
+        self.disk: Optional[SQLiteCache] = None
+        self._writer: Optional[ThreadPoolExecutor] = None
+        if enabled and db_path:
+            self.disk = SQLiteCache(
+                db_path,
+                namespace=name,
+                max_entries=disk_max_entries,
+                max_bytes=disk_max_bytes,
+                compress=compress
+            )
+            # One thread, so writes reach SQLite in the order they were made
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"cache-{name}")
+        self._dumps = dumps or (lambda value: value)
+        self._loads = loads or (lambda raw: raw)
+
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a key in memory, then in the persistent tier (blocking; use aget() in coroutines)
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Tuple of (found, value)
+        """
+        if not self.enabled:
+            return False, None
+
+        found, value = self._memory_get(key)
+        if found or not self.disk:
+            return found, value
+        return self._disk_get(key)
+
+    async def aget(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a key, reading the persistent tier off the event loop
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Tuple of (found, value)
+        """
+        if not self.enabled:
+            return False, None
+
+        found, value = self._memory_get(key)
+        if found or not self.disk:
+            return found, value
+        return await asyncio.to_thread(self._disk_get, key)
+
+    def _memory_get(self, key: str) -> Tuple[bool, Any]:
+        """Look up the in-memory tier, counting a miss only when there is no disk tier"""
+        found, value = self.memory.get(key)
+        if found:
+            self.hits += 1
+            self.memory_hits += 1
+        elif not self.disk:
+            self.misses += 1
+        return found, value
+
+    def _disk_get(self, key: str) -> Tuple[bool, Any]:
+        """Look up the persistent tier and promote a hit to memory"""
+        try:
+            entry = self.disk.get_entry(key)
+            if entry is not None:
+                raw, expires_at = entry
+                value = self._loads(raw)
+                # Keep the remaining lifetime (negative entries stay short-lived)
+                self.memory.set(key, value, ttl=expires_at - time.time())
+                self.hits += 1
+                self.disk_hits += 1
+                return True, value
+        except Exception as e:
+            self.errors += 1
+            print(f"[Cache:{self.name}] Disk read error: {e}", flush=True)
+
+        self.misses += 1
+        return False, None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """
+        Store a value in memory, and queue its write to the persistent tier
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Optional time-to-live overriding the default
+        """
+        if not self.enabled:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        self.memory.set(key, value, ttl=ttl)
+        if self._writer is not None:
+            try:
+                self._writer.submit(self._disk_set, key, value, ttl)
+            except RuntimeError:
+                pass  # writer already shut down
+
+    def _disk_set(self, key: str, value: Any, ttl: float):
+        """Serialize and write a value to the persistent tier (writer thread)"""
+        try:
+            self.disk.set(key, self._dumps(value), ttl=ttl)
+        except Exception as e:
+            self.errors += 1
+            print(f"[Cache:{self.name}] Disk write error: {e}", flush=True)
+
+    def flush(self):
+        """Wait for queued writes, then write pending access times and evict"""
+        if self._writer is None:
+            return
+        self._writer.submit(self.disk.flush).result()
+
+    def close(self):
+        """Finish queued writes and close the persistent tier"""
+        if self._writer is None:
+            return
+        writer, self._writer = self._writer, None
+        writer.shutdown(wait=True)
+        self.disk.close()
+
+    def delete(self, key: str):
+        """Remove a key from both tiers"""
+        self.memory.delete(key)
+        if self._writer is not None:
+            self._writer.submit(self.disk.delete, key)
+
+    def clear(self):
+        """Remove all entries from both tiers"""
+        self.memory.clear()
+        if self._writer is not None:
+            self._writer.submit(self.disk.clear).result()
+
+    async def aget_stats(self) -> Dict:
+        """Get hit/miss counters and sizes, counting the persistent tier off the event loop"""
+        return await asyncio.to_thread(self.get_stats)
+
+    def get_stats(self) -> Dict:
+        """Get hit/miss counters and sizes (blocking when there is a persistent tier; use aget_stats() in coroutines)"""
+        lookups = self.hits + self.misses
+        stats = {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "errors": self.errors,
+            "memory_entries": len(self.memory),
+            "memory_evictions": self.memory.evictions,
+        }
+        if self.disk and self._writer is not None:
+            try:
+                disk_stats = self.disk.get_stats()
+                stats["disk_entries"] = disk_stats["entries"]
+                stats["disk_bytes"] = disk_stats["bytes"]
+                stats["disk_evictions"] = self.disk.evictions
+            except Exception as e:
+                stats["disk_error"] = str(e)
+        return stats
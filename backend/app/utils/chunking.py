@@ -0,0 +1,82 @@
+"""
+Document chunking
+Splits long text into overlapping windows with content-defined boundaries
+"""
+import re
+import zlib
+from typing import List, NamedTuple
+
+# A chunk may end after a paragraph whose checksum is divisible by this, once past its minimum size
+BOUNDARY_DIVISOR = 4
+
+_PARAGRAPH_RE = re.compile(r"\S.*?(?=\n[ \t]*\n|\Z)", re.DOTALL)
+
+
+class Chunk(NamedTuple):
+    """One analysis window; ``text`` starts with the overlap taken from the previous chunk"""
+    index: int
+    start: int
+    end: int
+    text: str
+
+
+def _paragraph_spans(text: str, max_chars: int) -> List[tuple]:
+    """Paragraph spans, with paragraphs longer than max_chars split at whitespace"""
+    spans = []
+    for match in _PARAGRAPH_RE.finditer(text):
+        start, end = match.span()
+        while end - start > max_chars:
+            cut = text.rfind(" ", start + max_chars // 2, start + max_chars)
+            cut = cut if cut > start else start + max_chars
+            spans.append((start, cut))
+            start = cut
+        spans.append((start, end))
+    return spans
+
+
+def split_chunks(text: str, max_chars: int = 12000, overlap: int = 500) -> List[Chunk]:
+    """
+    Split text into chunks of whole paragraphs
+
+    A chunk ends once it is at least half of ``max_chars`` long and its last
+    paragraph's checksum hits BOUNDARY_DIVISOR, or when the next paragraph
+    would not fit. Because boundaries depend on paragraph content rather
+    than on absolute offsets, editing one part of a document moves the
+    boundaries of the chunk it is in (and at most the next), and the other
+    chunks come out identical, so their cached analyses stay valid.
+
+    Args:
+        text: Document text
+        max_chars: Largest chunk, excluding overlap
+        overlap: Characters of the previous chunk repeated at the start of each chunk for context
+
+    Returns:
+        Chunks in document order
+    """
+    spans = _paragraph_spans(text, max_chars)
+    bounds = []
+    chunk_start = None
+    for start, end in spans:
+        if chunk_start is None:
+            chunk_start = start
+        elif end - chunk_start > max_chars:
+            bounds.append((chunk_start, previous_end))
+            chunk_start = start
+        previous_end = end
+        size = end - chunk_start
+        if size >= max_chars // 2 and zlib.crc32(text[start:end].encode("utf-8")) % BOUNDARY_DIVISOR == 0:
+            bounds.append((chunk_start, end))
+            chunk_start = None
+    if chunk_start is not None:
+        bounds.append((chunk_start, previous_end))
+
+    chunks = []
+    for index, (start, end) in enumerate(bounds):
+        window_start = start
+        if index and overlap:
+            # Begin the overlap at a word boundary
+            window_start = max(start - overlap, bounds[index - 1][0])
+            space = text.find(" ", window_start, start)
+            window_start = space + 1 if space != -1 else start
+        chunks.append(Chunk(index, start, end, text[window_start:end]))
+    return chunks
@@ -0,0 +1,61 @@
+"""
+Claim extraction
+Picks the checkable claims of a long document with cheap local heuristics
+"""
+from typing import List, Tuple
+
+from app.utils.claim_index import claim_words
+from app.utils.prompt_budget import sentence_salience, split_sentences
+
+MIN_WORDS = 6
+MAX_WORDS = 60
+# Salience of a plain sentence is 1.0; require at least one claim signal
+MIN_SALIENCE = 1.8
+# Claims sharing this fraction of their content words are treated as one
+DUPLICATE_SIMILARITY = 0.7
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def extract_claims(text: str, max_claims: int = 8) -> List[str]:
+    """
+    Split a document into sentences and keep its most checkable claims
+
+    Sentences that are too short or long, questions, and sentences with no
+    numbers, names, quotes or reporting/causal verbs are dropped. The rest
+    are ranked by salience; near-duplicates (same content words, any
+    order) of a higher-ranked claim are skipped.
+
+    Args:
+        text: Document text
+        max_claims: Most claims returned
+
+    Returns:
+        Claims in document order
+    """
+    candidates: List[Tuple[float, int, str]] = []
+    for position, sentence in enumerate(split_sentences(text)):
+        words = len(sentence.split())
+        if words < MIN_WORDS or words > MAX_WORDS or sentence.endswith("?"):
+            continue
+        # No lead-sentence bonus: a claim needs a signal of its own
+        score = sentence_salience(sentence)
+        if score >= MIN_SALIENCE:
+            candidates.append((score, position, sentence))
+    candidates.sort(key=lambda item: (-item[0], item[1]))
+
+    chosen: List[Tuple[int, str, frozenset]] = []
+    for _, position, sentence in candidates:
+        words, negations = claim_words(sentence)
+        signature = frozenset(words) | negations
+        if any(_jaccard(signature, other) >= DUPLICATE_SIMILARITY for _, _, other in chosen):
+            continue
+        chosen.append((position, sentence, signature))
+        if len(chosen) >= max_claims:
+            break
+
+    return [sentence for _, sentence, _ in sorted(chosen)]
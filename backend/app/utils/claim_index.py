@@ -0,0 +1,341 @@
+"""
+Claim similarity index
+MinHash signatures with locality-sensitive hashing over content words
+"""
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
+
+# Mersenne prime used for the universal hash family
+_PRIME = (1 << 61) - 1
+
+# Filler words only: comparatives ("over", "more", "than"), quantifiers and
+# reporting verbs stay, since they change what a claim says
+_STOPWORDS = frozenset("""
+a an the is are was were be been being am of to in on at by for from with as and or but
+that this these those it its itself they them their there here which who whom whose what
+when where why how so such very do does did done has have had having also just
+""".split())
+
+# Negations must agree for two claims to match ("X causes Y" vs "X does not cause Y")
+_NEGATIONS = frozenset({"not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "cannot", "without"})
+
+# Passive voice ("Y is caused by X") is turned around to "X caused Y"
+_PASSIVE_AUXILIARIES = frozenset({"is", "are", "was", "were", "be", "been", "being"})
+
+# A passive agent ends where a qualifying phrase begins ("by Biden in 2020")
+_PREPOSITIONS = frozenset({
+    "in", "on", "at", "for", "from", "with", "to", "into", "during", "since",
+    "after", "before", "across", "within", "among", "about", "per", "by"
+})
+
+_SUFFIXES = ("ing", "ed", "es", "s")
+_TOKEN_RE = re.compile(r"\d+(?:[.,]\d+)*%?|[a-z]+")
+_CLAUSE_RE = re.compile(r"[,;:!?()]|\.(?!\d)|\s[-–—]\s")
+
+
+class ClaimTokens(NamedTuple):
+    """Comparable form of a claim"""
+    words: FrozenSet[str]
+    order: Tuple[str, ...]
+    numbers: Tuple[str, ...]
+    negations: FrozenSet[str]
+
+
+def _active_voice(tokens: List[str]) -> List[str]:
+    """Rewrite "Y is <verb>ed by X" as "X <verb>ed Y" within one clause"""
+    for i, token in enumerate(tokens):
+        if token not in _PASSIVE_AUXILIARIES:
+            continue
+        # The participle may follow a negation or adverb ("is not caused by")
+        for j in (i + 2, i + 3):
+            if j < len(tokens) and tokens[j] == "by" and tokens[j - 1] not in _STOPWORDS:
+                end = next((k for k in range(j + 1, len(tokens)) if tokens[k] in _PREPOSITIONS), len(tokens))
+                return tokens[j + 1:end] + tokens[i + 1:j] + tokens[:i] + tokens[end:]
+    return tokens
+
+
+def _stem(word: str) -> str:
+    """Crude suffix stripping, so plurals and tenses compare equal"""
+    if len(word) > 4 and word.endswith("ies"):
+        word = word[:-3] + "y"  # studies / study
+    for suffix in _SUFFIXES:
+        if len(word) >= len(suffix) + 3 and word.endswith(suffix):
+            word = word[:-len(suffix)]
+            break
+    if len(word) > 4 and word.endswith("e"):
+        word = word[:-1]  # cause / caus(ed)
+    return word
+
+
+def claim_words(content: str) -> Tuple[List[str], FrozenSet[str]]:
+    """
+    Reduce a claim to its stemmed words in active-voice order, without filler words
+
+    Args:
+        content: Claim text
+
+    Returns:
+        Tuple of (words, negation words present)
+    """
+    text = content.casefold().replace("n't", " not")
+    words = []
+    negations = set()
+    for clause in _CLAUSE_RE.split(text):
+        for word in _active_voice(_TOKEN_RE.findall(clause)):
+            if word in _NEGATIONS:
+                negations.add(word)
+                continue
+            if word in _STOPWORDS:
+                continue
+            words.append(word if word[0].isdigit() else _stem(word))
+    return words, frozenset(negations)
+
+
+def claim_tokens(content: str) -> ClaimTokens:
+    """
+    Reduce a claim to its set of content words plus the facts that must agree exactly
+
+    The word set ignores order, so "Vaccines cause autism in children" and
+    "In children, vaccines cause autism" compare equal; ``order`` keeps
+    the words in order for same_roles().
+
+    Args:
+        content: Claim text
+
+    Returns:
+        ClaimTokens
+    """
+    words, negations = claim_words(content)
+    numbers = tuple(sorted(word for word in words if word[0].isdigit()))
+    return ClaimTokens(frozenset(words), tuple(words), numbers, negations)
+
+
+def same_roles(a: ClaimTokens, b: ClaimTokens) -> bool:
+    """
+    Whether two claims put their shared words in the same order, up to moving one phrase
+
+    Moving one run of words elsewhere ("Last year, X rose 5%" vs "X rose
+    5% last year") keeps who did what to whom. Swapping words across a
+    verb ("Biden defeated Trump" vs "Trump defeated Biden") takes two
+    moves, and is rejected.
+    """
+    shared = a.words & b.words
+    x = list(dict.fromkeys(word for word in a.order if word in shared))
+    y = list(dict.fromkeys(word for word in b.order if word in shared))
+    # Trim the common ends; what is left must be a rotation, i.e. one run moved
+    start = 0
+    while start < len(x) and x[start] == y[start]:
+        start += 1
+    end = len(x)
+    while end > start and x[end - 1] == y[end - 1]:
+        end -= 1
+    x, y = x[start:end], y[start:end]
+    return any(x[k:] + x[:k] == y for k in range(len(x))) or not x
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Exact Jaccard similarity of two sets"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class ClaimIndex:
+    """
+    In-memory near-duplicate index over claims
+
+    Each claim's set of content words gets a MinHash signature of
+    ``num_perm`` values; the fraction of equal values estimates the Jaccard
+    similarity of two word sets. Signatures are split into ``bands``
+    bands hashed into buckets, so a lookup only compares claims sharing at
+    least one band rather than every stored claim. Adding a claim touches
+    only its own buckets, so the index grows incrementally.
+
+    The MinHash estimate only selects candidates. A candidate is confirmed
+    on the exact Jaccard similarity of the words, must contain the same
+    numbers and negations, since "rose 5%" and "rose 50%" share almost
+    every word, and must keep its core words in the same order, since
+    "Biden defeated Trump" and "Trump defeated Biden" share all of them.
+    Entries expire after ``ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+        max_entries: int = 50_000,
+        min_words: int = 3,
+        ttl: Optional[float] = None,
+        seed: int = 1
+    ):
+        """
+        Initialize index
+
+        Args:
+            threshold: Minimum Jaccard similarity of the content words counted as a match
+            num_perm: MinHash signature length
+            bands: LSH bands (num_perm must be divisible by it)
+            max_entries: Oldest claims are dropped beyond this many
+            min_words: Claims with fewer content words are not indexed or matched
+            ttl: Seconds a claim stays matchable (None keeps claims until evicted)
+            seed: Seed for the hash permutations
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_entries = max_entries
+        self.min_words = min_words
+        self.ttl = ttl
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randrange(1, _PRIME), rng.randrange(0, _PRIME))
+            for _ in range(num_perm)
+        ]
+
+        # Insertion order is expiry order, so expired claims are popped from the front
+        self._entries: "OrderedDict[int, Tuple[Tuple[int, ...], ClaimTokens, Any, float]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        self.lookups = 0
+        self.matches = 0
+        self.rejected = 0
+        self.expired = 0
+        self._lookup_time = 0.0
+
+    def signature(self, tokens: FrozenSet[str]) -> Tuple[int, ...]:
+        """MinHash signature of a token set"""
+        hashes = [
+            int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+            for token in tokens
+        ]
+        return tuple(
+            min((a * value + b) % _PRIME for value in hashes)
+            for a, b in self._permutations
+        )
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows])
+            for band in range(self.bands)
+        ]
+
+    def add(self, content: str, payload: Any, created_at: Optional[float] = None) -> Optional[int]:
+        """
+        Index a claim
+
+        Args:
+            content: Claim text
+            payload: Value returned by find() for this claim
+            created_at: When the payload was produced (defaults to now; sets the expiry)
+
+        Returns:
+            Entry id, or None if the claim is too short to index or already expired
+        """
+        tokens = claim_tokens(content)
+        if len(tokens.words) < self.min_words:
+            return None
+        now = time.time()
+        expires_at = (created_at or now) + self.ttl if self.ttl is not None else float("inf")
+        if expires_at <= now:
+            return None
+        signature = self.signature(tokens.words)
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (signature, tokens, payload, expires_at)
+            for key in self._band_keys(signature):
+                self._buckets.setdefault(key, set()).add(entry_id)
+            self._expire(now)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+        return entry_id
+
+    def _remove(self, entry_id: int):
+        signature = self._entries.pop(entry_id)[0]
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def _expire(self, now: float):
+        """Drop expired claims from the front of the index (lock held)"""
+        while self._entries:
+            entry_id, entry = next(iter(self._entries.items()))
+            if entry[3] > now:
+                break
+            self._remove(entry_id)
+            self.expired += 1
+
+    def find(self, content: str) -> Optional[Tuple[float, Any]]:
+        """
+        Find the most similar unexpired claim above the threshold
+
+        Args:
+            content: Claim text
+
+        Returns:
+            Tuple of (Jaccard similarity, payload) or None
+        """
+        started = time.monotonic()
+        tokens = claim_tokens(content)
+        match = None
+        if len(tokens.words) >= self.min_words:
+            signature = self.signature(tokens.words)
+            with self._lock:
+                self._expire(time.time())
+                candidates = set()
+                for key in self._band_keys(signature):
+                    candidates.update(self._buckets.get(key, ()))
+                best_score = 0.0
+                for entry_id in candidates:
+                    stored, stored_tokens, payload, _ = self._entries[entry_id]
+                    estimate = sum(x == y for x, y in zip(signature, stored)) / self.num_perm
+                    if estimate < self.threshold:
+                        continue
+                    score = jaccard(tokens.words, stored_tokens.words)
+                    if (score < self.threshold
+                            or stored_tokens.numbers != tokens.numbers
+                            or stored_tokens.negations != tokens.negations
+                            or not same_roles(tokens, stored_tokens)):
+                        self.rejected += 1
+                        continue
+                    if score > best_score:
+                        best_score = score
+                        match = (round(score, 4), payload)
+
+        self.lookups += 1
+        self._lookup_time += time.monotonic() - started
+        if match:
+            self.matches += 1
+        return match
+
+    def count(self) -> int:
+        """Number of indexed claims"""
+        return len(self._entries)
+
+    def get_stats(self) -> Dict:
+        """Get lookup counters and index size"""
+        return {
+            "entries": len(self._entries),
+            "buckets": len(self._buckets),
+            "threshold": self.threshold,
+            "lookups": self.lookups,
+            "matches": self.matches,
+            "rejected": self.rejected,
+            "expired": self.expired,
+            "avg_lookup_ms": round(self._lookup_time / self.lookups * 1000, 3) if self.lookups else 0.0,
+        }
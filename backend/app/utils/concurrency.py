@@ -0,0 +1,128 @@
+"""
+Concurrency limiting utilities
+Bounded admission for calls to rate-limited upstream services
+"""
+import asyncio
+import time
+from typing import Dict, Optional
+
+
+class OverloadedError(Exception):
+    """Raised when a limiter's wait queue is full or a caller waited too long"""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """
+    Async semaphore with a bounded wait queue
+
+    At most ``max_concurrency`` callers hold a slot at once. Up to
+    ``max_queue`` more may wait for one; further callers are rejected
+    immediately with OverloadedError instead of piling up. Waiters that do
+    not get a slot within ``queue_timeout`` seconds are rejected too.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: Optional[float] = None,
+        retry_after: int = 1
+    ):
+        """
+        Initialize limiter
+
+        Args:
+            name: Name used in error messages and stats
+            max_concurrency: Maximum callers holding a slot
+            max_queue: Maximum callers waiting for a slot
+            queue_timeout: Optional maximum seconds a caller may wait
+            retry_after: Seconds suggested to rejected callers
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+        self._queued = 0
+
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    async def acquire(self):
+        """
+        Take a slot, waiting in the bounded queue if necessary
+
+        Raises:
+            OverloadedError: If the queue is full or the wait timed out
+        """
+        if not self._semaphore.locked():
+            # Free slot: take it without suspending so the next caller sees it taken
+            await self._semaphore.acquire()
+            self.admitted += 1
+            self._in_flight += 1
+            return
+
+        if self._queued >= self.max_queue:
+            self.rejected += 1
+            raise OverloadedError(
+                f"{self.name} is at capacity ({self._in_flight} running, {self._queued} queued)",
+                retry_after=self.retry_after
+            )
+
+        self._queued += 1
+        start = time.monotonic()
+        try:
+            if self.queue_timeout is None:
+                await self._semaphore.acquire()
+            else:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise OverloadedError(
+                f"{self.name} queue wait exceeded {self.queue_timeout}s",
+                retry_after=self.retry_after
+            )
+        finally:
+            self._queued -= 1
+
+        waited = time.monotonic() - start
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+        self.admitted += 1
+        self._in_flight += 1
+
+    def release(self):
+        """Give a slot back"""
+        self._in_flight -= 1
+        self._semaphore.release()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+    def get_stats(self) -> Dict:
+        """Get queue depth and wait time statistics"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queued": self._queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait_ms": round(self._total_wait / self.admitted * 1000, 2) if self.admitted else 0.0,
+            "max_wait_ms": round(self._max_wait * 1000, 2),
+        }
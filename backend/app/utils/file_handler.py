@@ -1,14 +1,50 @@
 """
 File handling utilities
 """
+import asyncio
 import os
+import hashlib
 from pathlib import Path
-from fastapi import UploadFile
-from app.config import UPLOAD_FOLDER, ALLOWED_EXTENSIONS, MAX_FILE_SIZE
+from tempfile import SpooledTemporaryFile
+from typing import Dict, List, NamedTuple, Optional
+import aiofiles
+from fastapi import Request, UploadFile
+from multipart.multipart import MultipartParser, parse_options_header
+from app.config import settings, UPLOAD_FOLDER, ALLOWED_EXTENSIONS, MAX_FILE_SIZE
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Uploads are copied in chunks of this size so memory stays constant per request
+CHUNK_SIZE = 1024 * 1024  # 1MB
+# Longest plain (non-file) form field accepted alongside an upload
+MAX_FIELD_SIZE = 64 * 1024
+
+
+class FileTooLargeError(Exception):
+    """Raised when an upload exceeds MAX_FILE_SIZE"""
+
+
+class UploadFormError(Exception):
+    """Raised when a multipart upload is malformed or has no file"""
+
+
+class SavedUpload(NamedTuple):
+    """An upload written to disk"""
+    path: str
+    sha256: str
+    size: int
+
+
+class ReceivedUpload(NamedTuple):
+    """A multipart upload held in a spooled temporary file (the caller closes it)"""
+    file: SpooledTemporaryFile
+    filename: str
+    fields: Dict[str, str]
+    sha256: str
+    size: int
+    in_memory: bool
+
 
 class FileHandler:
     """Handles file operations"""
@@ -44,23 +80,119 @@ class FileHandler:
             
         Returns:
             Path to saved file
-        """
-        ext = Path(file.filename).suffix.lower()
-        file_path = Path(UPLOAD_FOLDER) / f"{file_id}{ext}"
         
+        Raises:
+            FileTooLargeError: If the upload exceeds MAX_FILE_SIZE
+        """
+        file_path = self._upload_path(file, file_id)
         logger.info(f"Saving file to: {file_path}")
         
-        # Read and save file
-        with open(file_path, 'wb') as f:
-            contents = file.file.read()
-            logger.info(f"Read {len(contents)} bytes from uploaded file")
-            if len(contents) > MAX_FILE_SIZE:
-                raise Exception("File size exceeds maximum allowed")
-            f.write(contents)
+        size = 0
+        saved = False
+        try:
+            with open(file_path, 'wb') as f:
+                for chunk in iter(lambda: file.file.read(CHUNK_SIZE), b""):
+                    size = self._check_chunk(chunk, size)
+                    f.write(chunk)
+            saved = True
+        finally:
+            if not saved:
+                # Too large, a disk error or a cancelled request: drop the partial file
+                file_path.unlink(missing_ok=True)
         
-        logger.info(f"File saved successfully: {file_path}")
+        logger.info(f"File saved successfully: {file_path} ({size} bytes)")
         return str(file_path)
     
+    async def save_upload(self, file: UploadFile, file_id: str) -> SavedUpload:
+        """
+        Stream an uploaded file to disk without blocking the event loop
+        
+        The upload is copied chunk by chunk, hashed along the way, and
+        aborted as soon as it crosses MAX_FILE_SIZE.
+        
+        Args:
+            file: UploadFile object
+            file_id: Unique file identifier
+            
+        Returns:
+            SavedUpload with path, SHA-256 hex digest and size
+        
+        Raises:
+            FileTooLargeError: If the upload exceeds MAX_FILE_SIZE
+        """
+        file_path = self._upload_path(file, file_id)
+        logger.info(f"Saving file to: {file_path}")
+        
+        digest = hashlib.sha256()
+        size = 0
+        saved = False
+        try:
+            async with aiofiles.open(file_path, 'wb') as f:
+                while True:
+                    chunk = await file.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size = self._check_chunk(chunk, size, digest)
+                    await f.write(chunk)
+            saved = True
+        finally:
+            if not saved:
+                # Too large, a disk error or a cancelled request: drop the partial file
+                file_path.unlink(missing_ok=True)
+        
+        logger.info(f"File saved successfully: {file_path} ({size} bytes)")
+        return SavedUpload(path=str(file_path), sha256=digest.hexdigest(), size=size)
+    
+    async def receive_upload(self, request: Request, file_field: str = "file") -> ReceivedUpload:
+        """
+        Read a multipart/form-data request, keeping its file in a spooled temporary file
+        
+        The body is parsed as it streams in. The file part is written to a
+        SpooledTemporaryFile held in memory up to UPLOAD_SPOOL_MAX_MEMORY
+        bytes and moved to a temp file beyond that (those writes run on a
+        worker thread). It is hashed along the way and rejected as soon as
+        it crosses MAX_FILE_SIZE. Other parts are kept as short text fields.
+        
+        Args:
+            request: Incoming request
+            file_field: Name of the form field holding the file
+            
+        Returns:
+            ReceivedUpload, rewound; the caller must close its file
+        
+        Raises:
+            FileTooLargeError: If the upload exceeds MAX_FILE_SIZE
+            UploadFormError: If the body is not multipart form data or has no file
+        """
+        reader = _UploadFormReader(request.headers.get("content-type", ""), file_field)
+        try:
+            async for chunk in request.stream():
+                await reader.feed(chunk)
+            upload = reader.finish()
+        except BaseException:
+            reader.spool.close()
+            raise
+        
+        logger.info(f"Upload {upload.filename}: {upload.size} bytes, {'in memory' if upload.in_memory else 'spooled to temp file'}")
+        return upload
+    
+    @staticmethod
+    def _upload_path(file: UploadFile, file_id: str) -> Path:
+        """Build the destination path for an upload"""
+        ext = Path(file.filename).suffix.lower()
+        return Path(UPLOAD_FOLDER) / f"{file_id}{ext}"
+    
+    @staticmethod
+    def _check_chunk(chunk: bytes, size: int, digest=None) -> int:
+        """Add a chunk to the running size (and hash), enforcing MAX_FILE_SIZE"""
+        size += len(chunk)
+        if size > MAX_FILE_SIZE:
+            logger.warning(f"Upload rejected after {size} bytes: exceeds {MAX_FILE_SIZE}")
+            raise FileTooLargeError("File size exceeds maximum allowed")
+        if digest is not None:
+            digest.update(chunk)
+        return size
+    
     def get_file_path(self, file_id: str) -> Path:
         """
         Get path to file by ID
@@ -76,6 +208,18 @@ class FileHandler:
             return file_path
         raise FileNotFoundError(f"File {file_id} not found")
     
+    def list_files(self) -> List[Path]:
+        """
+        List saved uploads
+        
+        Returns:
+            Paths of the files in the upload folder (file id is the stem)
+        """
+        return [
+            path for path in Path(UPLOAD_FOLDER).iterdir()
+            if path.is_file() and not path.name.startswith(".")
+        ]
+    
     def delete_file(self, file_id: str) -> bool:
         """
         Delete file by ID
@@ -92,3 +236,103 @@ class FileHandler:
             return True
         except FileNotFoundError:
             return False
+
+
+class _UploadFormReader:
+    """Streaming multipart/form-data parser that spools one file field"""
+
+    def __init__(self, content_type: str, file_field: str):
+        kind, params = parse_options_header(content_type)
+        if kind != b"multipart/form-data" or b"boundary" not in params:
+            raise UploadFormError("Expected a multipart/form-data upload")
+        self.file_field = file_field
+        self.spool = SpooledTemporaryFile(max_size=settings.UPLOAD_SPOOL_MAX_MEMORY)
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.filename: Optional[str] = None
+        self.fields: Dict[str, str] = {}
+
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._kind: Optional[str] = None  # "file", "field", or None for a part that is skipped
+        self._name = ""
+        self._value = bytearray()
+        # File data parsed from the current body chunk, written by feed()
+        self._pending: List[bytes] = []
+        self._parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+
+    def _on_part_begin(self):
+        self._disposition = b""
+        self._kind = None
+        self._value = bytearray()
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        if b"name" not in options:
+            raise UploadFormError('Form part without a Content-Disposition "name"')
+        self._name = options[b"name"].decode("utf-8", "replace")
+        if b"filename" not in options:
+            self._kind = "field"
+        elif self._name == self.file_field and self.filename is None:
+            self._kind = "file"
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._kind == "file":
+            self._pending.append(data[start:end])
+        elif self._kind == "field":
+            self._value += data[start:end]
+            if len(self._value) > MAX_FIELD_SIZE:
+                raise UploadFormError(f"Form field '{self._name}' is too long")
+
+    def _on_part_end(self):
+        if self._kind == "field":
+            self.fields[self._name] = self._value.decode("utf-8", "replace")
+
+    async def feed(self, chunk: bytes):
+        """Parse a chunk of the body and spool the file data it contained"""
+        self._parser.write(chunk)
+        for data in self._pending:
+            self.size = FileHandler._check_chunk(data, self.size, self.digest)
+            if self.size > settings.UPLOAD_SPOOL_MAX_MEMORY:
+                # The spool is (or is about to be) a real file
+                await asyncio.to_thread(self.spool.write, data)
+            else:
+                self.spool.write(data)
+        self._pending.clear()
+
+    def finish(self) -> ReceivedUpload:
+        """Check the body was complete and rewind the spooled file"""
+        self._parser.finalize()
+        if self.filename is None:
+            raise UploadFormError("File is required")
+        self.spool.seek(0)
+        return ReceivedUpload(
+            file=self.spool,
+            filename=self.filename,
+            fields=self.fields,
+            sha256=self.digest.hexdigest(),
+            size=self.size,
+            in_memory=self.size <= settings.UPLOAD_SPOOL_MAX_MEMORY
+        )
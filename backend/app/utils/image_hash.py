@@ -0,0 +1,364 @@
+"""
+Perceptual image hashing
+64-bit dHash fingerprints, 256-bit pHash confirmation and a SQLite-backed near-duplicate index
+"""
+import math
+import sqlite3
+import threading
+import time
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from PIL import Image, ImageOps
+
+from app.utils.sources import FileSource, open_source
+
+HASH_BITS = 64
+CHUNKS = 4
+CHUNK_BITS = HASH_BITS // CHUNKS
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+# pHash: low 16x16 DCT frequencies of a 64x64 thumbnail
+DETAIL_SIZE = 16
+DETAIL_SAMPLE = 64
+DETAIL_BITS = DETAIL_SIZE * DETAIL_SIZE
+# Expired and surplus rows are removed once per this many inserts
+EVICT_EVERY = 100
+
+ImageInput = Union[FileSource, Image.Image]
+
+
+class ImageMatch(NamedTuple):
+    """A stored image close to the query under both hashes"""
+    row_id: int
+    distance: int
+    detail_distance: int
+    text: Optional[str]
+    payload: str
+
+
+def _grayscale(source: ImageInput, draft_size: int) -> Image.Image:
+    """Decode (unless already decoded), orient and convert an image to grayscale"""
+    if isinstance(source, Image.Image):
+        return source.convert("L")
+    img = Image.open(open_source(source))
+    # Let JPEG decode at reduced scale; only small thumbnails are needed
+    img.draft("L", (draft_size, draft_size))
+    return ImageOps.exif_transpose(img).convert("L")
+
+
+def dhash(source: ImageInput, size: int = 8) -> int:
+    """
+    Compute a 64-bit difference hash of an image
+
+    The image is reduced to a (size + 1) x size grayscale thumbnail and
+    each bit records whether a pixel is brighter than its right neighbour,
+    so recompression, resizing and small colour changes keep the hash
+    within a few bits.
+
+    Args:
+        source: Path to image file, its bytes / open binary file object, or a decoded image
+        size: Hash side length (8 gives 64 bits)
+
+    Returns:
+        Hash as an unsigned integer
+    """
+    img = _grayscale(source, size * 8).resize((size + 1, size), Image.LANCZOS)
+    pixels = list(img.getdata())
+
+    value = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def _dct_table(size: int, sample: int) -> List[List[float]]:
+    """Cosine factors of the first ``size`` DCT-II frequencies over ``sample`` points"""
+    return [
+        [math.cos(math.pi * k * (2 * n + 1) / (2 * sample)) for n in range(sample)]
+        for k in range(size)
+    ]
+
+
+_DCT = _dct_table(DETAIL_SIZE, DETAIL_SAMPLE)
+
+
+def phash(source: ImageInput) -> int:
+    """
+    Compute a 256-bit DCT hash of an image
+
+    Bits record whether each of the 16x16 lowest DCT frequencies of a 64x64
+    grayscale thumbnail is above their median. It sees four times finer
+    detail than the 64-bit dHash (e.g. lines of text in a screenshot) and
+    is used to confirm dHash matches.
+
+    Args:
+        source: Path to image file, its bytes / open binary file object, or a decoded image
+
+    Returns:
+        Hash as an unsigned integer
+    """
+    img = _grayscale(source, DETAIL_SAMPLE).resize((DETAIL_SAMPLE, DETAIL_SAMPLE), Image.LANCZOS)
+    pixels = list(img.getdata())
+    rows = [pixels[i * DETAIL_SAMPLE:(i + 1) * DETAIL_SAMPLE] for i in range(DETAIL_SAMPLE)]
+
+    # Separable 2D DCT, keeping only the low frequencies
+    row_coeffs = [[sum(f * p for f, p in zip(factors, row)) for factors in _DCT] for row in rows]
+    coeffs = [
+        sum(factors[n] * row_coeffs[n][u] for n in range(DETAIL_SAMPLE))
+        for factors in _DCT
+        for u in range(DETAIL_SIZE)
+    ]
+    # The DC term is the mean brightness, not structure
+    median = sorted(coeffs[1:])[(len(coeffs) - 1) // 2]
+
+    value = 0
+    for coeff in coeffs:
+        value = (value << 1) | (coeff > median)
+    return value
+
+
+def image_hashes(source: ImageInput) -> Tuple[int, int]:
+    """
+    Compute the dHash and pHash of an image from a single decode
+
+    Args:
+        source: Path to image file, its bytes / open binary file object, or a decoded image
+
+    Returns:
+        Tuple of (64-bit dHash, 256-bit pHash)
+    """
+    img = _grayscale(source, DETAIL_SAMPLE)
+    return dhash(img), phash(img)
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two hashes"""
+    return (a ^ b).bit_count()
+
+
+def _to_signed(value: int) -> int:
+    """SQLite integers are signed 64-bit"""
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def _chunks(value: int) -> List[int]:
+    """Split a hash into CHUNKS substrings of CHUNK_BITS bits"""
+    return [(value >> (CHUNK_BITS * i)) & CHUNK_MASK for i in range(CHUNKS)]
+
+
+def _neighbours(chunk: int, radius: int) -> List[int]:
+    """All chunk values within ``radius`` bit flips of ``chunk``"""
+    values = [chunk]
+    for flips in range(1, radius + 1):
+        for bits in combinations(range(CHUNK_BITS), flips):
+            flipped = chunk
+            for bit in bits:
+                flipped ^= 1 << bit
+            values.append(flipped)
+    return values
+
+
+class ImageHashIndex:
+    """
+    Near-duplicate lookup over perceptual hashes using multi-index hashing
+
+    Each 64-bit dHash is split into 4 chunks of 16 bits, each stored in its
+    own indexed column. Two hashes within Hamming distance ``r`` must agree
+    to within ``r // 4`` bits on at least one chunk (pigeonhole), so a
+    lookup only probes the indexed neighbours of each chunk and checks the
+    full distance on those few candidates, instead of scanning every row.
+
+    A dHash match alone is weak evidence: low-detail images such as text on
+    a white background all hash alike. Candidates must also be within
+    ``detail_threshold`` bits on the 256-bit pHash, and each entry keeps the
+    image's OCR text so the caller can compare it too. Entries expire after
+    ``ttl`` seconds and the oldest are dropped beyond ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        threshold: int = 6,
+        detail_threshold: int = 16,
+        version: str = "1",
+        ttl: int = 6 * 60 * 60,
+        max_entries: int = 100000
+    ):
+        """
+        Initialize index
+
+        Args:
+            db_path: Path to the SQLite database file
+            threshold: Maximum dHash Hamming distance counted as a candidate
+            detail_threshold: Maximum pHash Hamming distance (of 256) confirming a candidate
+            version: Entries stored under another version are ignored (prompt version, search mode)
+            ttl: Seconds an entry stays valid
+            max_entries: Most entries kept (oldest are removed first)
+        """
+        self.db_path = str(db_path)
+        self.threshold = threshold
+        self.detail_threshold = detail_threshold
+        self.version = version
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._radius = threshold // CHUNKS
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        # One long-lived connection: lookups are on the request path
+        self._conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._adds_since_evict = 0
+        self.init_database()
+
+        self.lookups = 0
+        self.candidates = 0
+        self.matches = 0
+        self.evictions = 0
+        self._lookup_time = 0.0
+
+    def init_database(self):
+        """Initialize hash table"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS image_fingerprints (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    hash INTEGER NOT NULL,
+                    c0 INTEGER NOT NULL,
+                    c1 INTEGER NOT NULL,
+                    c2 INTEGER NOT NULL,
+                    c3 INTEGER NOT NULL,
+                    detail TEXT NOT NULL,
+                    text TEXT,
+                    version TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            for i in range(CHUNKS):
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_image_fingerprints_c{i} ON image_fingerprints(c{i})"
+                )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_image_fingerprints_expires ON image_fingerprints(expires_at)"
+            )
+            self._conn.commit()
+
+    def add(self, value: int, detail: int, payload: str, text: Optional[str] = None) -> int:
+        """
+        Store an image's hashes with its payload
+
+        Args:
+            value: 64-bit dHash
+            detail: 256-bit pHash
+            payload: Text stored alongside (e.g. a serialized AnalysisResult)
+            text: Normalized OCR text of the image (None if OCR was unavailable)
+
+        Returns:
+            Row id
+        """
+        chunks = _chunks(value)
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO image_fingerprints "
+                "(hash, c0, c1, c2, c3, detail, text, version, value, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (_to_signed(value), *chunks, format(detail, "x"), text, self.version, payload,
+                 time.time() + self.ttl)
+            )
+            self._adds_since_evict += 1
+            if self._adds_since_evict >= EVICT_EVERY:
+                self._evict()
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def _evict(self):
+        """Remove expired rows, then the oldest beyond max_entries (lock held)"""
+        self._adds_since_evict = 0
+        removed = self._conn.execute(
+            "DELETE FROM image_fingerprints WHERE expires_at <= ?", (time.time(),)
+        ).rowcount
+        count = self._conn.execute("SELECT COUNT(*) FROM image_fingerprints").fetchone()[0]
+        if count > self.max_entries:
+            removed += self._conn.execute(
+                "DELETE FROM image_fingerprints WHERE id IN "
+                "(SELECT id FROM image_fingerprints ORDER BY id LIMIT ?)",
+                (count - self.max_entries,)
+            ).rowcount
+        self.evictions += removed
+
+    def find(self, value: int, detail: int) -> List[ImageMatch]:
+        """
+        Find unexpired stored images close to the query under both hashes
+
+        Args:
+            value: 64-bit dHash
+            detail: 256-bit pHash
+
+        Returns:
+            Matches, closest pHash first
+        """
+        started = time.monotonic()
+        close = {}
+        now = time.time()
+        with self._lock:
+            for i, chunk in enumerate(_chunks(value)):
+                candidates = _neighbours(chunk, self._radius)
+                placeholders = ",".join("?" * len(candidates))
+                rows = self._conn.execute(
+                    f"SELECT id, hash, detail FROM image_fingerprints "
+                    f"WHERE c{i} IN ({placeholders}) AND version = ? AND expires_at > ?",
+                    (*candidates, self.version, now)
+                ).fetchall()
+                for row_id, stored, stored_detail in rows:
+                    if row_id in close:
+                        continue
+                    distance = hamming(value, stored & ((1 << HASH_BITS) - 1))
+                    if distance <= self.threshold:
+                        close[row_id] = (distance, hamming(detail, int(stored_detail, 16)))
+            confirmed = sorted(
+                (row_id, distance, detail_distance)
+                for row_id, (distance, detail_distance) in close.items()
+                if detail_distance <= self.detail_threshold
+            )
+            matches = []
+            for row_id, distance, detail_distance in confirmed:
+                text, payload = self._conn.execute(
+                    "SELECT text, value FROM image_fingerprints WHERE id = ?", (row_id,)
+                ).fetchone()
+                matches.append(ImageMatch(row_id, distance, detail_distance, text, payload))
+
+        matches.sort(key=lambda match: (match.detail_distance, match.distance))
+        self.lookups += 1
+        self._lookup_time += time.monotonic() - started
+        if close:
+            self.candidates += 1
+        if matches:
+            self.matches += 1
+        return matches
+
+    def count(self) -> int:
+        """Number of stored hashes (including expired ones not yet removed)"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM image_fingerprints").fetchone()[0]
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def get_stats(self) -> Dict:
+        """Get lookup counters and index size"""
+        return {
+            "entries": self.count(),
+            "threshold": self.threshold,
+            "detail_threshold": self.detail_threshold,
+            "lookups": self.lookups,
+            "candidates": self.candidates,
+            "matches": self.matches,
+            "evictions": self.evictions,
+            "avg_lookup_ms": round(self._lookup_time / self.lookups * 1000, 3) if self.lookups else 0.0,
+        }
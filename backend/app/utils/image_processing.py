@@ -0,0 +1,98 @@
+"""
+Image preprocessing utilities
+Normalizes uploaded images before they are sent to Gemini Vision or OCR
+"""
+import io
+import time
+from typing import NamedTuple, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from app.utils.sources import FileSource, open_source, source_size
+
+# Pillow format name and MIME type for each supported output encoding
+ENCODINGS = {
+    "jpeg": ("JPEG", "image/jpeg"),
+    "webp": ("WEBP", "image/webp"),
+    "png": ("PNG", "image/png"),
+}
+
+
+class NormalizedImage(NamedTuple):
+    """A decoded, oriented and downscaled image plus its re-encoded bytes"""
+    image: Image.Image
+    data: Optional[bytes]
+    mime_type: Optional[str]
+    original_bytes: int
+    original_size: Tuple[int, int]
+    elapsed_ms: float
+
+    @property
+    def encoded_bytes(self) -> int:
+        return len(self.data) if self.data is not None else 0
+
+    def as_blob(self) -> dict:
+        """Inline-data part for a Gemini request"""
+        return {"mime_type": self.mime_type, "data": self.data}
+
+
+def normalize_image(
+    source: FileSource,
+    max_dimension: int = 0,
+    encoding: Optional[str] = "jpeg",
+    quality: int = 85
+) -> NormalizedImage:
+    """
+    Decode an image once and prepare it for analysis
+
+    The image is rotated according to its EXIF orientation, reduced to its
+    first frame (animated GIFs), downscaled so neither side exceeds
+    ``max_dimension`` and, if ``encoding`` is given, re-encoded.
+
+    Args:
+        source: Path to image file, or its bytes / open binary file object
+        max_dimension: Longest allowed side in pixels (0 keeps the original size)
+        encoding: Output encoding (jpeg, webp or png), or None to skip re-encoding
+        quality: JPEG/WebP quality
+
+    Returns:
+        NormalizedImage
+    """
+    started = time.monotonic()
+    original_bytes = source_size(source)
+    img = Image.open(open_source(source))
+    original_size = img.size
+
+    # Only the first frame of an animation is analyzed
+    if getattr(img, "is_animated", False):
+        img.seek(0)
+    img = ImageOps.exif_transpose(img)
+    if max_dimension and max(img.size) > max_dimension:
+        img.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+    data = None
+    mime_type = None
+    if encoding:
+        pil_format, mime_type = ENCODINGS[encoding]
+        if pil_format == "JPEG" and img.mode != "RGB":
+            if img.mode in ("RGBA", "LA", "P"):
+                # Flatten transparency onto white rather than black
+                rgba = img.convert("RGBA")
+                img = Image.new("RGB", rgba.size, (255, 255, 255))
+                img.paste(rgba, mask=rgba.split()[-1])
+            else:
+                img = img.convert("RGB")
+        buffer = io.BytesIO()
+        img.save(buffer, format=pil_format, quality=quality, optimize=True)
+        data = buffer.getvalue()
+    else:
+        img.load()
+
+    return NormalizedImage(
+        image=img,
+        data=data,
+        mime_type=mime_type,
+        original_bytes=original_bytes,
+        original_size=original_size,
+        elapsed_ms=round((time.monotonic() - started) * 1000, 1)
+    )
@@ -0,0 +1,225 @@
+"""
+Prompt budgeting
+Fits content and web sources into a token budget, keeping the most salient sentences
+"""
+import math
+import re
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Starting estimate for Gemini's tokenizer on English text; refined from usage metadata
+DEFAULT_CHARS_PER_TOKEN = 4.0
+# Weight of each new observation in the running chars-per-token estimate
+CALIBRATION_WEIGHT = 0.1
+GAP_MARKER = "[...]"
+EXCERPT_HEADER = "[Excerpts selected from a longer text]"
+
+# A decimal point ("4.1 percent") does not end a sentence
+_SENTENCE_RE = re.compile(r"(?:[^.!?\n]|(?<=\d)\.(?=\d))+(?:[.!?]+[\"')\]]*|\n+|$)")
+_NUMBER_RE = re.compile(r"\d")
+_PROPER_RE = re.compile(r"(?<=\s)[A-Z][a-z]+")
+_QUOTE_RE = re.compile(r"[\"“”]")
+_CLAIM_WORDS = frozenset("""
+according claim claims claimed said says reported report study studies found shows show
+percent million billion cause causes caused proves proven confirmed announced fact facts
+always never every all none will won't cure kills
+""".split())
+
+
+class BudgetedContent(NamedTuple):
+    """Content and sources cut to fit a prompt budget"""
+    content: str
+    search_context: str
+    content_tokens: int
+    source_tokens: int
+    reduced: bool
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences (line breaks also end a sentence)"""
+    return [sentence.strip() for sentence in _SENTENCE_RE.findall(text) if sentence.strip()]
+
+
+def sentence_salience(sentence: str, position: Optional[int] = None) -> float:
+    """
+    Cheap score of how likely a sentence carries a checkable claim
+
+    Numbers, names, quotes and reporting/causal verbs score higher; the
+    opening sentences get a bonus because they usually state the topic.
+
+    Args:
+        sentence: Sentence text
+        position: Index of the sentence in the text (None for no position bonus)
+    """
+    words = sentence.lower().split()
+    if len(words) < 4:
+        return 0.0
+    score = 1.0
+    score += min(len(_NUMBER_RE.findall(sentence)), 4) * 0.5
+    score += min(len(_PROPER_RE.findall(sentence)), 4) * 0.4
+    score += sum(word.strip(".,;:!?\"'") in _CLAIM_WORDS for word in words) * 0.8
+    if _QUOTE_RE.search(sentence):
+        score += 0.5
+    if len(words) > 60:
+        score -= 1.0  # run-on text (tables, boilerplate) rarely states a claim
+    if position is not None and position < 3:
+        score += 2.0 - position * 0.5
+    return score
+
+
+def search_query(content: str, max_chars: int = 200) -> str:
+    """
+    Build a web search query from the most salient sentence of the content
+
+    Args:
+        content: Text to verify
+        max_chars: Longest query returned
+
+    Returns:
+        Query text
+    """
+    if len(content) <= max_chars:
+        return content.strip()
+    sentences = split_sentences(content[:max_chars * 50])
+    if not sentences:
+        return content[:max_chars]
+    best = max(enumerate(sentences), key=lambda item: sentence_salience(item[1], item[0]))[1]
+    return best[:max_chars]
+
+
+class PromptBudget:
+    """
+    Token budget shared by the content and the web sources of a prompt
+
+    Tokens are estimated locally from character counts. The chars-per-token
+    ratio starts at DEFAULT_CHARS_PER_TOKEN and follows the prompt token
+    counts Gemini reports, so no tokenizer call is made per request. Sources
+    get at most ``sources_share`` of the budget (less if they are shorter);
+    content gets the rest. Content over its share keeps its most salient
+    sentences, in their original order, rather than a prefix.
+    """
+
+    def __init__(self, max_tokens: int = 8000, sources_share: float = 0.25):
+        """
+        Initialize budget
+
+        Args:
+            max_tokens: Tokens allowed for content plus sources (prompt instructions excluded)
+            sources_share: Largest fraction of the budget given to web sources
+        """
+        self.max_tokens = max_tokens
+        self.sources_share = sources_share
+        self.chars_per_token = DEFAULT_CHARS_PER_TOKEN
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.reduced = 0
+        self.tokens_sent = 0
+        self.tokens_dropped = 0
+
+    def count_tokens(self, text: str) -> int:
+        """Estimate the token count of text"""
+        return math.ceil(len(text) / self.chars_per_token)
+
+    def observe(self, prompt_chars: int, prompt_tokens: int):
+        """Refine the chars-per-token estimate from a token count reported by the API"""
+        if prompt_chars <= 0 or prompt_tokens <= 0:
+            return
+        with self._lock:
+            ratio = prompt_chars / prompt_tokens
+            self.chars_per_token += CALIBRATION_WEIGHT * (ratio - self.chars_per_token)
+
+    def fit(self, content: str, search_context: str = "") -> BudgetedContent:
+        """
+        Cut content and sources to the budget
+
+        Args:
+            content: Text to analyze
+            search_context: Formatted web sources
+
+        Returns:
+            BudgetedContent
+        """
+        source_budget = int(self.max_tokens * self.sources_share)
+        search_context, source_tokens = self._fit_lines(search_context, source_budget)
+        content_budget = self.max_tokens - source_tokens
+
+        original_tokens = self.count_tokens(content)
+        reduced = original_tokens > content_budget
+        if reduced:
+            content = self._select_sentences(content, content_budget)
+        content_tokens = self.count_tokens(content)
+
+        self.requests += 1
+        self.tokens_sent += content_tokens + source_tokens
+        if reduced:
+            self.reduced += 1
+            self.tokens_dropped += original_tokens - content_tokens
+        return BudgetedContent(content, search_context, content_tokens, source_tokens, reduced)
+
+    def _fit_lines(self, text: str, budget: int) -> Tuple[str, int]:
+        """Keep whole lines of text, in order, while they fit the budget"""
+        tokens = self.count_tokens(text)
+        if tokens <= budget:
+            return text, tokens
+        kept = []
+        used = 0
+        for line in text.split("\n"):
+            cost = self.count_tokens(line) + 1
+            if used + cost > budget:
+                break
+            kept.append(line)
+            used += cost
+        return "\n".join(kept), used
+
+    def _select_sentences(self, content: str, budget: int) -> str:
+        """Keep the highest-scoring distinct sentences that fit, in document order"""
+        sentences = split_sentences(content)
+        ranked = sorted(
+            range(len(sentences)),
+            key=lambda index: sentence_salience(sentences[index], index),
+            reverse=True
+        )
+        budget -= self.count_tokens(EXCERPT_HEADER) + 1
+        # Every kept sentence may be followed by a gap marker
+        marker_cost = self.count_tokens(GAP_MARKER) + 1
+        chosen = []
+        seen = set()
+        used = 0
+        for index in ranked:
+            key = sentences[index].casefold()
+            if key in seen:
+                continue  # repeated boilerplate or quotes add nothing
+            cost = self.count_tokens(sentences[index]) + marker_cost
+            if used + cost > budget:
+                continue
+            chosen.append(index)
+            seen.add(key)
+            used += cost
+        if not chosen:
+            # No sentence fits on its own (e.g. unpunctuated text); fall back to a prefix
+            return content[:int(budget * self.chars_per_token)] + " " + GAP_MARKER
+
+        parts = []
+        previous = -1
+        for index in sorted(chosen):
+            if index != previous + 1:
+                parts.append(GAP_MARKER)
+            parts.append(sentences[index])
+            previous = index
+        if previous != len(sentences) - 1:
+            parts.append(GAP_MARKER)
+        return EXCERPT_HEADER + "\n" + " ".join(parts)
+
+    def get_stats(self) -> Dict:
+        """Get token counters and the current tokenizer estimate"""
+        return {
+            "max_tokens": self.max_tokens,
+            "sources_share": self.sources_share,
+            "chars_per_token": round(self.chars_per_token, 3),
+            "requests": self.requests,
+            "reduced": self.reduced,
+            "tokens_sent": self.tokens_sent,
+            "avg_tokens_sent": round(self.tokens_sent / self.requests, 1) if self.requests else 0.0,
+            "tokens_dropped": self.tokens_dropped,
+        }
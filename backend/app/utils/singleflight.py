@@ -0,0 +1,77 @@
+"""
+Request coalescing
+Concurrent calls with the same key share a single execution
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical async work
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it is running await the same task and receive the same result or
+    exception. Once the task finishes the key is released, so later calls
+    (e.g. retries after an error) start fresh.
+
+    Cancellation: a cancelled caller only stops waiting. The shared task is
+    cancelled when its last waiter goes away, so abandoned work does not keep
+    running for nobody.
+    """
+
+    def __init__(self):
+        """Initialize with no work in flight"""
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``factory()`` once per key among concurrent callers
+
+        Args:
+            key: Coalescing key
+            factory: Zero-argument callable returning the awaitable to run
+
+        Returns:
+            Result of the shared execution
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda done, k=key: self._release(k, done))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._waiters.get(key, 0) <= 1:
+                task.cancel()
+            raise
+        finally:
+            if self._inflight.get(key) is task:
+                self._waiters[key] -= 1
+
+    def _release(self, key: str, task: asyncio.Task):
+        """Forget a finished task so the next call for its key starts fresh"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            self._waiters.pop(key, None)
+        if not task.cancelled():
+            # Mark the exception as retrieved even when every waiter was cancelled
+            task.exception()
+
+    def get_stats(self) -> Dict:
+        """Get coalescing counters"""
+        return {
+            "in_flight": len(self._inflight),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,46 @@
+"""
+File source utilities
+Lets extractors and image processing read paths, bytes and file objects alike
+"""
+import io
+import os
+from typing import BinaryIO, Union
+
+# A file to extract from: a path on disk, raw bytes, or an open binary file object
+# (e.g. the SpooledTemporaryFile behind an upload)
+FileSource = Union[str, bytes, BinaryIO]
+
+
+def open_source(source: FileSource) -> Union[str, BinaryIO]:
+    """
+    Turn a FileSource into something PDF/DOCX/image readers accept
+    
+    Paths are returned unchanged, bytes are wrapped in a BytesIO, and file
+    objects are rewound to the start.
+    """
+    if isinstance(source, bytes):
+        return io.BytesIO(source)
+    if hasattr(source, 'read'):
+        source.seek(0)
+    return source
+
+
+def source_size(source: FileSource) -> int:
+    """Size in bytes of a FileSource"""
+    if isinstance(source, str):
+        return os.path.getsize(source)
+    if isinstance(source, bytes):
+        return len(source)
+    source.seek(0, io.SEEK_END)
+    size = source.tell()
+    source.seek(0)
+    return size
+
+
+def describe_source(source: FileSource) -> str:
+    """Short description of a FileSource for logging"""
+    if isinstance(source, str):
+        return source
+    if isinstance(source, bytes):
+        return f"<{len(source)} bytes in memory>"
+    return f"<{type(source).__name__}>"
@@ -0,0 +1,243 @@
+"""
+Verdict classifier
+Maps free-text Gemini analyses to a reliability label and confidence in one regex pass
+"""
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+
+# (label, weight, phrases). Weights keep the old precedence: specific negative
+# findings outrank doubt, which outranks positive findings, which outrank
+# generic "needs verification" wording.
+PHRASE_GROUPS: List[Tuple[str, float, List[str]]] = [
+    ("needs_verification", 3.0, [
+        'speculative', 'speculation', 'cannot be verified', 'unverifiable',
+        'no credible evidence', 'lacks any factual basis', 'unfounded',
+        'no evidence', 'lacks evidence', 'not based on facts',
+        'potentially defamatory', 'defamatory', 'rumor', 'rumors',
+        'innuendo', 'malicious', 'cannot be verified because',
+        'dismissing it as', 'unfounded speculation'
+    ]),
+    ("potentially_false", 2.6, [
+        'potentially false', 'potentially_false', 'is false', 'appears false', 'likely false',
+        'misinformation', 'disinformation', 'fake', 'hoax', 'fabricated',
+        'not true', 'untrue', 'debunked', 'false claim', 'conspiracy'
+    ]),
+    ("potentially_false", 2.2, [
+        'unreliable', 'not reliable', 'cannot be trusted', 'untrustworthy',
+        'no credible sources', 'spread rumors'
+    ]),
+    ("doubtful", 1.8, [
+        'doubtful', 'questionable', 'suspicious', 'misleading',
+        'partially true', 'mixed', 'some truth', 'lacks credibility',
+        'political bias', 'personal animosity', 'damage reputation'
+    ]),
+    ("reliable", 1.5, [
+        'is reliable', 'appears reliable', 'highly reliable',
+        'is accurate', 'appears accurate', 'is credible',
+        'is true', 'this is true', 'factually correct',
+        'well-established fact', 'universally accepted', 'universally recognized',
+        'definitive answer', 'confirmed fact', 'verified fact',
+        'no factual errors', 'there are no factual errors',
+        'inherently verifiable', 'established scientific',
+        'fundamental aspect', 'basic fact', 'scientifically accurate',
+        'common knowledge', 'widely accepted'
+    ]),
+    ("needs_verification", 1.0, [
+        'needs verification', 'needs_verification', 'requires verification', 'unverified claim',
+        'insufficient evidence', 'unclear', 'need more context'
+    ]),
+]
+
+# Bare verdict words only count inside the Reliability Assessment section, as
+# whole words ("Reliable." there states the verdict; "check reliable sources"
+# elsewhere says nothing about the content)
+ASSESSMENT_ONLY_GROUPS: List[Tuple[str, float, List[str]]] = [
+    ("reliable", 1.5, ['reliable']),
+]
+
+# Phrases inside the "Reliability Assessment" section state the verdict directly
+ASSESSMENT_BONUS = 3.0
+# Later mentions count less; the last character of the text weighs (1 - POSITION_DECAY)
+POSITION_DECAY = 0.5
+
+DEFAULT_VERDICT = ("needs_verification", 0.50)
+MIN_CONFIDENCE = 0.50
+MAX_CONFIDENCE = 0.95
+# Evidence (summed weight) at which confidence gets ~63% of the way to its ceiling
+EVIDENCE_SCALE = 4.0
+
+# Labels a document can be pulled towards by part of its content, most severe first
+SEVERE_LABELS = ("potentially_false", "doubtful")
+# Share of the weighted confidence a severe label needs to decide a document's verdict
+MIN_SEVERE_SHARE = 0.25
+# A single "potentially_false" part at least this confident decides the verdict on its own
+DECISIVE_CONFIDENCE = 0.8
+
+_NEGATED_RE = re.compile(r"\b(?:not|no|never|isn't|aren't|wasn't|weren't|nor)\s+(?:\w+\s+)?$")
+_ASSESSMENT_RE = re.compile(r"#+\s*reliability assessment[^\n]*\n(.*?)(?=\n#+\s|\Z)", re.DOTALL)
+
+
+def _trie_pattern(phrases: List[str]) -> str:
+    """
+    Build a regex alternation factored by common prefixes
+
+    ``re`` tries alternatives one by one at every position; nesting them by
+    shared prefix means a position that starts no phrase is rejected after
+    one character test instead of one test per phrase.
+    """
+    trie: Dict[str, dict] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        ends_here = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not ends_here:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        # Greedy "?" keeps longest-match-first semantics
+        return group + "?" if ends_here else group
+
+    return build(trie)
+
+
+class VerdictClassifier:
+    """
+    Single-pass weighted phrase classifier
+
+    All phrases are compiled into one prefix-factored pattern (longest
+    match first, so "unfounded speculation" wins over "unfounded") and
+    found with a single ``finditer`` sweep. Every non-negated hit adds its
+    group's weight to its label, scaled down the later it appears and
+    boosted inside the Reliability Assessment section; bare verdict words
+    count only there. The top label wins; confidence grows with its share
+    of the total score and with the amount of evidence.
+    """
+
+    def __init__(
+        self,
+        groups: List[Tuple[str, float, List[str]]] = PHRASE_GROUPS,
+        assessment_only_groups: List[Tuple[str, float, List[str]]] = ASSESSMENT_ONLY_GROUPS
+    ):
+        self._phrases: Dict[str, Tuple[str, float]] = {}
+        for label, weight, phrases in groups + assessment_only_groups:
+            for phrase in phrases:
+                # A phrase listed twice keeps its first (higher-precedence) group
+                self._phrases.setdefault(phrase, (label, weight))
+        self._assessment_only = {
+            phrase for _, _, phrases in assessment_only_groups for phrase in phrases
+        } - {phrase for _, _, phrases in groups for phrase in phrases}
+        self._pattern = re.compile(r"\b" + _trie_pattern(list(self._phrases)))
+
+    def scores(self, analysis: str, assessment_span: Optional[Tuple[int, int]] = None) -> Dict[str, float]:
+        """
+        Score every label found in an analysis
+
+        Args:
+            analysis: Gemini analysis text
+            assessment_span: Span of the Reliability Assessment section when the
+                caller has already parsed it (found with a regex otherwise)
+
+        Returns:
+            Dictionary of label to summed weight
+        """
+        text = analysis.lower()
+        length = max(len(text), 1)
+        if assessment_span is None:
+            section = _ASSESSMENT_RE.search(text)
+            assessment_span = section.span(1) if section else (-1, -1)
+        section_start, section_end = assessment_span
+
+        scores: Dict[str, float] = {}
+        for match in self._pattern.finditer(text):
+            start = match.start()
+            window = text[max(0, start - 25):start]
+            if ("no" in window or "n't" in window or "never" in window) and _NEGATED_RE.search(window):
+                continue
+            phrase = match.group(0)
+            in_section = section_start <= start < section_end
+            if phrase in self._assessment_only:
+                end = match.end()
+                if not in_section or (end < len(text) and (text[end].isalnum() or text[end] == "_")):
+                    continue
+            label, weight = self._phrases[phrase]
+            weight *= 1 - POSITION_DECAY * start / length
+            if in_section:
+                weight *= ASSESSMENT_BONUS
+            scores[label] = scores.get(label, 0.0) + weight
+        return scores
+
+    def classify(self, analysis: str, assessment_span: Optional[Tuple[int, int]] = None) -> Tuple[str, float]:
+        """
+        Classify an analysis
+
+        Args:
+            analysis: Gemini analysis text
+            assessment_span: Span of the Reliability Assessment section, if known
+
+        Returns:
+            Tuple of (label, confidence)
+        """
+        scores = self.scores(analysis, assessment_span)
+        if not scores:
+            return DEFAULT_VERDICT
+        label, top = max(scores.items(), key=lambda item: item[1])
+        share = top / sum(scores.values())
+        evidence = 1 - math.exp(-top / EVIDENCE_SCALE)
+        confidence = MIN_CONFIDENCE + (MAX_CONFIDENCE - MIN_CONFIDENCE) * share * evidence
+        return label, round(confidence, 2)
+
+
+verdict_classifier = VerdictClassifier()
+
+
+def reduce_verdicts(
+    verdicts: List[Tuple[str, float]],
+    weights: Optional[List[float]] = None
+) -> Tuple[str, float]:
+    """
+    Combine the verdicts of parts of a document (claims, chunks) into one
+
+    Each verdict adds its confidence, times its weight, to its label. A
+    part rated potentially_false with at least DECISIVE_CONFIDENCE decides
+    the result, so one false claim among many unremarkable ones is not
+    outvoted. Otherwise a severe label backed by at least MIN_SEVERE_SHARE
+    of the total decides, and failing that the label with the largest
+    total wins. Confidence is the weighted mean confidence of the verdicts
+    with the chosen label.
+
+    Args:
+        verdicts: List of (label, confidence)
+        weights: Optional weight per verdict (e.g. chunk length)
+
+    Returns:
+        Tuple of (label, confidence)
+    """
+    if not verdicts:
+        return DEFAULT_VERDICT
+    weights = weights or [1.0] * len(verdicts)
+
+    totals: Dict[str, float] = {}
+    label_weights: Dict[str, float] = {}
+    for (label, confidence), weight in zip(verdicts, weights):
+        totals[label] = totals.get(label, 0.0) + confidence * weight
+        label_weights[label] = label_weights.get(label, 0.0) + weight
+    grand_total = sum(totals.values()) or 1.0
+
+    if any(part == SEVERE_LABELS[0] and score >= DECISIVE_CONFIDENCE for part, score in verdicts):
+        label = SEVERE_LABELS[0]
+    else:
+        label = next(
+            (severe for severe in SEVERE_LABELS if totals.get(severe, 0.0) / grand_total >= MIN_SEVERE_SHARE),
+            None
+        )
+    if label is None:
+        label = max(totals.items(), key=lambda item: item[1])[0]
+    confidence = totals[label] / label_weights[label] if label_weights[label] else DEFAULT_VERDICT[1]
+    return label, round(min(confidence, MAX_CONFIDENCE), 2)
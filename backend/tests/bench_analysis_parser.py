@@ -0,0 +1,93 @@
+"""
+Analysis parser benchmark
+Times parse_analysis() against the per-line keyword scans it replaced
+
+Run from backend/: python -m tests.bench_analysis_parser
+"""
+import re
+import timeit
+from typing import List
+
+from app.utils.analysis_parser import parse_analysis
+from tests.verdict_corpus import CORPUS
+
+FILLER = "The article discusses regional transport funding and quotes two council members.\n"
+
+
+def legacy_reasons(analysis: str) -> List[str]:
+    """Reason scan used before parse_analysis()"""
+    reasons = []
+    in_reasons_section = False
+    for line in analysis.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if any(keyword in line.lower() for keyword in ['reason', 'finding', 'issue', 'concern', 'red flag', 'key claim']):
+            in_reasons_section = True
+            continue
+        if in_reasons_section and (line.startswith('-') or line.startswith('•') or line.startswith('*') or re.match(r'^\d+\.', line)):
+            reason = re.sub(r'^[-•*\d.]+\s*', '', line).strip()
+            if reason and len(reason) > 10:
+                reasons.append(reason)
+                if len(reasons) >= 5:
+                    break
+        if in_reasons_section and ':' in line and not line.startswith('-'):
+            in_reasons_section = False
+    return reasons[:5]
+
+
+def legacy_tips(analysis: str) -> List[str]:
+    """Tip scan used before parse_analysis()"""
+    tips = []
+    in_tips_section = False
+    for line in analysis.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if any(keyword in line.lower() for keyword in ['recommendation', 'tip', 'suggestion', 'verification']):
+            in_tips_section = True
+            continue
+        if in_tips_section and (line.startswith('-') or line.startswith('•') or line.startswith('*') or re.match(r'^\d+\.', line)):
+            tip = re.sub(r'^[-•*\d.]+\s*', '', line).strip()
+            if tip and len(tip) > 10:
+                tips.append(tip)
+                if len(tips) >= 4:
+                    break
+    return tips[:4]
+
+
+def _inputs():
+    corpus = [sample.analysis for sample in CORPUS]
+    typical = max(corpus, key=len)
+    # Findings buried under a long body: the legacy scans read every line first
+    late = "## Summary\n" + FILLER * 1200 + "## Key Findings\n- The quoted figure is from 2019\n"
+    return {
+        f"corpus ({len(corpus)} analyses)": corpus,
+        f"typical ({len(typical)} chars)": [typical],
+        f"late findings ({len(late)} chars)": [late],
+    }
+
+
+def main(repeat: int = 5, number: int = 100):
+    """Print the best per-call time of both extractors on each input"""
+    print(f"{'input':30} {'legacy us':>10} {'parser us':>10} {'parser/legacy':>14}")
+    for name, texts in _inputs().items():
+        def legacy():
+            return [(legacy_reasons(text), legacy_tips(text)) for text in texts]
+
+        def parsed():
+            results = []
+            for text in texts:
+                tree = parse_analysis(text)
+                results.append((tree.reasons, tree.tips, tree.assessment_span))
+            return results
+
+        old, new = [
+            min(timeit.repeat(run, repeat=repeat, number=number)) / number * 1e6
+            for run in (legacy, parsed)
+        ]
+        print(f"{name:30} {old:10.1f} {new:10.1f} {new / old:13.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Gemini backend benchmark
+Fires concurrent text analyses at a stub Gemini model with a fixed latency,
+through the thread backend (one executor thread per in-flight call) and the
+async backend (coroutines on the event loop)
+
+Run from backend/: python -m tests.bench_gemini_backend
+"""
+import asyncio
+import contextlib
+import io
+import threading
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from app.config import settings
+from app.services.gemini_service import GeminiService
+
+ANSWER = "## Reliability Assessment\nReliable: the figure matches official statistics.\n"
+
+
+def _response():
+    return SimpleNamespace(text=ANSWER, usage_metadata=None)
+
+
+def _service(backend: str, workers: int, latency: float) -> GeminiService:
+    """GeminiService on the given backend whose model answers after ``latency`` seconds"""
+    saved = {
+        name: getattr(settings, name)
+        for name in ("GEMINI_BACKEND", "GEMINI_MAX_WORKERS", "GEMINI_ASYNC_MAX_CONCURRENCY", "GEMINI_MAX_QUEUE")
+    }
+    settings.GEMINI_BACKEND = backend
+    settings.GEMINI_MAX_WORKERS = workers
+    settings.GEMINI_ASYNC_MAX_CONCURRENCY = workers
+    settings.GEMINI_MAX_QUEUE = 100_000
+    try:
+        service = GeminiService()
+    finally:
+        for name, value in saved.items():
+            setattr(settings, name, value)
+
+    def generate_content(prompt, generation_config=None):
+        time.sleep(latency)
+        return _response()
+
+    async def generate_content_async(prompt, generation_config=None):
+        await asyncio.sleep(latency)
+        return _response()
+
+    service.model = SimpleNamespace(
+        generate_content=generate_content,
+        generate_content_async=generate_content_async
+    )
+    return service
+
+
+async def _run(service: GeminiService, requests: int):
+    """Send ``requests`` analyses at once; return (seconds, peak threads, peak in-flight)"""
+    peak_threads = threading.active_count()
+    peak_in_flight = 0
+    done = asyncio.Event()
+
+    async def sample():
+        nonlocal peak_threads, peak_in_flight
+        while not done.is_set():
+            peak_threads = max(peak_threads, threading.active_count())
+            peak_in_flight = max(peak_in_flight, service.limiter.get_stats()["in_flight"])
+            await asyncio.sleep(0.005)
+
+    sampler = asyncio.create_task(sample())
+    started = time.perf_counter()
+    results = await asyncio.gather(*[
+        service.analyze_text_with_sources(f"Claim number {index} about the city budget.")
+        for index in range(requests)
+    ])
+    elapsed = time.perf_counter() - started
+    done.set()
+    await sampler
+    assert all(result == ANSWER for result in results)
+    return elapsed, peak_threads, peak_in_flight
+
+
+def measure(backend: str, workers: int, requests: int, latency: float):
+    """Time one configuration and the peak Python memory it allocated per request"""
+    service = _service(backend, workers, latency)
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    with contextlib.redirect_stdout(io.StringIO()):
+        elapsed, threads, in_flight = asyncio.run(_run(service, requests))
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    service._executor.shutdown(wait=True)
+    return {
+        "seconds": elapsed,
+        "threads": threads,
+        "in_flight": in_flight,
+        "kb_per_request": peak / requests / 1024,
+    }
+
+
+def main(requests: int = 500, latency: float = 0.3):
+    """Print wall time, peak concurrency and memory of each backend"""
+    print(f"{requests} concurrent analyses, stub Gemini latency {latency * 1000:.0f}ms")
+    print(f"{'backend':10} {'slots':>6} {'seconds':>8} {'in flight':>10} {'threads':>8} {'KB/request':>11}")
+    for backend, workers in (("thread", 8), ("thread", 256), ("async", 256), ("async", 1024)):
+        stats = measure(backend, workers, requests, latency)
+        print(
+            f"{backend:10} {workers:6} {stats['seconds']:8.2f} {stats['in_flight']:10} "
+            f"{stats['threads']:8} {stats['kb_per_request']:11.1f}"
+        )
+    print("KB/request counts Python allocations only; thread stacks are not included.")
+
+
+if __name__ == "__main__":
+    main()
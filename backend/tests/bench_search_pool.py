@@ -0,0 +1,117 @@
+"""
+Search pool benchmark
+Times search requests against a local stub of the search API, with a new
+session per request (as before pooling) and with SearchService's pooled session
+
+Run from backend/: python -m tests.bench_search_pool
+"""
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import aiohttp
+from aiohttp import web
+
+from app.services.search_service import SearchService
+
+RESPONSE = {
+    "organic": [
+        {"title": f"Result {index}", "link": f"https://example.org/{index}", "snippet": "Stub snippet."}
+        for index in range(5)
+    ]
+}
+
+
+async def _start_stub(delay: float) -> web.AppRunner:
+    """Serve a Serper-like JSON response on 127.0.0.1 after ``delay`` seconds"""
+    async def search(request: web.Request) -> web.Response:
+        await request.json()
+        if delay:
+            await asyncio.sleep(delay)
+        return web.json_response(RESPONSE)
+
+    app = web.Application()
+    app.router.add_post("/search", search)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    return runner
+
+
+async def _unpooled(url: str, query: str) -> List[Dict]:
+    """One request the way SearchService sent it before pooling: a new session each time"""
+    timeout = aiohttp.ClientTimeout(total=10)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        async with session.post(url, headers={"X-API-KEY": "bench"}, json={"q": query, "num": 5}) as response:
+            return (await response.json())["organic"]
+
+
+async def _measure(fetch, requests: int, concurrency: int) -> Dict[str, float]:
+    """Latency percentiles and throughput of ``requests`` calls, ``concurrency`` at a time"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(index: int):
+        async with semaphore:
+            started = time.perf_counter()
+            await fetch(f"query {index}")
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(index) for index in range(requests)])
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "mean_ms": statistics.mean(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "rps": requests / elapsed,
+    }
+
+
+async def run(requests: int = 500, delay: float = 0.0):
+    """Print latency and throughput of both modes, sequentially and 20 at a time"""
+    runner = await _start_stub(delay)
+    port = runner.addresses[0][1]
+    url = f"http://127.0.0.1:{port}/search"
+
+    service = SearchService()
+    service.api_key = "bench"
+    service.base_url = url
+    await service.start()
+
+    async def pooled(query: str):
+        results, ok = await service._fetch(query, 5)
+        assert ok
+        return results
+
+    async def unpooled(query: str):
+        return await _unpooled(url, query)
+
+    print(f"{requests} requests, stub delay {delay * 1000:.0f}ms")
+    print(f"{'mode':22} {'concurrency':>11} {'mean ms':>8} {'p95 ms':>8} {'req/s':>8}")
+    try:
+        for concurrency in (1, 20):
+            for name, fetch in (("session per request", unpooled), ("pooled session", pooled)):
+                await fetch("warm-up")
+                stats = await _measure(fetch, requests, concurrency)
+                print(
+                    f"{name:22} {concurrency:11} {stats['mean_ms']:8.2f} "
+                    f"{stats['p95_ms']:8.2f} {stats['rps']:8.0f}"
+                )
+        pool = service.get_pool_stats()
+        print(
+            f"pooled connections: {pool['connections_created']} opened, "
+            f"{pool['connections_reused']} reused"
+        )
+    finally:
+        await service.close()
+        await runner.cleanup()
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Upload benchmark
+Posts PDFs and images to /api/analyze/upload and /api/analyze (type=image)
+with a stub Gemini model, comparing the spooled in-memory path the routes
+use with the save-to-disk, analyze-by-path, delete round-trip they replaced
+
+Run from backend/: python -m tests.bench_uploads
+"""
+import asyncio
+import contextlib
+import io
+import logging
+import os
+import random
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+_SCRATCH = tempfile.mkdtemp(prefix="truthbot-bench-")
+os.environ.setdefault("DATABASE_PATH", os.path.join(_SCRATCH, "conversations.db"))
+os.environ.setdefault("CACHE_DB_PATH", os.path.join(_SCRATCH, "cache.db"))
+os.environ["SERPER_API_KEY"] = ""
+os.environ["GEMINI_API_KEY"] = ""
+
+import httpx
+from fastapi import File, Form, UploadFile
+from PIL import Image
+
+from app.main import app
+from app.routes.analyze import analyzer_service, file_handler
+from app.utils import file_handler as file_handler_module
+from tests.pdf_samples import make_pdf, numbered_pages
+
+ANSWER = "## Reliability Assessment\nReliable: the figure matches official statistics.\n"
+
+
+@app.post("/bench/disk-upload")
+async def disk_upload(file: UploadFile = File(...), type: str = Form("file")):
+    """The old upload path: save to the upload folder, analyze the saved file, delete it"""
+    file_id = str(uuid.uuid4())
+    saved = await file_handler.save_upload(file, file_id)
+    try:
+        file_ext = Path(file.filename).suffix.lower()[1:]
+        if file_ext in ['jpg', 'jpeg', 'png', 'gif']:
+            return await analyzer_service.analyze_image(saved.path, content_hash=saved.sha256)
+        return await analyzer_service.analyze_file(saved.path, file_ext, content_hash=saved.sha256)
+    finally:
+        await asyncio.to_thread(file_handler.delete_file, file_id)
+
+
+def _stub_gemini():
+    """Answer every Gemini request at once, so only upload handling and extraction are timed"""
+    def generate_content(*args, **kwargs):
+        return SimpleNamespace(text=ANSWER, usage_metadata=None)
+
+    analyzer_service.gemini_service.backend = "thread"
+    analyzer_service.gemini_service.model = SimpleNamespace(generate_content=generate_content)
+    analyzer_service.gemini_service.vision_model = analyzer_service.gemini_service.model
+    analyzer_service.use_web_search = False
+    # Every request re-analyzes its upload instead of hitting a cache
+    analyzer_service.verdict_cache.enabled = False
+    analyzer_service.extraction_cache.enabled = False
+
+
+def _jpeg(width: int, height: int) -> bytes:
+    """A noisy JPEG (noise keeps the file large for its size)"""
+    rng = random.Random(7)
+    image = Image.frombytes("RGB", (width, height), bytes(rng.getrandbits(8) for _ in range(width * height * 3)))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def _cases():
+    """(label, route, form fields, file) for small and large PDFs and images"""
+    return (
+        ("pdf", "/api/analyze/upload", {}, ("report.pdf", make_pdf(numbered_pages(4)), "application/pdf")),
+        ("pdf", "/api/analyze/upload", {}, ("report.pdf", make_pdf(numbered_pages(300)), "application/pdf")),
+        ("image", "/api/analyze", {"type": "image"}, ("photo.jpg", _jpeg(160, 120), "image/jpeg")),
+        ("image", "/api/analyze", {"type": "image"}, ("photo.jpg", _jpeg(1200, 900), "image/jpeg")),
+    )
+
+
+async def _run(path: str, sample, fields, requests: int, concurrency: int) -> float:
+    """Send ``requests`` uploads, ``concurrency`` at a time; return requests per second"""
+    transport = httpx.ASGITransport(app=app)
+    gate = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+        async def post():
+            async with gate:
+                response = await client.post(path, files={"file": sample}, data=fields)
+                assert response.status_code == 200, response.text
+
+        await post()  # warm up the extraction pool and imports
+        started = time.perf_counter()
+        await asyncio.gather(*[post() for _ in range(requests)])
+        return requests / (time.perf_counter() - started)
+
+
+def main(requests: int = 60, concurrency: int = 8):
+    """Print upload throughput of each route with and without the disk round-trip"""
+    logging.disable(logging.CRITICAL)
+    file_handler_module.UPLOAD_FOLDER = _SCRATCH
+    _stub_gemini()
+    print(f"{requests} uploads per case, {concurrency} at a time, stub Gemini")
+    print(f"{'upload':8} {'KB':>6} {'route':22} {'disk req/s':>11} {'spooled req/s':>14} {'speedup':>8}")
+    for kind, route, fields, sample in _cases():
+        with contextlib.redirect_stdout(io.StringIO()):
+            disk = asyncio.run(_run("/bench/disk-upload", sample, fields, requests, concurrency))
+            spooled = asyncio.run(_run(route, sample, fields, requests, concurrency))
+        print(
+            f"{kind:8} {len(sample[1]) // 1024:6} {route:22} {disk:11.1f} {spooled:14.1f} {spooled / disk:7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
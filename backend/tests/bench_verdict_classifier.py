@@ -0,0 +1,53 @@
+"""
+Verdict classifier benchmark
+Times the weighted classifier against the phrase sweep it replaced
+
+Run from backend/: python -m tests.bench_verdict_classifier
+"""
+import timeit
+
+from app.utils.analysis_parser import parse_analysis
+from app.utils.verdict_classifier import verdict_classifier
+from tests.verdict_corpus import CORPUS, legacy_classify
+
+FILLER = "The article discusses regional transport funding and quotes two council members. "
+
+
+def _inputs():
+    corpus = [sample.analysis for sample in CORPUS]
+    typical = max(corpus, key=len)
+    # A long analysis with no verdict phrase until the end: the legacy sweep's worst case
+    late = "## Key Findings\n" + FILLER * 60 + "\n## Reliability Assessment\nNeeds verification.\n"
+    # A long analysis full of verdict phrases: the weighted classifier's worst case
+    dense = typical * 20
+    return {
+        f"corpus ({len(corpus)} analyses)": corpus,
+        f"typical ({len(typical)} chars)": [typical],
+        f"late verdict ({len(late)} chars)": [late],
+        f"dense ({len(dense)} chars)": [dense],
+    }
+
+
+def main(repeat: int = 5, number: int = 200):
+    """
+    Print the best per-call time of each classifier on each input
+
+    "weighted" finds the Reliability Assessment section itself; "parsed"
+    is given its span, as AnalyzerService does after parse_analysis().
+    """
+    print(f"{'input':28} {'legacy us':>10} {'weighted us':>12} {'parsed us':>10} {'parsed/legacy':>14}")
+    for name, texts in _inputs().items():
+        spans = [parse_analysis(text).assessment_span or (-1, -1) for text in texts]
+        runs = [
+            lambda: [legacy_classify(text) for text in texts],
+            lambda: [verdict_classifier.classify(text) for text in texts],
+            lambda: [verdict_classifier.classify(text, span) for text, span in zip(texts, spans)],
+        ]
+        legacy, weighted, parsed = [
+            min(timeit.repeat(run, repeat=repeat, number=number)) / number * 1e6 for run in runs
+        ]
+        print(f"{name:28} {legacy:10.1f} {weighted:12.1f} {parsed:10.1f} {parsed / legacy:13.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+"""
+Test configuration
+Points every database at a scratch directory before the app is imported
+"""
+import os
+import tempfile
+
+_SCRATCH = tempfile.mkdtemp(prefix="truthbot-tests-")
+
+os.environ["DATABASE_PATH"] = os.path.join(_SCRATCH, "conversations.db")
+os.environ["CACHE_DB_PATH"] = os.path.join(_SCRATCH, "cache.db")
+# No web search or Gemini traffic from tests
+os.environ["SERPER_API_KEY"] = ""
+os.environ["GEMINI_API_KEY"] = ""
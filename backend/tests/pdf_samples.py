@@ -0,0 +1,61 @@
+"""
+PDF samples
+Builds small text PDFs in memory for extraction tests and benchmarks
+"""
+from typing import List
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: List[str]) -> bytes:
+    """
+    Build a PDF with one page per text (lines split on newlines, Helvetica 10pt)
+
+    Args:
+        pages: Text of each page
+
+    Returns:
+        PDF file bytes
+    """
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page ids are known
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for text in pages:
+        lines = ["BT /F1 10 Tf 12 TL 40 800 Td"]
+        lines += [f"({_escape(line)}) Tj T*" for line in text.split("\n")]
+        lines.append("ET")
+        stream = "\n".join(lines)
+        objects.append(f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return bytes(out)
+
+
+def numbered_pages(count: int, lines_per_page: int = 40) -> List[str]:
+    """Page texts that say which page they are on, so page order can be checked"""
+    return [
+        "\n".join(f"Page {number} line {line}: the council reported 12 new projects." for line in range(lines_per_page))
+        for number in range(count)
+    ]
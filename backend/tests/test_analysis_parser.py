@@ -0,0 +1,103 @@
+"""
+Analysis parser tests
+Section tree, reasons/tips extraction, assessment span and JSON decoding
+"""
+import time
+
+from app.utils.analysis_parser import (
+    MAX_REASONS, MAX_TIPS, decode_verdict, parse_analysis
+)
+from tests.verdict_corpus import CORPUS
+
+ANALYSIS = """Short preamble before any header.
+
+## Key Findings
+- The quoted figure matches the 2023 census release
+- None
+1. The photo predates the event by two years
+
+**Red Flags:**
+* No author or publication date is given
+
+Verification Tips:
++ Search the census bureau site for the table
+- Reverse-search the image
+
+### Reliability Assessment ###
+Doubtful: parts of the claim are accurate, others are not.
+"""
+
+
+def test_sections_follow_each_header_kind():
+    parsed = parse_analysis(ANALYSIS)
+    titles = [section.title for section in parsed.sections]
+    assert titles == ["", "Key Findings", "Red Flags", "Verification Tips", "Reliability Assessment"]
+    assert parsed.sections[0].bullets == []
+
+
+def test_reasons_skip_fragments_and_span_sections():
+    reasons = parse_analysis(ANALYSIS).reasons
+    assert reasons == [
+        "The quoted figure matches the 2023 census release",
+        "The photo predates the event by two years",
+        "No author or publication date is given",
+    ]
+
+
+def test_tips_come_from_tip_sections_only():
+    assert parse_analysis(ANALYSIS).tips == [
+        "Search the census bureau site for the table",
+        "Reverse-search the image",
+    ]
+
+
+def test_assessment_span_covers_the_section_body():
+    parsed = parse_analysis(ANALYSIS)
+    start, end = parsed.assessment_span
+    assert ANALYSIS[start:end].strip() == "Doubtful: parts of the claim are accurate, others are not."
+    assert parse_analysis("- just a bullet").assessment_span is None
+
+
+def test_long_prose_lines_ending_in_colon_are_not_headers():
+    sentence = "The article then lists several statistics that it attributes to the ministry:"
+    parsed = parse_analysis(f"## Key Findings\n{sentence}\n- The ministry never published them\n")
+    assert [section.title for section in parsed.sections] == ["", "Key Findings"]
+    assert parsed.reasons == ["The ministry never published them"]
+
+
+def test_reasons_and_tips_are_capped():
+    bullets = "\n".join(f"- Finding number {index} about the claim" for index in range(10))
+    parsed = parse_analysis(f"## Findings\n{bullets}\n## Tips\n{bullets}\n")
+    assert len(parsed.reasons) == MAX_REASONS
+    assert len(parsed.tips) == MAX_TIPS
+
+
+def test_corpus_assessment_sections_are_found():
+    for sample in CORPUS:
+        has_section = "reliability assessment" in sample.analysis.lower()
+        assert (parse_analysis(sample.analysis).assessment_span is not None) == has_section, sample.name
+
+
+def test_decode_verdict_accepts_fenced_json_only():
+    assert decode_verdict('```json\n{"label": "reliable"}\n```') == {"label": "reliable"}
+    assert decode_verdict('{"label": "doubtful"}') == {"label": "doubtful"}
+    assert decode_verdict("## Reliability Assessment\nReliable") is None
+    assert decode_verdict("{not json") is None
+    assert decode_verdict("[1, 2]") is None
+
+
+def test_parse_time_is_linear_in_length():
+    # Guards against a backtracking regex: 10x the text must not cost 100x the time
+    unit = ANALYSIS + "Filler text without any markup " * 40 + "\n"
+
+    def best_of(text, runs=5):
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            parse_analysis(text)
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    small = best_of(unit * 20)
+    large = best_of(unit * 200)
+    assert large < small * 30
@@ -0,0 +1,120 @@
+"""
+Batch service tests
+Deduplication, packing, and counting only the Gemini calls that answered
+"""
+import asyncio
+
+from app.services.analyzer_service import AnalyzerService
+from app.services.batch_service import BatchService
+
+ANSWER = "## Reliability Assessment\nReliable: the figure matches official statistics.\n"
+FAILURE = "Analysis could not be completed: upstream error"
+
+
+def _run(service: BatchService, contents, pack=True):
+    async def collect():
+        return [event async for event in service.analyze_batch(contents, pack=pack)]
+
+    events = asyncio.run(collect())
+    items = sorted((event for event in events if event["event"] == "item"), key=lambda event: event["index"])
+    return items, events[-1]["stats"]
+
+
+def _service(monkeypatch, answers, packed=None):
+    analyzer = AnalyzerService()
+    monkeypatch.setattr(analyzer, "use_web_search", False)
+
+    async def analyze_text_with_sources(content, search_context=""):
+        return answers[content]
+
+    async def analyze_batch(items):
+        if packed is None:
+            return [None] * len(items)
+        return [packed.get(content) for content, _ in items]
+
+    monkeypatch.setattr(analyzer.gemini_service, "analyze_text_with_sources", analyze_text_with_sources)
+    monkeypatch.setattr(analyzer.gemini_service, "analyze_batch", analyze_batch)
+    return BatchService(analyzer)
+
+
+def test_failed_calls_are_not_counted(monkeypatch):
+    service = _service(monkeypatch, {"Batch claim answered": ANSWER, "Batch claim failed": FAILURE})
+    items, stats = _run(service, ["Batch claim answered", "Batch claim failed", "batch claim answered"], pack=False)
+
+    assert stats["unique_items"] == 2
+    assert stats["duplicates"] == 1
+    assert stats["gemini_calls"] == 1
+    assert items[0]["result"]["label"] == "reliable"
+    assert items[2]["duplicate_of"] == 0
+    # The failed verdict is not cached, so the claim is tried again next time
+    assert not service.analyzer.verdict_cache.get(service.analyzer.text_cache_key("Batch claim failed"))[0]
+
+
+def test_packed_claims_fall_back_to_single_calls(monkeypatch):
+    verdict = {"id": 1, "assessment": "doubtful", "confidence": 0.6, "summary": "Partly true."}
+    service = _service(
+        monkeypatch,
+        {"Packed claim two": ANSWER},
+        packed={"Packed claim one": verdict}
+    )
+    items, stats = _run(service, ["Packed claim one", "Packed claim two"])
+
+    assert stats["packed_calls"] == 1
+    assert stats["packed_items"] == 1
+    assert stats["gemini_calls"] == 2  # the packed call plus one single retry
+    assert stats["upstream_calls"] == 2
+    assert stats["upstream_calls_saved"] == 0
+    assert items[0]["result"]["label"] == "doubtful"
+    assert items[0]["result"]["metadata"]["pipeline_path"] == "batch_packed"
+    assert items[1]["result"]["metadata"]["pipeline_path"] == "batch_single"
+
+
+def test_packed_call_that_failed_is_not_counted(monkeypatch):
+    service = _service(monkeypatch, {"Failed pack one": ANSWER, "Failed pack two": ANSWER})
+    _, stats = _run(service, ["Failed pack one", "Failed pack two"])
+
+    assert stats["packed_calls"] == 0
+    assert stats["gemini_calls"] == 2
+    # The failed packed prompt was still sent: it costs a call, so nothing was saved
+    assert stats["gemini_requests"] == 3
+    assert stats["upstream_calls"] == 3
+    assert stats["upstream_calls_saved"] == 0
+
+
+def test_packed_prompt_counts_as_one_upstream_call(monkeypatch):
+    claims = [f"Counted claim {number}" for number in range(4)]
+    verdict = {"assessment": "reliable", "confidence": 0.8, "summary": "Matches the record."}
+    service = _service(monkeypatch, {}, packed={claim: verdict for claim in claims})
+    _, stats = _run(service, claims + ["counted claim 0"])
+
+    assert stats["packed_calls"] == 1
+    assert stats["packed_items"] == 4
+    assert stats["upstream_calls"] == 1
+    # Five inputs analyzed one by one would have cost five Gemini calls
+    assert stats["upstream_calls_saved"] == 4
+
+
+def test_packed_verdicts_are_not_text_cache_hits(monkeypatch):
+    claims = ["Packed only claim one", "Packed only claim two"]
+    verdict = {"assessment": "doubtful", "confidence": 0.6, "summary": "Partly true."}
+    service = _service(
+        monkeypatch,
+        {claim: ANSWER for claim in claims},
+        packed={claim: verdict for claim in claims}
+    )
+    _, stats = _run(service, claims)
+    assert stats["packed_items"] == 2
+
+    analyzer = service.analyzer
+    assert not analyzer.verdict_cache.get(analyzer.text_cache_key(claims[0]))[0]
+    # A single-text request runs the full prompt instead of reusing the packed summary
+    result = asyncio.run(analyzer.analyze_text(claims[0]))
+    assert result.label == "reliable"
+    assert result.metadata["pipeline_path"] == "no_search"
+
+    # A later batch reuses both kinds of verdict without calling Gemini
+    items, stats = _run(service, claims)
+    assert stats["cache_hits"] == 2
+    assert stats["gemini_requests"] == 0
+    assert items[0]["result"]["metadata"]["pipeline_path"] == "no_search"
+    assert items[1]["result"]["metadata"]["pipeline_path"] == "batch_packed"
@@ -0,0 +1,154 @@
+"""
+Cache tier tests
+In-memory TTL/LRU, the SQLite tier, and the two combined
+"""
+import asyncio
+import json
+import threading
+import time
+
+from app.utils.cache import SQLiteCache, TieredCache, TTLCache
+
+
+def _json_cache(name, db_path, **kwargs):
+    return TieredCache(
+        name,
+        db_path=str(db_path),
+        dumps=lambda value: json.dumps(value).encode("utf-8"),
+        loads=lambda raw: json.loads(raw.decode("utf-8")),
+        **kwargs
+    )
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(ttl=60)
+    cache.set("short", 1, ttl=0.01)
+    cache.set("long", 2)
+    time.sleep(0.02)
+    assert cache.get("short") == (False, None)
+    assert cache.get("long") == (True, 2)
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now the oldest
+    cache.set("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.evictions == 1
+
+
+def test_sqlite_cache_round_trip_and_compression(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.db", namespace="raw", compress=True)
+    payload = b"verdict " * 100
+    cache.set("key", payload, ttl=60)
+    assert cache.get("key") == (True, payload)
+    assert cache.get_stats()["bytes"] < len(payload)
+    assert cache.get("missing") == (False, None)
+    cache.close()
+
+
+def test_sqlite_cache_namespaces_share_a_file(tmp_path):
+    first = SQLiteCache(tmp_path / "cache.db", namespace="first")
+    second = SQLiteCache(tmp_path / "cache.db", namespace="second")
+    first.set("key", b"one", ttl=60)
+    assert second.get("key") == (False, None)
+    second.clear()
+    assert first.get("key") == (True, b"one")
+    first.close()
+    second.close()
+
+
+def test_sqlite_cache_evicts_least_recently_used_in_batches(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.db", namespace="lru", max_entries=3, evict_every=5)
+    for index in range(3):
+        cache.set(f"k{index}", b"x", ttl=60)
+        time.sleep(0.002)
+    cache.get("k0")  # touched, so k1 becomes the oldest once access times are written
+    cache.set("k3", b"x", ttl=60)
+    # Eviction waits for evict_every writes
+    assert cache.get_stats()["entries"] == 4
+    cache.flush()
+    assert cache.get_stats()["entries"] == 3
+    assert cache.get("k1") == (False, None)
+    assert cache.get("k0")[0]
+    cache.close()
+
+
+def test_sqlite_cache_hides_and_evicts_expired_rows(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.db", namespace="ttl")
+    cache.set("gone", b"x", ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("gone") == (False, None)
+    cache.flush()
+    assert cache.get_stats()["entries"] == 0
+    assert cache.evictions == 1
+    cache.close()
+
+
+def test_tiered_cache_survives_restart(tmp_path):
+    cache = _json_cache("verdicts", tmp_path / "cache.db")
+    cache.set("key", {"verdict": "reliable"})
+    cache.close()
+
+    reopened = _json_cache("verdicts", tmp_path / "cache.db")
+    assert reopened.get("key") == (True, {"verdict": "reliable"})
+    assert reopened.disk_hits == 1
+    # A disk hit is promoted to memory
+    assert reopened.get("key") == (True, {"verdict": "reliable"})
+    assert reopened.memory_hits == 1
+    reopened.close()
+
+
+def test_tiered_cache_aget_reads_disk_off_the_loop(tmp_path):
+    cache = _json_cache("verdicts", tmp_path / "cache.db")
+    cache.set("key", [1, 2, 3])
+    cache.flush()
+    cache.memory.clear()
+
+    assert asyncio.run(cache.aget("key")) == (True, [1, 2, 3])
+    assert asyncio.run(cache.aget("missing")) == (False, None)
+    stats = cache.get_stats()
+    assert stats["disk_hits"] == 1
+    assert stats["misses"] == 1
+    cache.close()
+
+
+def test_tiered_cache_aget_stats_counts_disk_off_the_loop(tmp_path):
+    cache = _json_cache("verdicts", tmp_path / "cache.db")
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.flush()
+    threads = []
+    count = cache.disk.get_stats
+
+    def get_stats():
+        threads.append(threading.current_thread())
+        return count()
+
+    cache.disk.get_stats = get_stats
+    stats = asyncio.run(cache.aget_stats())
+    assert stats["disk_entries"] == 2
+    assert threads and threads[0] is not threading.main_thread()
+    cache.close()
+
+
+def test_tiered_cache_keeps_remaining_lifetime_on_promotion(tmp_path):
+    cache = _json_cache("negative", tmp_path / "cache.db", ttl=3600)
+    cache.set("key", "not found", ttl=0.05)
+    cache.flush()
+    cache.memory.clear()
+    assert cache.get("key")[0]
+    time.sleep(0.06)
+    assert cache.get("key") == (False, None)
+    cache.close()
+
+
+def test_disabled_tiered_cache_stores_nothing(tmp_path):
+    cache = _json_cache("off", tmp_path / "cache.db", enabled=False)
+    cache.set("key", 1)
+    assert cache.get("key") == (False, None)
+    assert cache.disk is None
+    assert not (tmp_path / "cache.db").exists()
@@ -0,0 +1,134 @@
+"""
+Chunked document analysis tests
+Map-reduce over overlapping chunks: the reduced verdict, bounded
+concurrency, per-chunk caching and failed chunks
+"""
+import asyncio
+import json
+
+from app.config import settings
+from app.services.analyzer_service import AnalyzerService
+from app.utils.chunking import split_chunks
+
+FALSE_PARAGRAPH = (
+    "The moon landing was staged in a film studio, the flyer insists. It adds that the footage "
+    "was shot over three days and that no rocket ever left the launch pad that summer."
+)
+
+
+def _paragraphs(count: int):
+    return [
+        f"Paragraph {number}: the district library extended its opening hours and added "
+        f"{number * 10} new titles to the local history collection, volunteers reported this season."
+        for number in range(count)
+    ]
+
+
+def _document(paragraphs) -> str:
+    return "\n\n".join(paragraphs)
+
+
+def _analyzer(monkeypatch, tmp_path, failing=None):
+    """Chunked-mode analyzer whose stub Gemini rates chunks containing FALSE_PARAGRAPH false"""
+    monkeypatch.setattr(settings, "CACHE_DB_PATH", str(tmp_path / "cache.db"))
+    monkeypatch.setattr(settings, "DOCUMENT_ANALYSIS_MODE", "chunked")
+    monkeypatch.setattr(settings, "EXTRACTION_MODE", "thread")
+    monkeypatch.setattr(settings, "CHUNK_CHARS", 400)
+    monkeypatch.setattr(settings, "CHUNK_OVERLAP", 50)
+    monkeypatch.setattr(settings, "CHUNK_CONCURRENCY", 2)
+    analyzer = AnalyzerService()
+    monkeypatch.setattr(analyzer, "use_web_search", False)
+    calls = []
+    in_flight = 0
+    peak = 0
+
+    async def analyze_text_with_sources(content, search_context=""):
+        nonlocal in_flight, peak
+        calls.append(content)
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            in_flight -= 1
+        if failing is not None and failing in content:
+            raise RuntimeError("connection reset")
+        false = "moon landing" in content
+        return json.dumps({
+            "assessment": "potentially_false" if false else "reliable",
+            "confidence": 0.9,
+            "reasons": ["The landing is well documented" if false else "Matches the library's announcements"],
+            "tips": ["Check the original source"],
+            "summary": "Chunk assessment.",
+        })
+
+    monkeypatch.setattr(analyzer.gemini_service, "analyze_text_with_sources", analyze_text_with_sources)
+    return analyzer, calls, lambda: peak
+
+
+def test_one_false_chunk_decides_the_document(monkeypatch, tmp_path):
+    analyzer, calls, peak = _analyzer(monkeypatch, tmp_path)
+    paragraphs = _paragraphs(16)
+    paragraphs.insert(9, FALSE_PARAGRAPH)
+    content = _document(paragraphs)
+    chunks = split_chunks(content, 400, 50)
+    assert len(chunks) >= 6
+
+    result = asyncio.run(analyzer.analyze_file(content.encode(), "txt"))
+
+    assert result.label == "potentially_false"
+    assert result.confidence == 0.9
+    assert result.metadata["pipeline_path"] == "chunked"
+    assert result.metadata["chunks_total"] == result.metadata["chunks_analyzed"] == len(chunks)
+    assert [chunk["index"] for chunk in result.metadata["chunks"]] == list(range(len(chunks)))
+    assert sum(chunk["label"] == "potentially_false" for chunk in result.metadata["chunks"]) == 1
+    assert result.reasons[0].startswith("Part ") and "potentially false" in result.reasons[0]
+    assert len(calls) == len(chunks)
+    assert peak() <= settings.CHUNK_CONCURRENCY
+
+
+def test_editing_one_paragraph_reanalyzes_only_nearby_chunks(monkeypatch, tmp_path):
+    analyzer, calls, _ = _analyzer(monkeypatch, tmp_path)
+    paragraphs = _paragraphs(20)
+    first = asyncio.run(analyzer.analyze_file(_document(paragraphs).encode(), "txt"))
+    assert first.label == "reliable"
+    total = len(calls)
+
+    paragraphs[12] = paragraphs[12].replace("volunteers", "staff")
+    edited = asyncio.run(analyzer.analyze_file(_document(paragraphs).encode(), "txt"))
+
+    assert 1 <= len(calls) - total <= 2
+    assert edited.metadata["chunks_cached"] >= edited.metadata["chunks_total"] - 2
+
+
+def test_failed_chunk_is_left_out(monkeypatch, tmp_path):
+    analyzer, _, _ = _analyzer(monkeypatch, tmp_path, failing="Paragraph 3:")
+    content = _document(_paragraphs(16))
+
+    result = asyncio.run(analyzer.analyze_file(content.encode(), "txt"))
+
+    failed = [chunk for chunk in result.metadata["chunks"] if "error" in chunk]
+    assert len(failed) >= 1
+    assert result.metadata["chunks_analyzed"] == result.metadata["chunks_total"] - len(failed)
+    assert result.label == "reliable"
+
+
+def test_only_the_first_chunks_are_analyzed(monkeypatch, tmp_path):
+    analyzer, calls, _ = _analyzer(monkeypatch, tmp_path)
+    monkeypatch.setattr(settings, "CHUNK_MAX_CHUNKS", 3)
+    content = _document(_paragraphs(16))
+
+    result = asyncio.run(analyzer.analyze_file(content.encode(), "txt"))
+
+    assert result.metadata["chunks_total"] == len(split_chunks(content, 400, 50))
+    assert result.metadata["chunks_analyzed"] == 3
+    assert len(calls) == 3
+
+
+def test_short_document_is_analyzed_whole(monkeypatch, tmp_path):
+    analyzer, calls, _ = _analyzer(monkeypatch, tmp_path)
+
+    result = asyncio.run(analyzer.analyze_file(_document(_paragraphs(1)).encode(), "txt"))
+
+    assert result.metadata["pipeline_path"] == "no_search"
+    assert len(calls) == 1
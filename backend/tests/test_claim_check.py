@@ -0,0 +1,107 @@
+"""
+Claim-mode document analysis tests
+Claims picked from a document, verified in packed Gemini calls and reduced
+to one verdict
+"""
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+from app.config import settings
+from app.services.analyzer_service import AnalyzerService
+
+FALSE_CLAIM = "The moon landing in 1969 was filmed in a studio in Nevada, the pamphlet claims."
+CLAIMS = [
+    "The city council approved a budget of 12 million euros on Monday, officials said.",
+    "Mayor Anna Berg said the new tram line will open in March 2026.",
+    "The river flooded the town centre in 2011, according to the regional water board.",
+    "Unemployment in the region fell to 4.1 percent last year, the statistics office reported.",
+    "The hospital added 120 beds after the 2019 expansion, its director confirmed.",
+    "The museum received 300,000 visitors in 2023, a record according to its annual report.",
+    "The football club was founded in 1904 by railway workers, historians say.",
+]
+FILLER = "Residents can read more local news on the community website.\n"
+WHOLE_DOCUMENT = "## Reliability Assessment\nReliable: the newsletter reports routine local news.\n"
+
+
+def _document(*claims: str) -> bytes:
+    return ("\n".join(claims) + "\n" + FILLER * 20).encode()
+
+
+def _analyzer(monkeypatch, tmp_path):
+    """Claim-mode analyzer with stub search and a stub Gemini that rates only FALSE_CLAIM false"""
+    monkeypatch.setattr(settings, "CACHE_DB_PATH", str(tmp_path / "cache.db"))
+    monkeypatch.setattr(settings, "DOCUMENT_ANALYSIS_MODE", "claims")
+    monkeypatch.setattr(settings, "DOCUMENT_MIN_CHARS", 200)
+    monkeypatch.setattr(settings, "EXTRACTION_MODE", "thread")
+    monkeypatch.setattr(settings, "BATCH_PACK_SIZE", 4)
+    analyzer = AnalyzerService()
+    prompts = []
+
+    async def search_sources(content):
+        return f"- **example.org**: Records about: {content[:40]}"
+
+    def generate_content(prompt, generation_config=None):
+        prompts.append(prompt)
+        claims = re.findall(r"### CLAIM (\d+)\n(.+)\n", prompt)
+        if not claims:
+            return SimpleNamespace(text=WHOLE_DOCUMENT, usage_metadata=None)
+        verdicts = [
+            {
+                "id": int(number),
+                "assessment": "potentially_false" if claim == FALSE_CLAIM else "reliable",
+                "confidence": 0.9,
+                "reasons": ["No footage was staged" if claim == FALSE_CLAIM else "Matches public records"],
+                "tips": ["Check the original source"],
+                "summary": f"Assessment of claim {number}.",
+            }
+            for number, claim in claims
+        ]
+        return SimpleNamespace(text=json.dumps(verdicts), usage_metadata=None)
+
+    monkeypatch.setattr(analyzer, "use_web_search", True)
+    monkeypatch.setattr(analyzer, "search_sources", search_sources)
+    monkeypatch.setattr(analyzer.gemini_service, "backend", "thread")
+    monkeypatch.setattr(analyzer.gemini_service, "model", SimpleNamespace(generate_content=generate_content))
+    return analyzer, prompts
+
+
+def test_one_false_claim_decides_the_document(monkeypatch, tmp_path):
+    analyzer, prompts = _analyzer(monkeypatch, tmp_path)
+
+    result = asyncio.run(analyzer.analyze_file(_document(*CLAIMS[:4], FALSE_CLAIM, *CLAIMS[4:]), "txt"))
+
+    assert result.label == "potentially_false"
+    assert result.confidence == 0.9
+    assert result.metadata["pipeline_path"] == "claims"
+    assert result.metadata["claims_found"] == result.metadata["claims_checked"] == 8
+    # Eight claims, packed four to a prompt
+    assert len(prompts) == 2
+    assert result.reasons[0].startswith('"The moon landing')
+    checks = {check["claim"]: check for check in result.metadata["claim_checks"]}
+    assert checks[FALSE_CLAIM]["label"] == "potentially_false"
+    assert all(checks[claim]["label"] == "reliable" for claim in CLAIMS)
+    assert "Claim-by-claim verification" in result.analysis_details
+
+
+def test_claim_verdicts_are_reused_by_other_documents(monkeypatch, tmp_path):
+    analyzer, prompts = _analyzer(monkeypatch, tmp_path)
+    asyncio.run(analyzer.analyze_file(_document(*CLAIMS), "txt"))
+    assert len(prompts) == 2
+
+    # Another document repeating the same claims: no new Gemini calls
+    result = asyncio.run(analyzer.analyze_file(_document(*reversed(CLAIMS)) + FILLER.encode(), "txt"))
+    assert len(prompts) == 2
+    assert result.label == "reliable"
+    assert all(check["cached"] for check in result.metadata["claim_checks"])
+
+
+def test_document_with_too_few_claims_is_analyzed_whole(monkeypatch, tmp_path):
+    analyzer, prompts = _analyzer(monkeypatch, tmp_path)
+
+    result = asyncio.run(analyzer.analyze_file(_document(CLAIMS[0]), "txt"))
+
+    assert result.label == "reliable"
+    assert result.metadata["pipeline_path"] != "claims"
+    assert len(prompts) == 1 and "### CLAIM" not in prompts[0]
@@ -0,0 +1,119 @@
+"""
+Claim index tests
+Which reworded claims match, which look alike but must not, expiry and
+eviction, and reuse of indexed verdicts by the analyzer
+"""
+import asyncio
+import time
+
+from app.config import settings
+from app.services.analyzer_service import AnalyzerService
+from app.utils.claim_index import ClaimIndex
+
+ANSWER = "## Reliability Assessment\nPotentially false: no study has found such a link.\n"
+
+
+def _match(stored: str, query: str, **kwargs):
+    index = ClaimIndex(**kwargs)
+    index.add(stored, "verdict")
+    return index.find(query)
+
+
+def test_reworded_claim_matches():
+    stored = "Vaccines cause autism in children"
+    for query in (
+        "Autism in children is caused by vaccines",
+        "In children, vaccines cause autism.",
+        "vaccine causes AUTISM in children!",
+    ):
+        assert _match(stored, query) == (1.0, "verdict"), query
+    assert _match("Trump was defeated by Biden in 2020", "Biden defeated Trump in 2020") == (1.0, "verdict")
+
+
+def test_swapped_roles_do_not_match():
+    assert _match("Biden defeated Trump in the 2020 election", "Trump defeated Biden in the 2020 election") is None
+    assert _match("Trump was defeated by Biden in 2020", "Trump defeated Biden in 2020") is None
+    assert _match("Vaccines lead to autism in children", "Autism in children leads to vaccines") is None
+
+
+def test_different_numbers_do_not_match():
+    # A low threshold, so that the number check is what rejects the candidate
+    index = ClaimIndex(threshold=0.5)
+    index.add("Unemployment in Ohio rose 5% last year", "verdict")
+    assert index.find("Unemployment in Ohio rose 50% last year") is None
+    assert index.find("Last year unemployment in Ohio rose 5%") == (1.0, "verdict")
+    assert index.get_stats()["rejected"] == 1
+
+
+def test_negation_must_agree():
+    assert _match("The drug causes cancer in adult patients", "The drug does not cause cancer in adult patients") is None
+    assert _match("The drug doesn't cause cancer in adult patients", "The drug does not cause cancer in adult patients")
+
+
+def test_entries_expire_after_ttl():
+    index = ClaimIndex(ttl=0.05)
+    index.add("The bridge was built by Roman engineers", "verdict")
+    assert index.find("Roman engineers built the bridge") == (1.0, "verdict")
+    time.sleep(0.1)
+    assert index.find("Roman engineers built the bridge") is None
+    assert index.count() == 0
+    assert index.get_stats()["expired"] == 1
+    # A verdict produced long ago is not indexed at all
+    assert index.add("The tower is 330 metres tall", "verdict", created_at=time.time() - 1) is None
+
+
+def test_claims_are_added_without_rebuilding_the_index():
+    index = ClaimIndex()
+    index.add("The harbour was dredged in 2019", "harbour")
+    buckets = dict((key, set(ids)) for key, ids in index._buckets.items())
+
+    index.add("The museum reopened after a renovation in 2022", "museum")
+    # Earlier buckets are untouched apart from the new claim's own band keys
+    for key, ids in buckets.items():
+        assert ids <= index._buckets[key]
+    assert index.count() == 2
+    assert index.find("In 2019 the harbour was dredged") == (1.0, "harbour")
+    assert index.find("After a renovation in 2022 the museum reopened") == (1.0, "museum")
+
+
+def test_oldest_claims_are_evicted_beyond_max_entries():
+    index = ClaimIndex(max_entries=2)
+    index.add("The harbour was dredged in 2019", "harbour")
+    index.add("The museum reopened after a renovation in 2022", "museum")
+    index.add("The stadium holds 40,000 seated fans", "stadium")
+
+    assert index.count() == 2
+    assert index.find("The harbour was dredged in 2019") is None
+    assert index.find("The stadium holds 40,000 seated fans") == (1.0, "stadium")
+    # Evicted claims leave no buckets behind
+    assert all(ids for ids in index._buckets.values())
+    assert set().union(*index._buckets.values()) == set(index._entries)
+
+
+def test_analyzer_reuses_a_reworded_claims_verdict(monkeypatch):
+    monkeypatch.setattr(settings, "CLAIM_INDEX_ENABLED", True)
+    monkeypatch.setattr(settings, "ANALYSIS_PIPELINE_MODE", "sequential")
+    analyzer = AnalyzerService()
+    calls = []
+
+    async def analyze_text_with_sources(content, search_context=""):
+        calls.append(content)
+        return ANSWER
+
+    monkeypatch.setattr(analyzer, "use_web_search", False)
+    monkeypatch.setattr(analyzer.gemini_service, "analyze_text_with_sources", analyze_text_with_sources)
+
+    async def scenario():
+        first = await analyzer.analyze_text("Claim index test: vaccines cause autism in children")
+        reworded = await analyzer.analyze_text("Claim index test: autism in children is caused by vaccines")
+        reworded.reasons.append("Added by the caller")
+        again = await analyzer.analyze_text("Claim index test: in children, vaccines cause autism")
+        return first, reworded, again
+
+    first, reworded, again = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert reworded.label == first.label
+    assert reworded.metadata["similar_claim"]["score"] == 1.0
+    assert reworded.content_preview.startswith("Claim index test: autism")
+    # Callers get copies: changing one result does not change the indexed verdict
+    assert again.reasons == first.reasons
@@ -0,0 +1,103 @@
+"""
+ConcurrencyLimiter tests
+Bounded admission, and the 503 + Retry-After response when Gemini is saturated
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from app.utils.concurrency import ConcurrencyLimiter, OverloadedError
+
+
+def test_admits_up_to_max_concurrency_then_queues():
+    async def scenario():
+        limiter = ConcurrencyLimiter("test", max_concurrency=2, max_queue=1)
+        await limiter.acquire()
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        queued = limiter.get_stats()["queued"]
+        limiter.release()
+        await waiter
+        return queued, limiter.get_stats()
+
+    queued, stats = asyncio.run(scenario())
+    assert queued == 1
+    assert stats["in_flight"] == 2
+    assert stats["admitted"] == 3
+    assert stats["queued"] == 0
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    async def scenario():
+        limiter = ConcurrencyLimiter("test", max_concurrency=1, max_queue=1, retry_after=7)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        try:
+            with pytest.raises(OverloadedError) as excinfo:
+                await limiter.acquire()
+        finally:
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+        return excinfo.value, limiter.get_stats()
+
+    error, stats = asyncio.run(scenario())
+    assert error.retry_after == 7
+    assert stats["rejected"] == 1
+
+
+def test_queue_timeout_is_rejected():
+    async def scenario():
+        limiter = ConcurrencyLimiter("test", max_concurrency=1, max_queue=5, queue_timeout=0.01)
+        await limiter.acquire()
+        with pytest.raises(OverloadedError):
+            await limiter.acquire()
+        return limiter.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["timed_out"] == 1
+    assert stats["queued"] == 0
+
+
+def test_context_manager_releases_on_error():
+    async def scenario():
+        limiter = ConcurrencyLimiter("test", max_concurrency=1, max_queue=0)
+        with pytest.raises(RuntimeError):
+            async with limiter:
+                raise RuntimeError("boom")
+        async with limiter:
+            pass
+        return limiter.get_stats()["in_flight"]
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_saturated_gemini_returns_503_with_retry_after(monkeypatch):
+    from app.config import settings
+    from app.main import app
+    from app.routes.analyze import analyzer_service
+
+    limiter = analyzer_service.gemini_service.limiter
+    monkeypatch.setattr(limiter, "max_queue", 0)
+
+    async def scenario():
+        # Hold every Gemini slot so the request finds no room and no queue
+        for _ in range(limiter.max_concurrency):
+            await limiter.acquire()
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post(
+                    "/api/analyze/text",
+                    json={"content": "Saturation test claim that is not cached anywhere"}
+                )
+        finally:
+            for _ in range(limiter.max_concurrency):
+                limiter.release()
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(settings.GEMINI_RETRY_AFTER)
+    assert "Gemini" in response.json()["detail"]
@@ -0,0 +1,70 @@
+"""
+Extraction cache tests
+Which uploads share an extracted-text cache entry, and which do not
+"""
+import asyncio
+import hashlib
+import io
+
+from app.services import analyzer_service as analyzer_module
+from app.services.analyzer_service import AnalyzerService
+from app.services.extractor_service import ExtractedText
+
+DOCUMENT = b"Extraction cache test: the harbour was dredged in 2019."
+
+
+def _analyzer(monkeypatch):
+    """AnalyzerService whose extraction pool records each extraction it is asked for"""
+    analyzer = AnalyzerService()
+    calls = []
+
+    async def extract(source, file_type, max_chars=None):
+        calls.append((file_type, max_chars))
+        return ExtractedText(DOCUMENT.decode(), pages_total=3, pages_read=2)
+
+    monkeypatch.setattr(analyzer.extraction_pool, "extract", extract)
+    return analyzer, calls
+
+
+def _extract(analyzer, source, file_type="pdf", max_chars=None, content=DOCUMENT):
+    content_hash = hashlib.sha256(content).hexdigest()
+    return asyncio.run(analyzer._extract(source, file_type, content_hash, max_chars=max_chars))
+
+
+def test_same_bytes_are_extracted_once(monkeypatch, tmp_path):
+    analyzer, calls = _analyzer(monkeypatch)
+    path = tmp_path / "report.pdf"
+    path.write_bytes(DOCUMENT)
+
+    first = _extract(analyzer, DOCUMENT, max_chars=1000)
+    # Same bytes as a saved file, a spooled upload, or with an upper-case extension
+    assert _extract(analyzer, str(path), max_chars=1000) == first
+    assert _extract(analyzer, io.BytesIO(DOCUMENT), max_chars=1000) == first
+    assert _extract(analyzer, DOCUMENT, "PDF", max_chars=1000) == first
+
+    assert calls == [("pdf", 1000)]
+    assert first == ExtractedText(DOCUMENT.decode(), 3, 2)
+    assert analyzer.extraction_bytes_saved == 3 * len(DOCUMENT)
+
+    # The disk tier outlives the process
+    restarted, restarted_calls = _analyzer(monkeypatch)
+    assert _extract(restarted, DOCUMENT, max_chars=1000) == first
+    assert restarted_calls == []
+
+
+def test_key_covers_type_budget_content_and_extractor_version(monkeypatch):
+    analyzer, calls = _analyzer(monkeypatch)
+    other = DOCUMENT + b" Revised."
+
+    _extract(analyzer, DOCUMENT, "docx", max_chars=2000)
+    _extract(analyzer, DOCUMENT, "txt", max_chars=2000)  # another file type
+    _extract(analyzer, DOCUMENT, "docx", max_chars=4000)  # another PDF budget
+    _extract(analyzer, other, "docx", max_chars=2000, content=other)  # other bytes
+    assert len(calls) == 4
+
+    # A new extractor version invalidates every earlier extraction
+    monkeypatch.setattr(analyzer_module, "EXTRACTOR_VERSION", "test-next")
+    _extract(analyzer, DOCUMENT, "docx", max_chars=2000)
+    assert len(calls) == 5
+    _extract(analyzer, DOCUMENT, "docx", max_chars=2000)
+    assert len(calls) == 5
@@ -0,0 +1,161 @@
+"""
+Extraction pool tests
+Per-job timeouts counted from pickup, recycling of hung workers without
+losing the jobs running beside them, and page-parallel PDF extraction
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.config import settings
+from app.services.extraction_pool import ExtractionPool, ExtractionTimeoutError, _extract_pdf_range_in_worker
+from app.services.extractor_service import ExtractorService
+from tests.pdf_samples import make_pdf, numbered_pages
+
+
+def _pool(mode: str, workers: int, timeout: float) -> ExtractionPool:
+    pool = ExtractionPool()
+    pool.mode = mode
+    pool.workers = workers
+    pool.timeout = timeout
+    pool._slots = asyncio.Semaphore(workers)
+    return pool
+
+
+def test_text_is_extracted_off_the_loop():
+    pool = _pool("thread", workers=1, timeout=10)
+    try:
+        result = asyncio.run(pool.extract(b"Plain text upload", "txt"))
+    finally:
+        pool.shutdown()
+    assert result.text == "Plain text upload"
+    assert pool.get_stats()["completed"] == 1
+
+
+def test_queued_jobs_do_not_use_up_their_timeout():
+    # Three 0.2s jobs on one worker take 0.6s, but each runs well inside 0.4s
+    pool = _pool("thread", workers=1, timeout=0.4)
+
+    async def scenario():
+        return await asyncio.gather(*[pool._run(time.sleep, 0.2) for _ in range(3)])
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    assert pool.timeouts == 0
+    assert pool.get_stats()["busy_workers"] == 0
+
+
+def test_job_over_timeout_raises():
+    pool = _pool("thread", workers=1, timeout=0.05)
+    try:
+        with pytest.raises(ExtractionTimeoutError):
+            asyncio.run(pool._run(time.sleep, 0.3))
+    finally:
+        pool.shutdown()
+    assert pool.timeouts == 1
+    assert pool.recycles == 0  # threads cannot be killed; only process pools are recycled
+    assert pool.get_stats()["retiring_pools"] == 0
+
+
+def test_hung_worker_process_is_replaced():
+    pool = _pool("process", workers=1, timeout=3)
+
+    async def scenario():
+        # Start the worker first, so the timeout below hits a running job
+        assert await pool._run(len, "warm") == 4
+        with pytest.raises(ExtractionTimeoutError):
+            await pool._run(time.sleep, 60)
+        return await pool._run(len, "abc")
+
+    try:
+        assert asyncio.run(scenario()) == 3
+    finally:
+        pool.shutdown()
+    assert pool.recycles == 1
+
+
+def test_timeout_does_not_kill_jobs_running_beside_it():
+    pool = _pool("process", workers=2, timeout=2)
+
+    async def scenario():
+        # Start both workers first
+        await asyncio.gather(pool._run(time.sleep, 0.3), pool._run(time.sleep, 0.3))
+        old = pool._executor
+        hung = asyncio.create_task(pool._run(time.sleep, 60))
+        await asyncio.sleep(1.5)
+        # Still running on the old pool when the hung job times out
+        beside = asyncio.create_task(pool._run(time.sleep, 1.5))
+        with pytest.raises(ExtractionTimeoutError):
+            await hung
+        assert pool.get_stats()["retiring_pools"] == 1
+        processes = list(old._processes.values())
+        assert all(process.is_alive() for process in processes)
+
+        await beside
+        # The job beside it finished on the old pool; then the old pool was killed
+        for process in processes:
+            process.join(5)
+        assert not any(process.is_alive() for process in processes)
+        return await pool._run(len, "abc")
+
+    try:
+        assert asyncio.run(scenario()) == 3
+    finally:
+        pool.shutdown()
+    assert pool.timeouts == 1
+    assert pool.crashes == 0  # the job beside it was not broken off and retried
+    assert pool.recycles == 1
+    assert pool.get_stats()["retiring_pools"] == 0
+
+
+def _pdf_pool(monkeypatch, per_job: int):
+    """Two-worker process pool extracting PDFs in ranges of ``per_job`` pages; returns (pool, ranges started)"""
+    monkeypatch.setattr(settings, "PDF_PAGES_PER_JOB", per_job)
+    pool = _pool("process", workers=2, timeout=30)
+    ranges = []
+    run = pool._run
+
+    async def recording_run(function, *args, **kwargs):
+        if function is _extract_pdf_range_in_worker:
+            ranges.append(args[1:3])
+        return await run(function, *args, **kwargs)
+
+    pool._run = recording_run
+    return pool, ranges
+
+
+def test_parallel_pdf_pages_come_back_in_order(monkeypatch):
+    pdf = make_pdf(numbered_pages(20))
+    pool, ranges = _pdf_pool(monkeypatch, per_job=3)
+    try:
+        result = asyncio.run(pool.extract(pdf, "pdf"))
+    finally:
+        pool.shutdown()
+
+    texts, total = ExtractorService.extract_pdf_pages(pdf)
+    assert (result.pages_total, result.pages_read) == (20, 20)
+    assert result.text == "\n".join(texts)
+    numbers = [int(line.split()[1]) for line in result.text.splitlines() if " line 0:" in line]
+    assert numbers == list(range(20))
+    assert sorted(ranges) == [(start, min(start + 3, 20)) for start in range(0, 20, 3)]
+
+
+def test_parallel_pdf_stops_at_max_chars(monkeypatch):
+    pdf = make_pdf(numbered_pages(20))
+    texts, _ = ExtractorService.extract_pdf_pages(pdf)
+    budget = sum(len(text) for text in texts[:7]) + 1  # reached on the 8th page
+    pool, ranges = _pdf_pool(monkeypatch, per_job=2)
+    try:
+        result = asyncio.run(pool.extract(pdf, "pdf", max_chars=budget))
+    finally:
+        pool.shutdown()
+
+    # Same pages as reading serially with the same budget
+    assert (result.pages_total, result.pages_read) == (20, 8)
+    assert result.text == "\n".join(texts[:8])
+    assert pool.get_stats()["pdf_pages_skipped"] == 12
+    # No range was started past the wave that filled the budget
+    assert max(start for start, _ in ranges) < 10
@@ -0,0 +1,107 @@
+"""
+Gemini image tests
+Image counters updated from worker threads, and one decode per analyzed image
+"""
+import asyncio
+import io
+import threading
+
+from PIL import Image
+
+import app.services.gemini_service as gemini_module
+from app.config import settings
+from app.services.analyzer_service import AnalyzerService
+from app.services.gemini_service import GeminiService
+from app.utils.image_processing import NormalizedImage
+
+ANSWER = "## Reliability Assessment\nThe image shows no signs of manipulation.\n"
+
+
+def _jpeg(size=(640, 480)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (120, 60, 200)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def _count_decodes(monkeypatch) -> list:
+    calls = []
+    original = gemini_module.normalize_image
+
+    def normalize_image(*args, **kwargs):
+        calls.append(args[0])
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(gemini_module, "normalize_image", normalize_image)
+    return calls
+
+
+def test_image_stats_from_threads_are_exact():
+    service = GeminiService()
+
+    def record():
+        for _ in range(2000):
+            service._record_image_stats(images=1, sent_bytes=3, vision_ms=0.5)
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert service.image_stats["images"] == 16000
+    assert service.image_stats["sent_bytes"] == 48000
+    assert service.get_stats()["images"]["avg_vision_ms"] == 0.5
+
+
+def test_prepared_image_is_not_decoded_again(monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_NORMALIZE_ENABLED", True)
+    decodes = _count_decodes(monkeypatch)
+    service = GeminiService()
+
+    image = service.prepare_image(_jpeg())
+    # Preparing alone (e.g. only to hash) does not count as a request
+    assert service.image_stats["images"] == 0
+
+    part = service._image_part(image)
+    assert part["data"] == image.data
+    assert len(decodes) == 1
+    assert service.image_stats["images"] == 1
+    assert service.image_stats["sent_bytes"] == image.encoded_bytes
+
+
+def test_unnormalized_image_is_sent_decoded(monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_NORMALIZE_ENABLED", False)
+    service = GeminiService()
+    data = _jpeg()
+
+    image = service.prepare_image(data)
+    assert isinstance(image, NormalizedImage)
+    assert image.data is None
+    assert image.original_bytes == len(data)
+    assert service._image_part(image) is image.image
+
+
+def test_analyzer_decodes_image_once_for_hash_and_gemini(monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_NORMALIZE_ENABLED", True)
+    monkeypatch.setattr(settings, "IMAGE_HASH_ENABLED", True)
+    decodes = _count_decodes(monkeypatch)
+    analyzer = AnalyzerService()
+    sent = []
+
+    async def analyze_image(image):
+        sent.append(image)
+        return ANSWER
+
+    async def image_text(file_path):
+        return None
+
+    monkeypatch.setattr(analyzer.gemini_service, "analyze_image", analyze_image)
+    monkeypatch.setattr(analyzer, "_image_text", image_text)
+    try:
+        result = asyncio.run(analyzer._analyze_image_uncached(_jpeg()))
+    finally:
+        analyzer.image_index.close()
+
+    assert result.label
+    assert len(decodes) == 1
+    assert isinstance(sent[0], NormalizedImage)
@@ -0,0 +1,80 @@
+"""
+Image hash tests
+Perceptual hashes of re-encoded copies, and the near-duplicate index
+"""
+import io
+
+from PIL import Image, ImageDraw
+
+from app.utils.image_hash import ImageHashIndex, dhash, hamming, image_hashes
+
+
+def _scene(seed: int) -> Image.Image:
+    """A photo-like image: shaded background with a few shapes"""
+    image = Image.new("RGB", (320, 240))
+    draw = ImageDraw.Draw(image)
+    for x in range(320):
+        shade = (x * (seed + 3)) % 256
+        draw.line([(x, 0), (x, 239)], fill=(shade, 255 - shade, (shade * seed) % 256))
+    for index in range(4):
+        left = (seed * 37 + index * 61) % 240
+        top = (seed * 53 + index * 41) % 160
+        draw.ellipse([left, top, left + 70, top + 70], fill=((index * 80) % 256, 30, 200))
+    return image
+
+
+def _reencoded(image: Image.Image, scale: float = 0.5, quality: int = 60) -> bytes:
+    """The image resized and saved as a lossy JPEG, like a forwarded screenshot"""
+    size = (int(image.width * scale), int(image.height * scale))
+    buffer = io.BytesIO()
+    image.resize(size).save(buffer, "JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def _png(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_reencoded_copy_hashes_close_and_other_image_far():
+    original = _scene(1)
+    value, detail = image_hashes(_png(original))
+    copy_value, copy_detail = image_hashes(_reencoded(original))
+    other_value, other_detail = image_hashes(_png(_scene(7)))
+
+    assert hamming(value, copy_value) <= 6
+    assert hamming(detail, copy_detail) <= 24
+    assert hamming(value, other_value) > 6 or hamming(detail, other_detail) > 24
+
+
+def test_hashes_accept_a_decoded_image():
+    original = _scene(2)
+    assert image_hashes(original) == image_hashes(_png(original))
+    assert dhash(original) == image_hashes(original)[0]
+
+
+def test_index_finds_reencoded_copy(tmp_path):
+    index = ImageHashIndex(tmp_path / "hashes.db", detail_threshold=24)
+    original = _scene(3)
+    row_id = index.add(*image_hashes(_png(original)), payload='{"label": "reliable"}', text="caption")
+
+    matches = index.find(*image_hashes(_reencoded(original)))
+    assert [match.row_id for match in matches] == [row_id]
+    assert matches[0].payload == '{"label": "reliable"}'
+    assert matches[0].text == "caption"
+    assert index.find(*image_hashes(_png(_scene(9)))) == []
+    index.close()
+
+
+def test_index_ignores_other_versions_and_expired_entries(tmp_path):
+    hashes = image_hashes(_png(_scene(4)))
+    old = ImageHashIndex(tmp_path / "hashes.db", version="old")
+    old.add(*hashes, payload="{}")
+    current = ImageHashIndex(tmp_path / "hashes.db", version="new", ttl=0)
+    current.add(*hashes, payload="{}")
+
+    assert current.find(*hashes) == []
+    assert len(old.find(*hashes)) == 1
+    old.close()
+    current.close()
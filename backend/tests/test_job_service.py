@@ -0,0 +1,203 @@
+"""
+Job service tests
+Owner tokens, heartbeats and upload cleanup of background jobs
+"""
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from app.config import settings
+from app.database import Database
+from app.services.job_service import JobService
+
+
+class _Result:
+    def model_dump(self):
+        return {"label": "reliable"}
+
+
+class _Analyzer:
+    """Analyzer whose file analyses finish when ``release`` is set"""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.started = asyncio.Event()
+
+    async def analyze_file(self, path, file_type):
+        self.started.set()
+        await self.release.wait()
+        return _Result()
+
+
+class _Files:
+    def __init__(self, folder=None):
+        self.folder = folder
+        self.deleted = []
+
+    def list_files(self):
+        return sorted(self.folder.iterdir()) if self.folder else []
+
+    def delete_file(self, file_id):
+        self.deleted.append(file_id)
+        if self.folder:
+            for path in self.folder.glob(f"{file_id}.*"):
+                path.unlink()
+        return True
+
+
+def _service(tmp_path, monkeypatch, **overrides):
+    for name, value in {"JOB_WORKERS": 1, "JOB_CLEANUP_INTERVAL": 3600, **overrides}.items():
+        monkeypatch.setattr(settings, name, value)
+    upload = tmp_path / "job-1.txt"
+    upload.write_text("claim")
+    service = JobService(_Analyzer(), Database(str(tmp_path / "jobs.db")), _Files())
+    return service, str(upload)
+
+
+def test_finished_job_stores_result_and_deletes_upload(tmp_path, monkeypatch):
+    service, upload = _service(tmp_path, monkeypatch)
+
+    async def scenario():
+        await service.start()
+        await service.submit("job-1", "claim.txt", upload, "txt")
+        waiting = asyncio.create_task(service.wait("job-1", timeout=5))
+        await service.analyzer.started.wait()
+        service.analyzer.release.set()
+        job = await waiting
+        await service.stop()
+        return job
+
+    job = asyncio.run(scenario())
+    assert job["status"] == "done"
+    assert job["result"] == {"label": "reliable"}
+    assert job["owner"] is None
+    assert service.file_handler.deleted == ["job-1"]
+
+
+def test_cleanup_of_a_live_job_keeps_its_upload_until_the_worker_exits(tmp_path, monkeypatch):
+    service, upload = _service(tmp_path, monkeypatch, JOB_HEARTBEAT_INTERVAL=3600)
+
+    async def scenario():
+        await service.start()
+        await service.submit("job-1", "claim.txt", upload, "txt")
+        await service.analyzer.started.wait()
+        waiting = asyncio.create_task(service.wait("job-1", timeout=5))
+        await asyncio.sleep(0.01)
+
+        # The worker is still running but has not sent a heartbeat in time
+        monkeypatch.setattr(settings, "JOB_STALE_AFTER", 0)
+        assert await service.cleanup() == 1
+        failed = await waiting  # waiters are woken by cleanup
+        deleted_during_run = list(service.file_handler.deleted)
+
+        service.analyzer.release.set()
+        while service.get_stats()["running"]:
+            await asyncio.sleep(0.01)
+        await service.stop()
+        return failed, deleted_during_run, service.db.get_job("job-1")
+
+    failed, deleted_during_run, final = asyncio.run(scenario())
+    assert failed["status"] == "failed"
+    assert deleted_during_run == []
+    # The worker's late result does not overwrite the failure
+    assert final["status"] == "failed"
+    assert final["result"] is None
+    assert service.completed == 0
+    assert service.file_handler.deleted == ["job-1"]
+
+
+def test_heartbeat_keeps_a_running_job_from_going_stale(tmp_path, monkeypatch):
+    service, upload = _service(tmp_path, monkeypatch, JOB_STALE_AFTER=0.3, JOB_HEARTBEAT_INTERVAL=0.05)
+
+    async def scenario():
+        await service.start()
+        await service.submit("job-1", "claim.txt", upload, "txt")
+        await service.analyzer.started.wait()
+        await asyncio.sleep(0.6)
+        removed = await service.cleanup()
+        service.analyzer.release.set()
+        job = await service.wait("job-1", timeout=5)
+        await service.stop()
+        return removed, job
+
+    removed, job = asyncio.run(scenario())
+    assert removed == 0
+    assert job["status"] == "done"
+
+
+def test_a_job_is_claimed_once(tmp_path, monkeypatch):
+    service, upload = _service(tmp_path, monkeypatch)
+    service.db.create_job("job-1", "claim.txt", upload, "txt")
+    assert service.db.claim_job("job-1", "first")
+    assert not service.db.claim_job("job-1", "second")
+    assert not service.db.touch_job("job-1", "second")
+    assert not service.db.update_job("job-1", "done", owner="second")
+    assert service.db.update_job("job-1", "done", owner="first")
+
+
+def test_job_table_calls_run_off_the_event_loop(tmp_path, monkeypatch):
+    service, upload = _service(tmp_path, monkeypatch)
+    loop_threads = []
+    db_threads = []
+    for name in ("create_job", "get_job", "claim_job", "update_job", "touch_job", "get_jobs"):
+        original = getattr(service.db, name)
+
+        def wrapped(*args, _original=original, **kwargs):
+            db_threads.append(threading.current_thread())
+            return _original(*args, **kwargs)
+
+        monkeypatch.setattr(service.db, name, wrapped)
+
+    async def scenario():
+        loop_threads.append(threading.current_thread())
+        await service.start()
+        await service.submit("job-1", "claim.txt", upload, "txt")
+        await service.analyzer.started.wait()
+        service.analyzer.release.set()
+        job = await service.wait("job-1", timeout=5)
+        await service.cleanup()
+        await service.stop()
+        return job
+
+    assert asyncio.run(scenario())["status"] == "done"
+    assert db_threads
+    assert loop_threads[0] not in db_threads
+
+
+def test_full_queue_answers_with_the_job_retry_after(tmp_path, monkeypatch):
+    from app.utils.concurrency import OverloadedError
+
+    service, upload = _service(tmp_path, monkeypatch, JOB_MAX_QUEUE=0, JOB_RETRY_AFTER=42)
+
+    async def scenario():
+        await service.start()
+        try:
+            with pytest.raises(OverloadedError) as excinfo:
+                await service.submit("job-1", "claim.txt", upload, "txt")
+            return excinfo.value
+        finally:
+            await service.stop()
+
+    assert asyncio.run(scenario()).retry_after == 42
+    assert service.db.get_job("job-1") is None
+
+
+def test_cleanup_deletes_old_uploads_that_have_no_job(tmp_path, monkeypatch):
+    folder = tmp_path / "uploads"
+    folder.mkdir()
+    monkeypatch.setattr(settings, "JOB_STALE_AFTER", 60)
+    service, _ = _service(tmp_path, monkeypatch)
+    service.file_handler = _Files(folder)
+    old = time.time() - 120
+    for name in ("orphan.pdf", "job-1.pdf", "fresh.pdf"):
+        (folder / name).write_bytes(b"%PDF")
+    for name in ("orphan.pdf", "job-1.pdf"):
+        os.utime(folder / name, (old, old))
+    service.db.create_job("job-1", "claim.pdf", str(folder / "job-1.pdf"), "pdf")
+
+    assert asyncio.run(service.cleanup()) == 1
+    # The job's upload stays, and so does one too new to be sure it has no job yet
+    assert sorted(path.name for path in folder.iterdir()) == ["fresh.pdf", "job-1.pdf"]
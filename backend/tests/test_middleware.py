@@ -0,0 +1,64 @@
+"""
+Middleware tests
+Request body size limit
+"""
+import asyncio
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+
+from app.middleware import BodySizeLimitMiddleware
+
+
+def _app(limit: int) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(BodySizeLimitMiddleware, max_body_size=limit)
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        return {"size": len(await request.body())}
+
+    @app.post("/guarded")
+    async def guarded(request: Request):
+        # Routes that turn every error into a 500 must still end in 413
+        try:
+            await request.body()
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        return {}
+
+    return app
+
+
+def _post(app, path, content, headers=None):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(path, content=content, headers=headers)
+    return asyncio.run(scenario())
+
+
+def _chunks(total: int, size: int = 10):
+    async def body():
+        for _ in range(total // size):
+            yield b"x" * size
+    return body()
+
+
+def test_body_within_limit_passes():
+    response = _post(_app(100), "/echo", b"x" * 100)
+    assert response.status_code == 200
+    assert response.json() == {"size": 100}
+
+
+def test_declared_length_over_limit_is_refused():
+    response = _post(_app(100), "/echo", b"x" * 101)
+    assert response.status_code == 413
+
+
+def test_streamed_body_over_limit_is_cut_off():
+    # No Content-Length: the body is counted as it arrives
+    app = _app(100)
+    assert _post(app, "/echo", _chunks(50)).json() == {"size": 50}
+    assert _post(app, "/echo", _chunks(500)).status_code == 413
+    assert _post(app, "/guarded", _chunks(500)).status_code == 413
@@ -0,0 +1,57 @@
+"""
+Prompt budget tests
+Sentence selection, source trimming and its fit with the PDF analysis budget
+"""
+from app.config import settings
+from app.utils.prompt_budget import (
+    EXCERPT_HEADER, GAP_MARKER, PromptBudget, search_query, split_sentences
+)
+
+FILLER = "The committee met again on a quiet afternoon to go over the agenda. "
+CLAIM = "According to the ministry, 42 percent of Dutch farms closed in 2023. "
+
+
+def test_short_content_is_sent_whole():
+    budget = PromptBudget(max_tokens=1000)
+    fitted = budget.fit("A short claim about 3 things.", "Source: one line")
+    assert fitted.content == "A short claim about 3 things."
+    assert fitted.search_context == "Source: one line"
+    assert not fitted.reduced
+
+
+def test_long_content_keeps_salient_sentences_in_order():
+    content = FILLER * 40 + CLAIM + FILLER * 40
+    budget = PromptBudget(max_tokens=200, sources_share=0.25)
+    fitted = budget.fit(content)
+
+    assert fitted.reduced
+    assert fitted.content.startswith(EXCERPT_HEADER)
+    assert CLAIM.strip() in fitted.content
+    assert GAP_MARKER in fitted.content
+    assert fitted.content_tokens <= 200
+    assert budget.get_stats()["tokens_dropped"] > 0
+
+
+def test_sources_are_cut_to_whole_lines_within_their_share():
+    sources = "\n".join(f"Source {index}: " + "detail " * 20 for index in range(20))
+    fitted = PromptBudget(max_tokens=400, sources_share=0.25).fit("Claim.", sources)
+    assert fitted.source_tokens <= 100
+    assert all(line.startswith("Source ") for line in fitted.search_context.split("\n"))
+
+
+def test_search_query_uses_the_most_salient_sentence():
+    content = FILLER * 10 + CLAIM + FILLER * 10
+    assert search_query(content) == CLAIM.strip()
+
+
+def test_pdf_analysis_budget_leaves_room_for_sentence_selection():
+    # A PDF read up to MAX_ANALYSIS_CHARS must overflow the prompt, otherwise
+    # sentence selection never runs and long PDFs are cut to a prefix
+    budget = PromptBudget(max_tokens=settings.PROMPT_MAX_TOKENS, sources_share=settings.PROMPT_SOURCES_SHARE)
+    text = (FILLER * (settings.MAX_ANALYSIS_CHARS // len(FILLER) + 1))[:settings.MAX_ANALYSIS_CHARS]
+    assert budget.fit(text).reduced
+
+
+def test_split_sentences_breaks_on_punctuation_and_lines():
+    assert split_sentences("One. Two!\nThree") == ["One.", "Two!", "Three"]
+    assert split_sentences("It fell to 4.1 percent. Then 3.") == ["It fell to 4.1 percent.", "Then 3."]
@@ -0,0 +1,145 @@
+"""
+Search service tests
+Pooled session against a local stub of the search API, concurrent claim
+queries under a deadline, and the search result cache
+"""
+import asyncio
+import time
+
+from aiohttp import web
+
+from tests.bench_search_pool import RESPONSE, _start_stub
+
+from app.config import settings
+from app.services.search_service import SearchService
+
+
+def test_pooled_session_reuses_connections():
+    async def scenario():
+        runner = await _start_stub(0)
+        service = SearchService()
+        service.api_key = "test"
+        service.base_url = f"http://127.0.0.1:{runner.addresses[0][1]}/search"
+        try:
+            outcomes = [await service._fetch(f"query {index}", 5) for index in range(3)]
+            return outcomes, service.get_pool_stats()
+        finally:
+            await service.close()
+            await runner.cleanup()
+
+    outcomes, stats = asyncio.run(scenario())
+    assert all(ok and len(results) == len(RESPONSE["organic"]) for results, ok in outcomes)
+    assert stats["requests"] == 3
+    assert stats["in_flight"] == 0
+    assert stats["connections_created"] == 1
+    assert stats["connections_reused"] == 2
+
+
+def _service_with_stub_search(delays):
+    """SearchService whose search() answers each query after its own delay"""
+    service = SearchService()
+    started = []
+    cancelled = []
+
+    async def search(query, num_results=5):
+        started.append(query)
+        try:
+            await asyncio.sleep(delays[len(started) - 1])
+        except asyncio.CancelledError:
+            cancelled.append(query)
+            raise
+        source = "snopes.com" if "fact check" in query else "example.org"
+        return [{"title": query, "link": f"https://{source}/", "snippet": query, "source": source}]
+
+    service.search = search
+    return service, started, cancelled
+
+
+def test_claim_queries_run_concurrently():
+    service, started, _ = _service_with_stub_search([0.1, 0.1, 0.1])
+
+    began = time.monotonic()
+    result = asyncio.run(service.verify_claim("The tower is 300 metres tall", query_count=3, deadline=5))
+    elapsed = time.monotonic() - began
+
+    assert len(started) == 3
+    assert elapsed < 0.25
+    assert result["queries_completed"] == 3
+    assert result["queries_timed_out"] == 0
+    assert result["fact_check_sources"][0]["title"] == '"The tower is 300 metres tall" fact check'
+    assert [source["title"] for source in result["other_sources"]] == [
+        "The tower is 300 metres tall true or false", "The tower is 300 metres tall"
+    ]
+
+
+def test_claim_deadline_keeps_finished_queries_and_cancels_the_rest():
+    service, _, cancelled = _service_with_stub_search([0.01, 5, 5])
+
+    began = time.monotonic()
+    result = asyncio.run(service.verify_claim("The tower is 300 metres tall", query_count=3, deadline=0.1))
+    elapsed = time.monotonic() - began
+
+    assert elapsed < 1
+    assert result["queries_completed"] == 1
+    assert result["queries_timed_out"] == 2
+    assert len(result["fact_check_sources"]) == 1
+    assert result["other_sources"] == []
+    assert len(cancelled) == 2
+
+
+def _cached_search(monkeypatch, statuses, queries, pause=0.0):
+    """Run searches against a stub that answers with the given statuses in turn; return (results, hits, stats)"""
+    monkeypatch.setattr(settings, "SEARCH_CACHE_BACKEND", "memory")
+    hits = []
+
+    async def handler(request):
+        hits.append((await request.json())["q"])
+        status = statuses[min(len(hits), len(statuses)) - 1]
+        if status != 200:
+            return web.Response(status=status)
+        return web.json_response(RESPONSE)
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_post("/search", handler)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        service = SearchService()
+        service.api_key = "test"
+        service.base_url = f"http://127.0.0.1:{runner.addresses[0][1]}/search"
+        try:
+            results = []
+            for query in queries:
+                results.append(await service.search(query))
+                await asyncio.sleep(pause)
+            return results, await service.get_cache_stats()
+        finally:
+            await service.close()
+            await runner.cleanup()
+
+    results, stats = asyncio.run(scenario())
+    return results, hits, stats
+
+
+def test_repeated_query_is_served_from_cache(monkeypatch):
+    results, hits, stats = _cached_search(monkeypatch, [200], ["tower height", "tower height", "bridge age"])
+
+    assert hits == ["tower height", "bridge age"]
+    assert results[0] == results[1] and len(results[0]) == len(RESPONSE["organic"])
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+def test_failed_query_is_cached_only_for_the_negative_ttl(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_CACHE_NEGATIVE_TTL", 0.2)
+    results, hits, stats = _cached_search(monkeypatch, [500, 200], ["tower height"] * 2, pause=0.05)
+    # The second lookup falls inside the negative TTL: the failing API is not asked again
+    assert hits == ["tower height"]
+    assert results == [[], []]
+    assert stats["negative_entries_stored"] == 1
+
+    results, hits, _ = _cached_search(monkeypatch, [500, 200], ["tower height"] * 2, pause=0.3)
+    assert hits == ["tower height"] * 2
+    assert results[1]
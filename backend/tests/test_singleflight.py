@@ -0,0 +1,221 @@
+"""
+SingleFlight tests
+Coalescing, error propagation and cancellation of shared work, alone and
+behind AnalyzerService.analyze_text
+"""
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services.analyzer_service import AnalyzerService
+from app.utils.concurrency import OverloadedError
+from app.utils.singleflight import SingleFlight
+
+ANSWER = "## Reliability Assessment\nReliable: the figure matches official statistics.\n"
+SOURCES = {"fact_check_sources": [{"source": "example.org", "snippet": "Official figures agree."}]}
+
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return object()
+
+        results = await asyncio.gather(*[flight.do("key", work) for _ in range(5)])
+        return flight, calls, results
+
+    flight, calls, results = asyncio.run(scenario())
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert flight.get_stats() == {"in_flight": 0, "executions": 1, "coalesced": 4}
+
+
+def test_different_keys_run_separately():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def work(value):
+            await asyncio.sleep(0)
+            return value
+
+        return await asyncio.gather(flight.do("a", lambda: work(1)), flight.do("b", lambda: work(2)))
+
+    assert asyncio.run(scenario()) == [1, 2]
+
+
+def test_key_is_released_after_completion():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        first = await flight.do("key", work)
+        second = await flight.do("key", work)
+        return first, second, flight.get_stats()["in_flight"]
+
+    assert asyncio.run(scenario()) == (1, 2, 0)
+
+
+def test_error_reaches_every_waiter_and_next_call_retries():
+    async def scenario():
+        flight = SingleFlight()
+        attempts = 0
+
+        async def failing():
+            nonlocal attempts
+            attempts += 1
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream failed")
+
+        outcomes = await asyncio.gather(*[flight.do("key", failing) for _ in range(3)], return_exceptions=True)
+
+        async def working():
+            return "ok"
+
+        retry = await flight.do("key", working)
+        return attempts, outcomes, retry
+
+    attempts, outcomes, retry = asyncio.run(scenario())
+    assert attempts == 1
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+    assert retry == "ok"
+
+
+def test_cancelled_waiter_does_not_cancel_shared_work():
+    async def scenario():
+        flight = SingleFlight()
+        finished = asyncio.Event()
+
+        async def work():
+            await asyncio.sleep(0.02)
+            finished.set()
+            return "done"
+
+        leaver = asyncio.create_task(flight.do("key", work))
+        stayer = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        leaver.cancel()
+        result = await stayer
+        with pytest.raises(asyncio.CancelledError):
+            await leaver
+        return result, finished.is_set()
+
+    assert asyncio.run(scenario()) == ("done", True)
+
+
+def test_last_waiter_cancelling_cancels_the_work():
+    async def scenario():
+        flight = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def work():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiters = [asyncio.create_task(flight.do("key", work)) for _ in range(2)]
+        await started.wait()
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+        return cancelled.is_set(), flight.get_stats()["in_flight"]
+
+    assert asyncio.run(scenario()) == (True, 0)
+
+
+def _stubbed_analyzer(monkeypatch, gemini_error=None, gemini_delay=0.05):
+    """AnalyzerService whose search and Gemini calls are counted stubs"""
+    monkeypatch.setattr(settings, "ANALYSIS_PIPELINE_MODE", "sequential")
+    analyzer = AnalyzerService()
+    monkeypatch.setattr(analyzer, "use_web_search", True)
+    calls = {"search": 0, "gemini": 0}
+
+    async def verify_claim(query):
+        calls["search"] += 1
+        await asyncio.sleep(0.01)
+        return SOURCES
+
+    async def analyze_text_with_sources(content, search_context=""):
+        calls["gemini"] += 1
+        await asyncio.sleep(gemini_delay)
+        if gemini_error is not None:
+            raise gemini_error
+        return ANSWER
+
+    monkeypatch.setattr(analyzer.search_service, "verify_claim", verify_claim)
+    monkeypatch.setattr(analyzer.gemini_service, "analyze_text_with_sources", analyze_text_with_sources)
+    return analyzer, calls
+
+
+def _variants(claim, count):
+    """Whitespace and case variants of one claim"""
+    forms = [claim, claim.upper(), f"  {claim}\n", claim.replace(" ", "   "), claim.lower()]
+    return [forms[index % len(forms)] for index in range(count)]
+
+
+def test_concurrent_identical_analyses_make_one_upstream_call(monkeypatch):
+    analyzer, calls = _stubbed_analyzer(monkeypatch)
+    claims = _variants("Load test: unemployment fell to 3.9 percent in May", 50)
+
+    async def scenario():
+        return await asyncio.gather(*[analyzer.analyze_text(claim) for claim in claims])
+
+    results = asyncio.run(scenario())
+    assert calls == {"search": 1, "gemini": 1}
+    assert analyzer._inflight.get_stats()["executions"] == 1
+    first = results[0].model_dump(exclude={"content_preview"})
+    assert all(result.model_dump(exclude={"content_preview"}) == first for result in results)
+    # Each caller keeps the preview of its own submission
+    assert [result.content_preview for result in results] == [analyzer.preview(claim) for claim in claims]
+    # Results are copies, not one shared object
+    results[0].reasons.append("mutated")
+    assert "mutated" not in results[1].reasons
+
+
+def test_upstream_error_reaches_every_concurrent_caller(monkeypatch):
+    analyzer, calls = _stubbed_analyzer(monkeypatch, gemini_error=OverloadedError("Gemini is overloaded", 7))
+    claims = _variants("Load test: the bridge closed for repairs in 2021", 20)
+
+    async def scenario():
+        return await asyncio.gather(*[analyzer.analyze_text(claim) for claim in claims], return_exceptions=True)
+
+    outcomes = asyncio.run(scenario())
+    assert calls["gemini"] == 1
+    assert all(isinstance(outcome, OverloadedError) and outcome.retry_after == 7 for outcome in outcomes)
+    # Nothing was cached, so the next request tries again
+    assert not analyzer.verdict_cache.get(analyzer.text_cache_key(claims[0]))[0]
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_analysis(monkeypatch):
+    analyzer, calls = _stubbed_analyzer(monkeypatch, gemini_delay=0.1)
+    claim = "Load test: the museum reopened after a two-year renovation"
+
+    async def scenario():
+        leaver = asyncio.create_task(analyzer.analyze_text(claim))
+        stayers = [asyncio.create_task(analyzer.analyze_text(variant)) for variant in _variants(claim, 5)]
+        while calls["gemini"] == 0:
+            await asyncio.sleep(0.005)
+        leaver.cancel()
+        results = await asyncio.gather(*stayers)
+        with pytest.raises(asyncio.CancelledError):
+            await leaver
+        return results
+
+    results = asyncio.run(scenario())
+    assert calls == {"search": 1, "gemini": 1}
+    assert all(result.label == "reliable" for result in results)
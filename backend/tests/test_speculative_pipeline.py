@@ -0,0 +1,126 @@
+"""
+Speculative pipeline tests
+Which analysis is kept, and which calls are cancelled, when search and
+Gemini run side by side
+"""
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services.analyzer_service import AnalyzerService
+
+CONTENT = "The city council approved the new budget on Monday."
+SOURCES = "\n## Related Web Sources:\n- **example.org**: The budget passed 7-2."
+
+
+def _analyzer(monkeypatch, search_delay=0.0, sources=SOURCES, policy="refine", speculative_error=None):
+    """Speculative-mode analyzer with stubbed search and Gemini; returns (analyzer, calls, cancelled)"""
+    monkeypatch.setattr(settings, "ANALYSIS_PIPELINE_MODE", "speculative")
+    monkeypatch.setattr(settings, "SPECULATIVE_SEARCH_DEADLINE", 0.1)
+    monkeypatch.setattr(settings, "SPECULATIVE_POLICY", policy)
+    analyzer = AnalyzerService()
+    monkeypatch.setattr(analyzer, "use_web_search", True)
+    calls = []
+    cancelled = []
+
+    async def search_sources(content):
+        try:
+            await asyncio.sleep(search_delay)
+        except asyncio.CancelledError:
+            cancelled.append("search")
+            raise
+        return sources
+
+    async def analyze_text_with_sources(content, search_context=""):
+        calls.append(search_context)
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            cancelled.append("speculative" if not search_context else "refined")
+            raise
+        if not search_context and speculative_error is not None:
+            raise speculative_error
+        return "with sources" if search_context else "without sources"
+
+    monkeypatch.setattr(analyzer, "search_sources", search_sources)
+    monkeypatch.setattr(analyzer.gemini_service, "analyze_text_with_sources", analyze_text_with_sources)
+    return analyzer, calls, cancelled
+
+
+def test_search_past_deadline_keeps_speculative_analysis(monkeypatch):
+    analyzer, calls, cancelled = _analyzer(monkeypatch, search_delay=5)
+
+    analysis, context, path = asyncio.run(analyzer._search_and_analyze(CONTENT))
+
+    assert (analysis, context, path) == ("without sources", "", "speculative_no_sources")
+    assert calls == [""]
+    assert cancelled == ["search"]
+
+
+def test_empty_search_keeps_speculative_analysis(monkeypatch):
+    analyzer, calls, cancelled = _analyzer(monkeypatch, sources="")
+
+    assert asyncio.run(analyzer._search_and_analyze(CONTENT)) == ("without sources", "", "speculative_no_sources")
+    assert calls == [""]
+    assert cancelled == []
+
+
+def test_sources_in_time_refine_and_cancel_the_speculative_call(monkeypatch):
+    analyzer, calls, cancelled = _analyzer(monkeypatch, search_delay=0.01)
+
+    analysis, context, path = asyncio.run(analyzer._search_and_analyze(CONTENT))
+
+    assert (analysis, context, path) == ("with sources", SOURCES, "speculative_refined")
+    assert calls == ["", SOURCES]
+    assert cancelled == ["speculative"]
+
+
+def test_append_policy_keeps_speculative_analysis_with_sources(monkeypatch):
+    analyzer, calls, cancelled = _analyzer(monkeypatch, search_delay=0.01, policy="append")
+
+    analysis, context, path = asyncio.run(analyzer._search_and_analyze(CONTENT))
+
+    assert (analysis, context, path) == ("without sources", SOURCES, "speculative_appended")
+    assert calls == [""]
+    # The appended sources reach the result details
+    result = analyzer._parse_analysis(CONTENT, analysis, context)
+    assert SOURCES in result.analysis_details
+
+
+def test_failed_speculative_call_falls_back_to_refined_analysis(monkeypatch):
+    analyzer, calls, _ = _analyzer(monkeypatch, search_delay=0.06, speculative_error=RuntimeError("overloaded"))
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        unretrieved = []
+        loop.set_exception_handler(lambda loop, context: unretrieved.append(context))
+        outcome = await analyzer._search_and_analyze(CONTENT)
+        await asyncio.sleep(0)
+        return outcome, unretrieved
+
+    outcome, unretrieved = asyncio.run(scenario())
+    assert outcome == ("with sources", SOURCES, "speculative_refined")
+    assert unretrieved == []
+
+
+def test_failed_speculative_call_without_sources_raises(monkeypatch):
+    analyzer, _, _ = _analyzer(monkeypatch, search_delay=5, speculative_error=RuntimeError("overloaded"))
+
+    with pytest.raises(RuntimeError, match="overloaded"):
+        asyncio.run(analyzer._search_and_analyze(CONTENT))
+
+
+def test_cancelling_the_request_cancels_search_and_gemini(monkeypatch):
+    analyzer, _, cancelled = _analyzer(monkeypatch, search_delay=5)
+
+    async def scenario():
+        task = asyncio.create_task(analyzer._search_and_analyze(CONTENT))
+        await asyncio.sleep(0.02)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert sorted(cancelled) == ["search", "speculative"]
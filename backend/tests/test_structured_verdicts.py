@@ -0,0 +1,125 @@
+"""
+Structured verdict tests
+JSON verdicts in json output mode, and the markdown parse they fall back to
+"""
+import asyncio
+import dataclasses
+import json
+from types import SimpleNamespace
+from typing import Any, Optional
+
+from app.config import settings
+from app.models import StructuredVerdict
+from app.services import gemini_service as gemini_module
+from app.services.analyzer_service import AnalyzerService
+from app.services.gemini_service import VERDICT_SCHEMA
+
+CONTENT = "Structured test: the river flooded the town centre in 2011"
+SOURCES = "- **example.org**: Flood records for 2011."
+VERDICT = {
+    "assessment": "Potentially False",
+    "confidence": 85,
+    "reasons": ["Flood records show no flooding in 2011", ""],
+    "tips": ["Check the council's flood archive"],
+    "claims": ["The river flooded the town centre in 2011"],
+    "summary": "Records do not support the claim.",
+}
+MARKDOWN = """## Reliability Assessment
+Doubtful: the claim is not supported by the records.
+
+## Key Findings
+- No flood warning was issued for the town in 2011
+"""
+
+
+@dataclasses.dataclass
+class SchemaGenerationConfig:
+    """GenerationConfig of an SDK version that supports response schemas"""
+    response_mime_type: Optional[str] = None
+    response_schema: Optional[Any] = None
+
+
+def _json_analyzer(monkeypatch, answer, schema_support=True):
+    """Analyzer in json output mode whose Gemini model returns ``answer``; returns (analyzer, configs sent)"""
+    monkeypatch.setattr(settings, "ANALYSIS_OUTPUT_FORMAT", "json")
+    if schema_support:
+        monkeypatch.setattr(gemini_module.genai.types, "GenerationConfig", SchemaGenerationConfig)
+    analyzer = AnalyzerService()
+    configs = []
+
+    def generate_content(prompt, generation_config=None):
+        configs.append(generation_config)
+        return SimpleNamespace(text=answer, usage_metadata=None)
+
+    monkeypatch.setattr(analyzer, "use_web_search", False)
+    monkeypatch.setattr(analyzer.gemini_service, "backend", "thread")
+    monkeypatch.setattr(analyzer.gemini_service, "model", SimpleNamespace(generate_content=generate_content))
+    return analyzer, configs
+
+
+def test_verdict_model_normalizes_label_and_percentages():
+    verdict = StructuredVerdict.model_validate(VERDICT)
+    assert verdict.assessment.value == "potentially_false"
+    assert verdict.confidence == 0.85
+    assert StructuredVerdict.model_validate({**VERDICT, "confidence": 0.4}).confidence == 0.4
+
+
+def test_json_verdict_becomes_the_result():
+    analyzer = AnalyzerService()
+    result = analyzer._parse_analysis(CONTENT, f"```json\n{json.dumps(VERDICT)}\n```", SOURCES)
+
+    assert result.label == "potentially_false"
+    assert result.confidence == 0.85
+    assert result.reasons == ["Flood records show no flooding in 2011"]
+    assert result.tips == ["Check the council's flood archive"]
+    assert result.analysis_details.startswith("Records do not support the claim.")
+    assert SOURCES in result.analysis_details
+    assert result.metadata == {"claims": VERDICT["claims"]}
+
+
+def test_invalid_or_missing_json_falls_back_to_markdown():
+    analyzer = AnalyzerService()
+    markdown = analyzer._parse_analysis(CONTENT, MARKDOWN)
+    assert markdown.label == "doubtful"
+    assert markdown.reasons == ["No flood warning was issued for the town in 2011"]
+
+    # Valid JSON that breaks the schema is parsed as text, like any other reply
+    for invalid in ({**VERDICT, "assessment": "maybe"}, {**VERDICT, "confidence": 250}, {"summary": "No verdict"}):
+        result = analyzer._parse_analysis(CONTENT, json.dumps(invalid))
+        assert result.metadata is None
+        assert result.analysis_details == json.dumps(invalid)
+
+
+def test_json_mode_requests_the_schema_and_decodes_the_reply(monkeypatch):
+    analyzer, configs = _json_analyzer(monkeypatch, json.dumps(VERDICT))
+
+    result = asyncio.run(analyzer.analyze_text(CONTENT))
+
+    assert result.label == "potentially_false"
+    assert result.metadata["claims"] == VERDICT["claims"]
+    assert configs == [{"response_mime_type": "application/json", "response_schema": VERDICT_SCHEMA}]
+
+
+def test_json_mode_without_schema_support_asks_by_prompt(monkeypatch):
+    monkeypatch.setattr(gemini_module.genai.types, "GenerationConfig", type("GenerationConfig", (), {}))
+    analyzer, configs = _json_analyzer(monkeypatch, json.dumps(VERDICT), schema_support=False)
+
+    result = asyncio.run(analyzer.analyze_text(CONTENT + " (no schema)"))
+
+    assert result.label == "potentially_false"
+    assert configs == [None]
+
+
+def test_json_mode_accepts_a_markdown_reply(monkeypatch):
+    analyzer, _ = _json_analyzer(monkeypatch, MARKDOWN)
+
+    result = asyncio.run(analyzer.analyze_text(CONTENT + " (markdown reply)"))
+
+    assert result.label == "doubtful"
+    assert result.reasons == ["No flood warning was issued for the town in 2011"]
+
+
+def test_output_format_is_part_of_the_cache_key(monkeypatch):
+    markdown_key = AnalyzerService().text_cache_key(CONTENT)
+    monkeypatch.setattr(settings, "ANALYSIS_OUTPUT_FORMAT", "json")
+    assert AnalyzerService().text_cache_key(CONTENT) != markdown_key
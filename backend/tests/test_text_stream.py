@@ -0,0 +1,112 @@
+"""
+Streaming text analysis tests
+NDJSON event order, cache hits, overload and failures part-way through a stream
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+
+from app.config import settings
+from app.main import app
+from app.routes.analyze import analyzer_service
+
+CHUNKS = ["## Reliability Assessment\n", "Reliable: the figure matches ", "official statistics.\n"]
+SOURCES = {"fact_check_sources": [{"source": "example.org", "snippet": "Official figures agree."}]}
+
+
+def _stream_model(monkeypatch, fail_after=None):
+    """Stub Gemini model streaming CHUNKS, raising after ``fail_after`` chunks if given"""
+    calls = []
+
+    def generate_content(prompt, stream=False, generation_config=None):
+        calls.append(prompt)
+        for index, text in enumerate(CHUNKS):
+            if index == fail_after:
+                raise RuntimeError("connection reset")
+            yield SimpleNamespace(text=text)
+
+    monkeypatch.setattr(analyzer_service.gemini_service, "backend", "thread")
+    monkeypatch.setattr(analyzer_service.gemini_service, "model", SimpleNamespace(generate_content=generate_content))
+    return calls
+
+
+def _with_search(monkeypatch):
+    async def verify_claim(query):
+        return SOURCES
+
+    monkeypatch.setattr(analyzer_service, "use_web_search", True)
+    monkeypatch.setattr(analyzer_service.search_service, "verify_claim", verify_claim)
+
+
+async def _events(content):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/api/analyze/text/stream", json={"content": content})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_events_arrive_in_order_and_then_from_cache(monkeypatch):
+    _with_search(monkeypatch)
+    calls = _stream_model(monkeypatch)
+    content = "Stream test: unemployment fell to 3.9 percent in May"
+
+    events = asyncio.run(_events(content))
+    assert [event["event"] for event in events] == ["sources", "chunk", "chunk", "chunk", "result"]
+    assert events[0]["data"] == SOURCES
+    assert [event["text"] for event in events[1:4]] == CHUNKS
+    assert events[-1]["cached"] is False
+    assert events[-1]["data"]["label"] == "reliable"
+
+    # The same claim, formatted differently, is answered from the verdict cache alone
+    cached = asyncio.run(_events(f"  {content.upper()} "))
+    assert [event["event"] for event in cached] == ["result"]
+    assert cached[0]["cached"] is True
+    assert cached[0]["data"]["label"] == "reliable"
+    assert len(calls) == 1
+
+
+def test_overloaded_gemini_ends_stream_with_error(monkeypatch):
+    _stream_model(monkeypatch)
+    limiter = analyzer_service.gemini_service.limiter
+    monkeypatch.setattr(limiter, "max_queue", 0)
+
+    async def scenario():
+        for _ in range(limiter.max_concurrency):
+            await limiter.acquire()
+        try:
+            return await _events("Stream test: a claim sent while Gemini is saturated")
+        finally:
+            for _ in range(limiter.max_concurrency):
+                limiter.release()
+
+    events = asyncio.run(scenario())
+    assert [event["event"] for event in events] == ["error"]
+    assert events[0]["retry_after"] == settings.GEMINI_RETRY_AFTER
+
+
+def test_failure_part_way_is_an_error_and_not_cached(monkeypatch):
+    calls = _stream_model(monkeypatch, fail_after=2)
+    content = "Stream test: the bridge closed for repairs in 2021"
+
+    events = asyncio.run(_events(content))
+    assert [event["event"] for event in events] == ["chunk", "chunk", "error"]
+    assert events[-1]["detail"].startswith("Analysis could not be completed")
+    assert events[-1]["retry_after"] is None
+    assert not analyzer_service.verdict_cache.get(analyzer_service.text_cache_key(content))[0]
+
+    # Nothing was cached, so the next request streams a fresh analysis
+    _stream_model(monkeypatch)
+    retried = asyncio.run(_events(content))
+    assert retried[-1]["event"] == "result"
+    assert retried[-1]["cached"] is False
+    assert len(calls) == 1
+
+
+def test_failure_before_any_chunk_is_an_error(monkeypatch):
+    _stream_model(monkeypatch, fail_after=0)
+    events = asyncio.run(_events("Stream test: the museum reopened after renovation"))
+    assert [event["event"] for event in events] == ["error"]
@@ -0,0 +1,113 @@
+"""
+Upload handling tests
+Streaming multipart spooling, size limits and partial-file cleanup
+"""
+import asyncio
+import hashlib
+import io
+
+import httpx
+import pytest
+from fastapi import UploadFile
+from starlette.requests import Request
+
+from app.config import settings
+from app.utils import file_handler as file_handler_module
+from app.utils.file_handler import FileHandler, FileTooLargeError, UploadFormError
+
+BOUNDARY = "test-boundary"
+
+
+def _form(parts, chunk_size: int = 7) -> Request:
+    """A multipart request whose body arrives in small chunks"""
+    body = b""
+    for name, value, filename in parts:
+        disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename else "")
+        body += f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n\r\n".encode() + value + b"\r\n"
+    body += f"--{BOUNDARY}--\r\n".encode()
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+    async def receive():
+        chunk = chunks.pop(0) if chunks else b""
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/",
+        "headers": [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())],
+    }
+    return Request(scope, receive)
+
+
+def test_small_upload_stays_in_memory():
+    content = b"%PDF-1.4 small document"
+    request = _form([("type", b"image", None), ("file", content, "claim.pdf")])
+    upload = asyncio.run(FileHandler().receive_upload(request))
+    try:
+        assert upload.filename == "claim.pdf"
+        assert upload.fields == {"type": "image"}
+        assert upload.size == len(content)
+        assert upload.sha256 == hashlib.sha256(content).hexdigest()
+        assert upload.in_memory
+        assert upload.file.read() == content
+    finally:
+        upload.file.close()
+
+
+def test_large_upload_spills_to_a_temp_file(monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_SPOOL_MAX_MEMORY", 16)
+    content = bytes(range(256)) * 4
+    upload = asyncio.run(FileHandler().receive_upload(_form([("file", content, "scan.png")])))
+    try:
+        assert not upload.in_memory
+        assert upload.file.read() == content
+    finally:
+        upload.file.close()
+
+
+def test_oversized_upload_is_rejected_while_streaming(monkeypatch):
+    monkeypatch.setattr(file_handler_module, "MAX_FILE_SIZE", 100)
+    request = _form([("file", b"x" * 500, "big.txt")])
+    with pytest.raises(FileTooLargeError):
+        asyncio.run(FileHandler().receive_upload(request))
+
+
+def test_form_without_file_is_rejected():
+    with pytest.raises(UploadFormError):
+        asyncio.run(FileHandler().receive_upload(_form([("type", b"image", None)])))
+
+
+def test_failed_save_leaves_no_partial_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_handler_module, "UPLOAD_FOLDER", str(tmp_path))
+    monkeypatch.setattr(file_handler_module, "CHUNK_SIZE", 4)
+
+    class BrokenStream(io.BytesIO):
+        def read(self, size=-1):
+            if self.tell() >= 8:
+                raise ConnectionResetError("client went away")
+            return super().read(size)
+
+    upload = UploadFile(BrokenStream(b"0123456789abcdef"), filename="claim.txt")
+    with pytest.raises(ConnectionResetError):
+        asyncio.run(FileHandler().save_upload(upload, "job-1"))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_upload_endpoint_answers_413_and_400(monkeypatch):
+    from app.main import app
+
+    monkeypatch.setattr(file_handler_module, "MAX_FILE_SIZE", 100)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            too_large = await client.post("/api/analyze/upload", files={"file": ("a.txt", b"x" * 500)})
+            wrong_type = await client.post("/api/analyze/upload", files={"file": ("a.exe", b"MZ")})
+            no_file = await client.post("/api/analyze/upload", data={"type": "image"}, files={"other": ("a.txt", b"x")})
+        return too_large, wrong_type, no_file
+
+    too_large, wrong_type, no_file = asyncio.run(scenario())
+    assert too_large.status_code == 413
+    assert wrong_type.status_code == 400
+    assert no_file.status_code == 400
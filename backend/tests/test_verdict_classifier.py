@@ -0,0 +1,79 @@
+"""
+Verdict classifier tests
+Golden-corpus labels, compared against the phrase-precedence classifier it replaced
+"""
+import pytest
+
+from app.utils.verdict_classifier import (
+    DEFAULT_VERDICT,
+    MAX_CONFIDENCE,
+    MIN_CONFIDENCE,
+    reduce_verdicts,
+    verdict_classifier,
+)
+from tests.verdict_corpus import CORPUS, legacy_classify
+
+# Samples the old first-match sweep got wrong; every other label must be unchanged
+LEGACY_MISREADS = {
+    "reliable_bare_word_only",      # the verdict word alone was not a phrase
+    "reliable_no_misinformation",   # negated "misinformation" counted as a finding
+    "reliable_not_misleading",      # negated "misleading" counted as a finding
+    "reliable_not_unreliable",      # negated "unreliable" counted as a finding
+}
+
+
+@pytest.mark.parametrize("sample", CORPUS, ids=[sample.name for sample in CORPUS])
+def test_golden_label(sample):
+    label, confidence = verdict_classifier.classify(sample.analysis)
+    assert label == sample.expected
+    assert MIN_CONFIDENCE <= confidence <= MAX_CONFIDENCE
+
+
+@pytest.mark.parametrize("sample", CORPUS, ids=[sample.name for sample in CORPUS])
+def test_matches_legacy_except_known_misreads(sample):
+    legacy_label, _ = legacy_classify(sample.analysis)
+    new_label, _ = verdict_classifier.classify(sample.analysis)
+    if sample.name in LEGACY_MISREADS:
+        assert legacy_label != sample.expected
+    else:
+        assert new_label == legacy_label
+
+
+def test_bare_reliable_only_counts_in_assessment_section():
+    assert verdict_classifier.scores("- Check reliable news outlets\n") == {}
+    analysis = "## Reliability Assessment\nReliable.\n"
+    assert set(verdict_classifier.scores(analysis)) == {"reliable"}
+
+
+def test_bare_reliable_must_be_a_whole_word():
+    analysis = "## Reliability Assessment\nThe reliableness of this is unclear.\n"
+    assert "reliable" not in verdict_classifier.scores(analysis)
+
+
+def test_negated_phrases_are_ignored():
+    assert verdict_classifier.scores("The claim is not misleading.") == {}
+    assert "reliable" not in verdict_classifier.scores(
+        "## Reliability Assessment\nThe outlet is never reliable.\n"
+    )
+
+
+def test_no_signal_returns_default():
+    assert verdict_classifier.classify("The bakery opens at nine.") == DEFAULT_VERDICT
+
+
+def test_more_evidence_raises_confidence():
+    _, weak = verdict_classifier.classify("## Reliability Assessment\nMisleading.\n")
+    _, strong = verdict_classifier.classify(
+        "## Reliability Assessment\nMisleading and questionable, partially true at best.\n"
+    )
+    assert strong > weak
+
+
+def test_reduce_verdicts_lets_a_severe_minority_decide():
+    verdicts = [("reliable", 0.9)] * 2 + [("potentially_false", 0.8)]
+    assert reduce_verdicts(verdicts)[0] == "potentially_false"
+    assert reduce_verdicts([("reliable", 0.9)] * 9 + [("doubtful", 0.6)])[0] == "reliable"
+    # A confident false part decides however many parts outweigh it; a hesitant one does not
+    assert reduce_verdicts([("reliable", 0.9)] * 9 + [("potentially_false", 0.85)]) == ("potentially_false", 0.85)
+    assert reduce_verdicts([("reliable", 0.9)] * 9 + [("potentially_false", 0.6)])[0] == "reliable"
+    assert reduce_verdicts([]) == DEFAULT_VERDICT
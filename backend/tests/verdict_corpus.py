@@ -0,0 +1,209 @@
+"""
+Golden corpus for the verdict classifier
+Gemini-style analyses with the label a reader would give them, plus the
+phrase-precedence classifier the weighted one replaced, for comparison
+"""
+from typing import List, NamedTuple, Tuple
+
+
+class Sample(NamedTuple):
+    name: str
+    analysis: str
+    expected: str
+
+
+def legacy_classify(analysis: str) -> Tuple[str, float]:
+    """First-match phrase sweep used before the weighted classifier"""
+    text = analysis.lower()
+    if any(phrase in text for phrase in [
+        'speculative', 'speculation', 'cannot be verified', 'unverifiable',
+        'no credible evidence', 'lacks any factual basis', 'unfounded',
+        'no evidence', 'lacks evidence', 'not based on facts',
+        'potentially defamatory', 'defamatory', 'rumor', 'rumors',
+        'innuendo', 'malicious', 'cannot be verified because',
+        'dismissing it as', 'unfounded speculation'
+    ]):
+        return "needs_verification", 0.70
+    if any(phrase in text for phrase in [
+        'potentially false', 'is false', 'appears false', 'likely false',
+        'misinformation', 'disinformation', 'fake', 'hoax', 'fabricated',
+        'not true', 'untrue', 'debunked', 'false claim', 'conspiracy'
+    ]):
+        return "potentially_false", 0.85
+    if any(phrase in text for phrase in [
+        'unreliable', 'not reliable', 'cannot be trusted', 'untrustworthy',
+        'no credible sources', 'spread rumors'
+    ]):
+        return "potentially_false", 0.75
+    if any(phrase in text for phrase in [
+        'doubtful', 'questionable', 'suspicious', 'misleading',
+        'partially true', 'mixed', 'some truth', 'lacks credibility',
+        'political bias', 'personal animosity', 'damage reputation'
+    ]):
+        return "doubtful", 0.65
+    if any(phrase in text for phrase in [
+        'is reliable', 'appears reliable', 'highly reliable',
+        'is accurate', 'appears accurate', 'is credible',
+        'is true', 'this is true', 'factually correct',
+        'well-established fact', 'universally accepted', 'universally recognized',
+        'definitive answer', 'confirmed fact', 'verified fact',
+        'no factual errors', 'there are no factual errors',
+        'inherently verifiable', 'established scientific',
+        'fundamental aspect', 'basic fact', 'scientifically accurate',
+        'common knowledge', 'widely accepted'
+    ]):
+        return "reliable", 0.85
+    if any(phrase in text for phrase in [
+        'needs verification', 'requires verification', 'unverified claim',
+        'insufficient evidence', 'unclear', 'need more context'
+    ]):
+        return "needs_verification", 0.55
+    return "needs_verification", 0.50
+
+
+CORPUS: List[Sample] = [
+    Sample("plain_reliable", """## Reliability Assessment
+The content is reliable.
+
+## Key Findings
+- The boiling point of water at sea level is 100°C, a well-established fact.
+- The statement matches standard physics references.
+
+## Verification Tips
+- Check a physics textbook
+""", "reliable"),
+    Sample("reliable_bold_label", """## Reliability Assessment
+**Reliable**
+
+## Key Findings
+- The Eiffel Tower is in Paris; this is common knowledge.
+""", "reliable"),
+    Sample("reliable_bare_word_only", """## Reliability Assessment
+Reliable. Official census figures support the population number given.
+
+## Key Findings
+- Matches the 2020 census release.
+""", "reliable"),
+    Sample("reliable_no_misinformation", """## Reliability Assessment
+This claim is accurate. There is no misinformation here.
+
+## Key Findings
+- The date of the moon landing (July 20, 1969) is factually correct.
+""", "reliable"),
+    Sample("reliable_not_misleading", """## Reliability Assessment
+The headline is accurate and not misleading.
+
+## Key Findings
+- The quoted unemployment rate matches the official release.
+""", "reliable"),
+    Sample("reliable_tip_mentions_sources", """## Reliability Assessment
+The statement is factually correct.
+
+## Key Findings
+- The vaccine schedule described matches CDC guidance.
+
+## Verification Tips
+- Consult reliable health agencies for updates
+""", "reliable"),
+    Sample("false_hoax", """## Reliability Assessment
+Potentially false. This is a well-known hoax.
+
+## Key Findings
+- The image was debunked by several fact-checkers in 2019.
+- No record of the event exists.
+""", "potentially_false"),
+    Sample("false_misinformation", """## Reliability Assessment
+The claim is false and spreads misinformation about vaccine safety.
+
+## Key Findings
+- Large studies found no link between vaccines and autism.
+""", "potentially_false"),
+    Sample("false_unreliable_source", """## Reliability Assessment
+The source is unreliable and the claim cannot be trusted.
+
+## Key Findings
+- The website has a history of publishing fabricated quotes.
+""", "potentially_false"),
+    Sample("false_with_reliable_tips", """## Reliability Assessment
+Likely false.
+
+## Key Findings
+- The quote does not appear in any transcript.
+
+## Verification Tips
+- Compare against reliable news archives
+- Check reliable fact-checking sites
+""", "potentially_false"),
+    Sample("doubtful_misleading", """## Reliability Assessment
+Doubtful. The headline is misleading.
+
+## Key Findings
+- The statistic is real but taken out of context.
+- The article omits the comparison period.
+""", "doubtful"),
+    Sample("doubtful_partially_true", """## Reliability Assessment
+The claim is partially true.
+
+## Key Findings
+- The policy was announced, but the figures are questionable.
+""", "doubtful"),
+    Sample("doubtful_bias", """## Reliability Assessment
+Questionable.
+
+## Key Findings
+- The piece shows strong political bias and selective quoting.
+""", "doubtful"),
+    Sample("needs_verification_plain", """## Reliability Assessment
+Needs verification.
+
+## Key Findings
+- The claim about the upcoming merger is unclear and comes from a single post.
+""", "needs_verification"),
+    Sample("needs_verification_rumor", """## Reliability Assessment
+This is unfounded speculation.
+
+## Key Findings
+- The claim rests on rumors circulating on social media.
+- It cannot be verified with public records.
+""", "needs_verification"),
+    Sample("needs_verification_no_evidence", """## Reliability Assessment
+There is no evidence for this claim; it cannot be verified.
+
+## Key Findings
+- No official statement supports it.
+""", "needs_verification"),
+    Sample("needs_verification_reliable_tips", """## Reliability Assessment
+Needs verification.
+
+## Key Findings
+- The claim about the new tax rule comes from an anonymous post.
+
+## Verification Tips
+- Check reliable news outlets
+- Compare with reliable government sources
+- Ask reliable tax professionals
+""", "needs_verification"),
+    Sample("empty_analysis", "", "needs_verification"),
+    Sample("no_signal", """## Summary
+The text describes a local bakery's opening hours.
+""", "needs_verification"),
+    Sample("reliable_then_caveat", """## Reliability Assessment
+The report is credible and the core figures are accurate.
+
+## Key Findings
+- Figures match the central bank release.
+- One chart label is unclear.
+""", "reliable"),
+    Sample("false_despite_reliable_word_outside_section", """## Summary
+Some reliable outlets covered the event, but the claim itself is false.
+
+## Reliability Assessment
+Potentially false.
+""", "potentially_false"),
+    Sample("reliable_not_unreliable", """## Reliability Assessment
+Reliable. The outlet is not unreliable; it has a strong correction record.
+""", "reliable"),
+    Sample("reliable_word_reliableness", """## Reliability Assessment
+The reliableness of the claim is uncertain and needs verification.
+""", "needs_verification"),
+]